@@ -6,11 +6,12 @@ class ImageLoaderSignals(QObject):
     finished = Signal(str, QImage)
 
 class ImageLoader(QRunnable):
-    def __init__(self, path, processor, root_path):
+    def __init__(self, path, processor, root_path, name_map=None):
         super().__init__()
         self.path = path
         self.processor = processor
         self.root_path = root_path
+        self.name_map = name_map # BasenameMap of the vault (optional)
         self.signals = ImageLoaderSignals()
         
     def run(self):
@@ -38,22 +39,14 @@ class ImageLoader(QRunnable):
                     found = True
                     break
             
-            # 2. Recursive Search (if not found in candidates)
-            # OPTIMIZED: Limit depth or better, rely on user structure. 
-            # Walking entire vault is too slow (causing lag).
-            # For now, we restrict to depth 3 and specific asset folders if possible.
-            # Or better: ONLY search if path looks relative?
-            # Let's simple skip full walk to improve performance. 
-            # Users should put images in standard places.
-            if not found:
-                # print(f"DEBUG: Deep search disabled for performance.")
-                pass
-                # for root, dirs, files in os.walk(self.root_path):
-                #     dirs[:] = [d for d in dirs if not d.startswith('.')]
-                #     if basename in files:
-                #         target_path = os.path.join(root, basename)
-                #         found = True
-                #         break
+            # 2. Anywhere in the vault, via the basename map (no directory walk)
+            if not found and self.name_map is not None:
+                for rel_path in self.name_map.lookup(basename):
+                    c = os.path.join(self.root_path, rel_path)
+                    if os.path.isfile(c):
+                        target_path = c
+                        found = True
+                        break
 
         img = QImage()
         if found:
@@ -135,13 +128,14 @@ class ImageHandler:
         return image
 
     @classmethod
-    def load_async(cls, path, root_path, callback):
+    def load_async(cls, path, root_path, callback, name_map=None):
         """
         Starts async load. 
         callback: function(path, image) to call on main thread when done.
+        name_map: vault BasenameMap used to find images outside the common folders.
         """
         cls.mark_loading(path)
-        loader = ImageLoader(path, cls.process_image_static, root_path)
+        loader = ImageLoader(path, cls.process_image_static, root_path, name_map)
         # Force QueuedConnection to ensure callback runs in Main Thread (GUI Safety)
         loader.signals.finished.connect(callback, Qt.QueuedConnection)
         
@@ -1,135 +1,410 @@
-from PySide6.QtGui import QStandardItemModel, QIcon, QStandardItem
-from PySide6.QtCore import Qt, QMimeData, QByteArray, QDataStream, QIODevice
-from typing import Optional, Dict
-from app.models.note_item import NoteItem
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Optional, Dict, List
+from PySide6.QtCore import Qt, QAbstractItemModel, QModelIndex, QMimeData, QByteArray, QDataStream, QIODevice
+from app.storage.dir_lister import entry_for
+from app.storage.watcher import CHANGE_CREATED, CHANGE_DELETED, CHANGE_MOVED, CHANGE_RESCAN
 
-class NoteTreeModel(QStandardItemModel):
+# Custom roles (work through the sidebar's proxy model as well)
+NOTE_ID_ROLE = Qt.UserRole       # Relative path of the note/folder
+IS_FOLDER_ROLE = Qt.UserRole + 1
+
+_ROOT = -1
+
+# Node flags
+_FOLDER = 1
+_LOADED = 2     # Children listed
+_FETCHING = 4   # Listing in flight
+_FREE = 8       # Slot available for reuse
+
+
+class NoteTreeModel(QAbstractItemModel):
+    """
+    Lazy tree of the vault for the sidebar.
+
+    Nodes are integers indexing parallel arrays (parent, name id, row, flags); file
+    names are interned in a single table and paths are rebuilt from the parent chain,
+    so renaming or moving a folder never touches its descendants. Folder contents are
+    listed on demand through canFetchMore/fetchMore and icons are served by data().
+    """
     def __init__(self, file_manager):
         super().__init__()
         self.fm = file_manager
-        self.setHorizontalHeaderLabels(["Notas"])
-        self.note_items: Dict[str, NoteItem] = {} # Key is now path (str)
+        self._icons = None # (folder, note), created on first use
+        self._reset_storage()
+
+    def _reset_storage(self):
+        self._parent = array('i')
+        self._name = array('i')
+        self._row = array('i')
+        self._flags = array('B')
+        self._free: List[int] = []
+        self._children: Dict[int, array] = {_ROOT: array('i')} # Only for listed folders
+        self._names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self._fetching: Dict[int, int] = {} # folder node -> listing request id
+
+    # --- Node storage ---
+
+    def _intern(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self._names)
+            self._names.append(name)
+            self._name_ids[name] = name_id
+        return name_id
+
+    def _new_node(self, parent: int, name: str, is_folder: bool) -> int:
+        name_id = self._intern(name)
+        flags = _FOLDER if is_folder else 0
+        if self._free:
+            node = self._free.pop()
+            self._parent[node] = parent
+            self._name[node] = name_id
+            self._row[node] = 0
+            self._flags[node] = flags
+        else:
+            node = len(self._flags)
+            self._parent.append(parent)
+            self._name.append(name_id)
+            self._row.append(0)
+            self._flags.append(flags)
+        return node
+
+    def _free_subtree(self, node: int):
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            stack.extend(self._children.pop(n, ()))
+            request_id = self._fetching.pop(n, None)
+            if request_id is not None:
+                self.fm.cancel_children_async(request_id)
+            self._flags[n] = _FREE
+            self._free.append(n)
+
+    def _renumber(self, parent: int, start: int):
+        kids = self._children[parent]
+        for i in range(start, len(kids)):
+            self._row[kids[i]] = i
+
+    def _title(self, node: int) -> str:
+        name = self._names[self._name[node]]
+        if not self._flags[node] & _FOLDER and name.endswith('.md'):
+            return name[:-3]
+        return name
+
+    def _key(self, node: int):
+        # Same order as dir_lister.sort_key: folders first, then alphabetical
+        return (not self._flags[node] & _FOLDER, self._title(node).lower())
+
+    def note_id_of(self, node: int) -> str:
+        parts = []
+        while node != _ROOT:
+            parts.append(self._names[self._name[node]])
+            node = self._parent[node]
+        return os.sep.join(reversed(parts))
+
+    def _find_child(self, parent: int, name: str) -> Optional[int]:
+        """Binary search among the (sorted) children of a listed folder."""
+        kids = self._children.get(parent)
+        if not kids:
+            return None
+        for is_folder in (True, False):
+            title = name[:-3] if not is_folder and name.endswith('.md') else name
+            key = (not is_folder, title.lower())
+            i = bisect_left(kids, key, key=self._key)
+            while i < len(kids) and self._key(kids[i]) == key:
+                if self._names[self._name[kids[i]]] == name:
+                    return kids[i]
+                i += 1
+        return None
+
+    def _node_for(self, note_id: str) -> Optional[int]:
+        node = _ROOT
+        for part in note_id.split(os.sep):
+            node = self._find_child(node, part)
+            if node is None:
+                return None
+        return node
+
+    def _node(self, index) -> int:
+        return index.internalId() if index.isValid() else _ROOT
+
+    def _index(self, node: int) -> QModelIndex:
+        if node == _ROOT:
+            return QModelIndex()
+        return self.createIndex(self._row[node], 0, node)
+
+    # --- Lookups by path ---
+
+    def contains(self, note_id: str) -> bool:
+        return bool(note_id) and self._node_for(note_id) is not None
+
+    def index_for(self, note_id: str) -> QModelIndex:
+        """Index of a loaded note/folder, or an invalid index."""
+        node = self._node_for(note_id) if note_id else None
+        return self._index(node) if node is not None else QModelIndex()
+
+    def note_id(self, index) -> Optional[str]:
+        return self.note_id_of(index.internalId()) if index.isValid() else None
+
+    def is_folder(self, index) -> bool:
+        return index.isValid() and bool(self._flags[index.internalId()] & _FOLDER)
+
+    def loaded_folders(self):
+        """Yields (note_id, index) of every folder whose children are listed."""
+        for node in list(self._children):
+            if node != _ROOT:
+                yield self.note_id_of(node), self._index(node)
+
+    def node_count(self) -> int:
+        return len(self._flags) - len(self._free)
+
+    # --- QAbstractItemModel ---
+
+    def index(self, row, column, parent=QModelIndex()):
+        kids = self._children.get(self._node(parent))
+        if column != 0 or kids is None or not 0 <= row < len(kids):
+            return QModelIndex()
+        return self.createIndex(row, 0, kids[row])
+
+    def parent(self, index=QModelIndex()):
+        if not index.isValid():
+            return QModelIndex()
+        return self._index(self._parent[index.internalId()])
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        kids = self._children.get(self._node(parent))
+        return len(kids) if kids is not None else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self._node(parent)
+        if node == _ROOT:
+            return len(self._children[_ROOT]) > 0
+        flags = self._flags[node]
+        if not flags & _FOLDER:
+            return False
+        if not flags & _LOADED:
+            return True # Unknown until listed: keep the expander
+        return len(self._children.get(node, ())) > 0
+
+    def canFetchMore(self, parent):
+        node = self._node(parent)
+        return node != _ROOT and self._flags[node] & (_FOLDER | _LOADED | _FETCHING) == _FOLDER
+
+    def fetchMore(self, parent):
+        self.fetch_children(parent)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalId()
+        if role == Qt.DisplayRole or role == Qt.EditRole:
+            return self._title(node)
+        if role == Qt.DecorationRole:
+            if self._icons is None:
+                from PySide6.QtWidgets import QApplication, QStyle
+                style = QApplication.style()
+                self._icons = (style.standardIcon(QStyle.SP_DirIcon), style.standardIcon(QStyle.SP_FileIcon))
+            return self._icons[0] if self._flags[node] & _FOLDER else self._icons[1]
+        if role == NOTE_ID_ROLE:
+            return self.note_id_of(node)
+        if role == IS_FOLDER_ROLE:
+            return bool(self._flags[node] & _FOLDER)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and section == 0:
+            return "Notas"
+        return None
+
+    # --- Loading ---
 
     def load_notes(self):
-        self.clear()
-        self.setHorizontalHeaderLabels(["Notas"])
-        self.note_items = {}
-        
+        self.beginResetModel()
+        for request_id in self._fetching.values():
+            self.fm.cancel_children_async(request_id)
+        self._reset_storage()
+
         # Load Root
-        children = self.fm.get_children(None)
-        
-        for r in children:
-            nid = r['id']
-            title = r['title']
-            is_folder = r['is_folder']
-            
-            item = NoteItem(nid, title, is_folder)
-            self.note_items[nid] = item
-            
-            if is_folder:
-                item.appendRow(QStandardItem("Loading..."))
-                item.setData(True, Qt.UserRole + 1)
-            
-            self.invisibleRootItem().appendRow(item)
-            
-        self.refresh_icons()
+        kids = self._children[_ROOT]
+        for r in self.fm.get_children(None):
+            node = self._new_node(_ROOT, os.path.basename(r['id']), r['is_folder'])
+            self._row[node] = len(kids)
+            kids.append(node)
+        self.endResetModel()
 
     def fetch_children(self, parent_index):
-        item = self.itemFromIndex(parent_index)
-        if not item: return
-        if not item.data(Qt.UserRole + 1): return # Already loaded
-             
-        if item.rowCount() > 0:
-             item.removeRow(0) # Remove "Loading..."
-        
-        children = self.fm.get_children(item.note_id)
-        
-        for r in children:
-            nid = r['id']
-            title = r['title']
-            is_folder = r['is_folder']
-            
-            child_item = NoteItem(nid, title, is_folder)
-            self.note_items[nid] = child_item
-            
-            if is_folder:
-                child_item.appendRow(QStandardItem("Loading..."))
-                child_item.setData(True, Qt.UserRole + 1)
-                
-            item.appendRow(child_item)
-            
-        item.setData(False, Qt.UserRole + 1)
-        self.refresh_icons()
-
-    def refresh_icons(self):
-        from PySide6.QtWidgets import QApplication, QStyle
-        style = QApplication.style()
-        folder_icon = style.standardIcon(QStyle.SP_DirIcon)
-        note_icon = style.standardIcon(QStyle.SP_FileIcon) 
-        
-        for item in list(self.note_items.values()):
-            try:
-                if getattr(item, 'is_folder', False):
-                    item.setIcon(folder_icon)
-                else:
-                    item.setIcon(note_icon)
-            except RuntimeError:
-                continue
+        """
+        Lists a folder on a worker thread. Children are inserted in batches as they
+        arrive; until then the folder just shows its expander.
+        """
+        if not self.canFetchMore(parent_index):
+            return # Already loaded or listing in progress
+        node = parent_index.internalId()
+        self._flags[node] |= _FETCHING
+        self._children[node] = array('i')
+
+        # Removing the folder cancels the request, so callbacks only see live nodes
+        def on_batch(children):
+            if node in self._fetching:
+                self._append_children(node, children)
+
+        def on_done(success):
+            if self._fetching.pop(node, None) is None:
+                return
+            self._flags[node] = (self._flags[node] & ~_FETCHING) | _LOADED
+            if not self._children[node]:
+                index = self._index(node) # Empty folder: drop the expander
+                self.dataChanged.emit(index, index)
+
+        self._fetching[node] = self.fm.get_children_async(self.note_id_of(node), on_batch, on_done)
+
+    def _append_children(self, parent: int, entries):
+        if not entries:
+            return
+        kids = self._children[parent]
+        first = len(kids)
+        self.beginInsertRows(self._index(parent), first, first + len(entries) - 1)
+        for r in entries:
+            node = self._new_node(parent, os.path.basename(r['id']), r['is_folder'])
+            self._row[node] = len(kids)
+            kids.append(node)
+        self.endInsertRows()
+
+    # --- Incremental updates (watcher change sets) ---
+
+    def apply_changes(self, changes) -> bool:
+        """
+        Applies a coalesced watcher change set in place: only the rows of the affected
+        folders are touched, so expansion, selection and scroll survive.
+        Returns False if the change set requires a full reload (rescan).
+        """
+        for change in changes:
+            kind = change['kind']
+            if kind == CHANGE_RESCAN:
+                return False
+            if kind == CHANGE_CREATED:
+                self.insert_entry(change['path'], change['is_dir'])
+            elif kind == CHANGE_DELETED:
+                self.remove_entry(change['path'])
+            elif kind == CHANGE_MOVED:
+                self.move_entry(change['old_path'], change['path'], change['is_dir'])
+        return True
+
+    def _container_for(self, rel_path) -> Optional[int]:
+        """Listed folder that would hold rel_path (_ROOT for top level), or None if not listed."""
+        parent_id = os.path.dirname(rel_path)
+        if not parent_id:
+            return _ROOT
+        node = self._node_for(parent_id)
+        if node is None or self._flags[node] & (_LOADED | _FETCHING) != _LOADED:
+            return None # Not listed yet: it will be read from disk when expanded
+        return node
+
+    def insert_entry(self, rel_path, is_dir):
+        entry = entry_for(rel_path, is_dir)
+        parent = self._container_for(rel_path)
+        name = os.path.basename(rel_path)
+        if entry is None or parent is None or self._find_child(parent, name) is not None:
+            return
+        kids = self._children[parent]
+        row = bisect_right(kids, (not is_dir, entry['title'].lower()), key=self._key)
+        self.beginInsertRows(self._index(parent), row, row)
+        kids.insert(row, self._new_node(parent, name, is_dir))
+        self._renumber(parent, row)
+        self.endInsertRows()
+
+    def remove_entry(self, rel_path):
+        node = self._node_for(rel_path)
+        if node is None:
+            return
+        parent = self._parent[node]
+        row = self._row[node]
+        self.beginRemoveRows(self._index(parent), row, row)
+        del self._children[parent][row]
+        self._renumber(parent, row)
+        self._free_subtree(node)
+        self.endRemoveRows()
+
+    def move_entry(self, old_path, new_path, is_dir):
+        """Renames/moves a row with beginMoveRows: its subtree and expansion come along."""
+        node = self._node_for(old_path)
+        if node is None:
+            self.insert_entry(new_path, is_dir)
+            return
+        if self._node_for(new_path) is not None:
+            self.remove_entry(old_path)
+            return
+        entry = entry_for(new_path, is_dir)
+        parent = self._container_for(new_path)
+        if entry is None or parent is None:
+            self.remove_entry(old_path)
+            return
+
+        old_parent = self._parent[node]
+        row = self._row[node]
+        name_id = self._intern(os.path.basename(new_path))
+        # Destination in terms of the current sibling list (which may contain node)
+        dest = bisect_right(self._children[parent], (not is_dir, entry['title'].lower()), key=self._key)
+        if parent == old_parent and dest in (row, row + 1):
+            self._name[node] = name_id # Same place: only the name changes
+        else:
+            if not self.beginMoveRows(self._index(old_parent), row, row, self._index(parent), dest):
+                self.remove_entry(old_path)
+                return
+            del self._children[old_parent][row]
+            if parent == old_parent and dest > row:
+                dest -= 1
+            self._children[parent].insert(dest, node)
+            self._parent[node] = parent
+            self._name[node] = name_id
+            self._renumber(old_parent, min(row, dest) if parent == old_parent else row)
+            if parent != old_parent:
+                self._renumber(parent, dest)
+            self.endMoveRows()
+        index = self._index(node)
+        self.dataChanged.emit(index, index)
+
+    # --- Sidebar actions ---
 
     def add_note(self, title: str, parent_id: Optional[str], is_folder: bool = False) -> Optional[str]:
         # Determine Path
-        import os
         if parent_id:
              new_id = os.path.join(parent_id, title)
         else:
              new_id = title
-             
+
         success = self.fm.create_note(new_id, is_folder)
         if not success: return None
-        
-        new_item = NoteItem(new_id, title, is_folder)
-        self.note_items[new_id] = new_item
-        
-        if parent_id is None:
-            self.invisibleRootItem().appendRow(new_item)
-        elif parent_id in self.note_items:
-            parent = self.note_items[parent_id]
-            # Ensure parent is expanded/loaded? 
-            # If parent wasn't loaded, we might duplicate? 
-            # Ideally we force fetch children if not loaded.
-            if parent.data(Qt.UserRole + 1): # Not loaded yet
-                self.fetch_children(parent.index())
-            else:
-                parent.appendRow(new_item)
-                
-        self.refresh_icons()
+        if not is_folder and not new_id.endswith('.md'):
+            new_id += '.md'
+
+        parent_index = self.index_for(parent_id) if parent_id else QModelIndex()
+        if self.canFetchMore(parent_index):
+            self.fetch_children(parent_index) # Not listed yet: the listing includes it
+        else:
+            self.insert_entry(new_id, is_folder)
         return new_id
-        
+
     def delete_note(self, note_id: str):
         self.fm.delete_item(note_id)
-        
-        if note_id in self.note_items:
-            item = self.note_items[note_id]
-            try:
-                parent = item.parent() or self.invisibleRootItem()
-                parent.removeRow(item.row())
-            except RuntimeError:
-                pass
-            del self.note_items[note_id]
+
+        self.remove_entry(note_id)
 
     # Drag and Drop Implementation
     def flags(self, index):
         default_flags = Qt.ItemIsDragEnabled | Qt.ItemIsSelectable | Qt.ItemIsEnabled
-        
-        if not index.isValid():
-            return default_flags | Qt.ItemIsDropEnabled
-            
-        item = self.itemFromIndex(index)
-        is_folder = getattr(item, 'is_folder', False) or self.rowCount(index) > 0
-        
-        if is_folder:
+
+        if not index.isValid() or self.is_folder(index):
             return default_flags | Qt.ItemIsDropEnabled
-            
+
         return default_flags
 
     def supportedDropActions(self):
@@ -145,9 +420,8 @@ class NoteTreeModel(QStandardItemModel):
 
         for index in indexes:
             if index.isValid():
-                item = self.itemFromIndex(index)
-                stream.writeQString(item.note_id)
-        
+                stream.writeQString(self.note_id(index))
+
         mime.setData("application/x-cogny-note-id", encoded_data)
         return mime
 
@@ -160,57 +434,76 @@ class NoteTreeModel(QStandardItemModel):
 
         encoded_data = data.data("application/x-cogny-note-id")
         stream = QDataStream(encoded_data, QIODevice.ReadOnly)
-        
-        target_item = self.itemFromIndex(parent)
-        destination_parent = target_item
-        
-        new_parent_id = None
-        if target_item:
-             new_parent_id = target_item.note_id
-        
-        # If dropping on root (invalid parent), new_parent_id remains None
-        
+
         # If dropping on root (invalid parent), new_parent_id remains None
-        
-        # Remove manual layout signals as load_notes() handles model reset
-        try:
-            while not stream.atEnd():
-                note_id = stream.readQString()
-                
-                if note_id == new_parent_id:
-                    continue
-    
-                if note_id in self.note_items:
-                    item = self.note_items[note_id]
-                    
-                    # Circular check
-                    check_item = target_item
-                    is_circular = False
-                    while check_item:
-                        if check_item.note_id == note_id:
-                            is_circular = True
-                            break
-                        check_item = check_item.parent()
-                    
-                    if is_circular:
-                         continue
-                    
-                    # Move in File System
-                    new_id = self.fm.move_item(note_id, new_parent_id)
-                    
-                    if not new_id: continue
-                    
-                    # Since IDs are paths, moving invalidates all IDs in the subtree.
-                    # We must reload the model to ensure consistency.
-                    self.load_notes() 
-                    
-                    # Return True to signal success. 
-                    # Note: Since we reset the model, the View's attempt to removeRows (if any)
-                    # should be harmless or fail silently against the new model state.
-                    return True
+        new_parent_id = self.note_id(parent)
+
+        note_ids = []
+        while not stream.atEnd():
+            note_ids.append(stream.readQString())
 
+        try:
+            self.move_notes(note_ids, new_parent_id)
         except Exception as e:
             print(f"Error in dropMimeData: {e}")
-             
+
+        # The rows were already moved in place. Returning True would make the view
+        # remove the dragged rows again (clearOrRemove after an internal MoveAction).
         return False
 
+    def move_notes(self, note_ids, new_parent_id: Optional[str]):
+        """
+        Moves several items into a folder (None = vault root) as one batch.
+        Returns the list of (old_id, new_id) actually moved.
+        """
+        selected = set(note_ids)
+        ops = []
+        for note_id in note_ids:
+            if note_id == new_parent_id or not self.contains(note_id):
+                continue
+            if (os.path.dirname(note_id) or None) == new_parent_id:
+                continue # Already there
+            # Circular: dropping a folder into itself or one of its descendants
+            if new_parent_id and (new_parent_id + os.sep).startswith(note_id + os.sep):
+                continue
+            # Moved along with a selected ancestor
+            ancestor = os.path.dirname(note_id)
+            while ancestor and ancestor not in selected:
+                ancestor = os.path.dirname(ancestor)
+            if ancestor:
+                continue
+            ops.append({'op': 'move', 'path': note_id, 'target': new_parent_id})
+
+        results = self.apply_operations(ops)
+        return [(op['path'], new_id) for op, new_id in zip(ops, results) if new_id]
+
+    def delete_notes(self, note_ids):
+        """Deletes several items as one batch; descendants of a deleted folder are skipped."""
+        selected = set(note_ids)
+        ops = []
+        for note_id in note_ids:
+            ancestor = os.path.dirname(note_id)
+            while ancestor and ancestor not in selected:
+                ancestor = os.path.dirname(ancestor)
+            if not ancestor:
+                ops.append({'op': 'delete', 'path': note_id})
+        return self.apply_operations(ops)
+
+    def apply_operations(self, ops):
+        """
+        Runs move/rename/delete ops (see FileManager.apply_operations) as one FileManager
+        batch, then updates the affected rows in a single pass: subtrees are moved or
+        removed in place and nothing is reloaded. Returns the FileManager results.
+        """
+        if not ops:
+            return []
+        folders = {op['path']: os.path.isdir(self.fm.get_abs_path(op['path'])) for op in ops}
+        results = self.fm.apply_operations(ops)
+        for op, result in zip(ops, results):
+            if not result:
+                continue
+            if op['op'] == 'delete':
+                self.remove_entry(op['path'])
+            else:
+                self.move_entry(op['path'], result, folders[op['path']])
+        return results
@@ -1,48 +1,84 @@
 import os
 import json
 from pathlib import Path
-from PySide6.QtCore import QByteArray
+from PySide6.QtCore import QByteArray, QTimer
+
+from app.storage.save_queue import atomic_write
+
+# Changes are written back this long after the last one
+CONFIG_SAVE_DELAY_MS = 1000
+
 
 class ConfigManager:
     """
-    Manages vault-specific configuration stored in .cogny/config.json
+    Manages vault-specific configuration stored in config.json at the vault root.
+
+    One instance per vault (FileManager.config) is shared by the whole UI. Reads are
+    served from memory; save_config() only marks keys dirty and the file is rewritten
+    on a debounce (flush() forces it, cleanup calls it). A flush merges the dirty keys
+    into the file's current content and writes it atomically.
     """
     def __init__(self, vault_root: str):
         self.vault_root = vault_root
         self.config_dir = vault_root # Config is now in root
         self.config_file = os.path.join(self.vault_root, "config.json")
         self._config_cache = {}
+        self._dirty = set()
+        self.writes = 0
+        self._save_timer = QTimer()
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(CONFIG_SAVE_DELAY_MS)
+        self._save_timer.timeout.connect(self.flush)
         self.load_config()
 
-    def load_config(self) -> dict:
-        """Loads configuration from disk."""
+    def _read_file(self) -> dict:
         if not os.path.exists(self.config_file):
-            self._config_cache = {}
             return {}
-
         try:
             with open(self.config_file, 'r', encoding='utf-8') as f:
-                self._config_cache = json.load(f)
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
         except Exception as e:
             print(f"Error loading config: {e}")
-            self._config_cache = {}
-            
+            return {}
+
+    def load_config(self) -> dict:
+        """Loads configuration from disk (keys not flushed yet keep their in-memory value)."""
+        data = self._read_file()
+        for key in self._dirty:
+            if key in self._config_cache:
+                data[key] = self._config_cache[key]
+        self._config_cache = data
         return self._config_cache
 
     def save_config(self, key: str = None, value = None, items: dict = None):
         """
-        Saves configuration. Can update a single key-value pair or multiple items.
-        If both are None, just flushes cache to disk.
+        Updates a single key-value pair or multiple items in memory and schedules the write.
+        Values equal to the cached ones are ignored. If both are None, flushes right away.
         """
-        if items:
-            self._config_cache.update(items)
-        elif key is not None:
-             self._config_cache[key] = value
-
+        if items is None and key is None:
+            self.flush()
+            return
+        for k, v in (items.items() if items else ((key, value),)):
+            if k in self._config_cache and self._config_cache[k] == v:
+                continue
+            self._config_cache[k] = v
+            self._dirty.add(k)
+        if self._dirty:
+            self._save_timer.start()
 
+    def flush(self):
+        """Writes the dirty keys now: merged into the file on disk, atomically."""
+        self._save_timer.stop()
+        if not self._dirty:
+            return
+        data = self._read_file()
+        for key in self._dirty:
+            data[key] = self._config_cache.get(key)
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self._config_cache, f, indent=4)
+            atomic_write(self.config_file, json.dumps(data, indent=4))
+            self._dirty.clear()
+            self.writes += 1
         except Exception as e:
             print(f"Error saving config: {e}")
 
@@ -0,0 +1,174 @@
+import os
+import threading
+from collections import OrderedDict
+from PySide6.QtCore import QThread, Signal
+
+_REMOVED = object()
+
+# Notes written per transaction during the startup sync
+SYNC_BATCH_SIZE = 200
+
+
+class ContentIndexer(QThread):
+    """
+    Long-lived worker that keeps the content indexes (full-text search, links, ...) in sync.
+
+    On start it reconciles every note against the indexes, reading only notes whose
+    size/mtime changed since the last session. The reconcile stats the disk itself:
+    the vault index may still hold the previous session's rows while its builder
+    runs, which would hide notes created or edited while the app was closed.
+    After that it processes per-file updates queued by FileManager (saves and
+    watcher events).
+
+    Each index must provide: doc_states(), index_note(path, content, size, mtime, commit),
+    remove_note(path, commit), commit(), mark_built() and close_thread_connection().
+    """
+    sync_finished = Signal(int) # notes indexed during the sync
+    note_indexed = Signal(str) # rel_path
+    note_removed = Signal(str) # rel_path (a note or a folder)
+
+    def __init__(self, root_path, indexes):
+        super().__init__()
+        self.root_path = os.path.abspath(root_path)
+        self.indexes = [idx for idx in indexes if idx.available]
+        self._cond = threading.Condition()
+        self._pending = OrderedDict()
+        self._full_sync = True
+        self._stop = False
+
+    # --- Producer API (GUI thread) ---
+
+    def enqueue(self, rel_path: str, content: str = None):
+        """Schedules a note for re-indexing. Pass content when it is already in memory."""
+        with self._cond:
+            self._pending.pop(rel_path, None)
+            self._pending[rel_path] = content
+            self._cond.notify()
+
+    def enqueue_removal(self, rel_path: str):
+        """Schedules removal of a note, or of every note under a folder."""
+        with self._cond:
+            self._pending.pop(rel_path, None)
+            self._pending[rel_path] = _REMOVED
+            self._cond.notify()
+
+    def pending_paths(self):
+        """Notes queued for re-indexing, i.e. whose new content the indexes do not reflect yet."""
+        with self._cond:
+            return [rel_path for rel_path, content in self._pending.items() if content is not _REMOVED]
+
+    def request_full_sync(self):
+        """Schedules a full reconcile (e.g. after the watcher lost events)."""
+        with self._cond:
+            self._full_sync = True
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+
+    # --- Worker ---
+
+    def run(self):
+        try:
+            while True:
+                with self._cond:
+                    while not self._stop and not self._full_sync and not self._pending:
+                        self._cond.wait()
+                    if self._stop:
+                        break
+                    do_sync = self._full_sync
+                    self._full_sync = False
+                    items = self._pending
+                    self._pending = OrderedDict()
+
+                if do_sync:
+                    self._sync_all()
+                for rel_path, content in items.items():
+                    if self._stop:
+                        break
+                    self._process(rel_path, content)
+        finally:
+            for idx in self.indexes:
+                idx.close_thread_connection()
+
+    def _list_notes(self):
+        """{rel_path: (size, mtime)} of every note in the vault, read from the disk."""
+        notes = {}
+        pending = [self.root_path]
+        while pending and not self._stop:
+            current = pending.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if entry.name.startswith('.'):
+                            continue
+                        if entry.is_dir():
+                            pending.append(entry.path)
+                        elif entry.name.endswith('.md'):
+                            st = entry.stat()
+                            notes[os.path.relpath(entry.path, self.root_path)] = (st.st_size, st.st_mtime_ns)
+            except OSError as e:
+                print(f"Error scanning {current}: {e}")
+        return notes
+
+    def _sync_all(self):
+        notes = self._list_notes()
+        states = [idx.doc_states() for idx in self.indexes]
+        indexed = 0
+
+        for rel_path, state in notes.items():
+            if self._stop:
+                return
+            stale = [idx for idx, known in zip(self.indexes, states) if known.get(rel_path) != state]
+            if not stale:
+                continue
+            content = self._read(rel_path)
+            if content is None:
+                continue
+            for idx in stale:
+                idx.index_note(rel_path, content, state[0], state[1], commit=False)
+            indexed += 1
+            if indexed % SYNC_BATCH_SIZE == 0:
+                for idx in self.indexes:
+                    idx.commit()
+
+        for idx, known in zip(self.indexes, states):
+            for rel_path in known.keys() - notes.keys():
+                idx.remove_note(rel_path, commit=False)
+            idx.commit()
+            idx.mark_built()
+
+        self.sync_finished.emit(indexed)
+
+    def _process(self, rel_path, content):
+        if content is _REMOVED:
+            for idx in self.indexes:
+                idx.remove_note(rel_path)
+            self.note_removed.emit(rel_path)
+            return
+
+        try:
+            st = os.stat(os.path.join(self.root_path, rel_path))
+        except OSError:
+            for idx in self.indexes:
+                idx.remove_note(rel_path)
+            self.note_removed.emit(rel_path)
+            return
+
+        if content is None:
+            content = self._read(rel_path)
+            if content is None:
+                return
+        for idx in self.indexes:
+            idx.index_note(rel_path, content, st.st_size, st.st_mtime_ns)
+        self.note_indexed.emit(rel_path)
+
+    def _read(self, rel_path):
+        try:
+            with open(os.path.join(self.root_path, rel_path), 'r', encoding='utf-8', errors='ignore') as f:
+                return f.read()
+        except Exception as e:
+            print(f"Error reading {rel_path} for indexing: {e}")
+            return None
@@ -0,0 +1,184 @@
+import os
+from itertools import count
+from typing import Dict, List, Optional
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal, Slot, Qt
+
+# Children handed to the model per event-loop iteration
+LIST_BATCH_SIZE = 500
+
+_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp')
+
+
+def entry_for(rel_path: str, is_dir: bool) -> Optional[Dict]:
+    """Sidebar entry for a path, or None if the sidebar does not show it."""
+    name = os.path.basename(rel_path)
+    if name.startswith('.'):
+        return None
+    if is_dir:
+        return {'id': rel_path, 'title': name, 'is_folder': True}
+    if name.endswith('.md'):
+        return {'id': rel_path, 'title': os.path.splitext(name)[0], 'is_folder': False}
+    if name.lower().endswith(_IMAGE_EXTENSIONS):
+        return {'id': rel_path, 'title': name, 'is_folder': False}
+    return None
+
+
+def sort_key(entry: Dict):
+    """Sidebar order: folders first, then items, alphabetical."""
+    return (not entry['is_folder'], entry['title'].lower())
+
+
+def scan_children(root_path: str, rel_dir: Optional[str]) -> List[Dict]:
+    """
+    Lists the visible notes, images and folders of one directory.
+    Folders first, then items, alphabetical. Returns [] if the directory is missing.
+    """
+    abs_path = os.path.join(root_path, rel_dir) if rel_dir else root_path
+    items = []
+    with os.scandir(abs_path) as it:
+        for entry in it:
+            if entry.name.startswith('.'):
+                continue
+            rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+            if entry.is_dir():
+                items.append({'id': rel_path, 'title': entry.name, 'is_folder': True})
+            elif entry.is_file():
+                is_md = entry.name.endswith('.md')
+                if is_md or entry.name.lower().endswith(_IMAGE_EXTENSIONS):
+                    items.append({
+                        'id': rel_path,
+                        'title': os.path.splitext(entry.name)[0] if is_md else entry.name,
+                        'is_folder': False
+                    })
+    items.sort(key=sort_key)
+    return items
+
+
+class _ListSignals(QObject):
+    listed = Signal(int, str, object, object) # request_id, rel_dir, mtime_ns, items (None on error)
+
+
+class _ListTask(QRunnable):
+    def __init__(self, request_id, root_path, rel_dir):
+        super().__init__()
+        self.request_id = request_id
+        self.root_path = root_path
+        self.rel_dir = rel_dir
+        self.signals = _ListSignals()
+
+    def run(self):
+        abs_path = os.path.join(self.root_path, self.rel_dir) if self.rel_dir else self.root_path
+        try:
+            # mtime taken before the scan: a change during the scan invalidates the entry
+            mtime = os.stat(abs_path).st_mtime_ns
+            items = scan_children(self.root_path, self.rel_dir)
+        except OSError as e:
+            print(f"Error listing children of {abs_path}: {e}")
+            mtime, items = None, None
+        self.signals.listed.emit(self.request_id, self.rel_dir, mtime, items)
+
+
+class DirectoryLister(QObject):
+    """
+    Lists directories for the sidebar off the GUI thread.
+
+    The scan (scandir + sort) runs on a worker; the result is handed to the caller
+    in batches of LIST_BATCH_SIZE, one per event-loop iteration, so huge folders
+    appear progressively. Listings are cached per directory and reused while the
+    directory's mtime is unchanged (entries added/removed/renamed bump it).
+    """
+    def __init__(self, root_path: str):
+        super().__init__()
+        self.root_path = os.path.abspath(root_path)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(1)
+        self._ids = count(1)
+        self._requests = {} # request_id -> (on_batch, on_done)
+        self._cache: Dict[str, tuple] = {} # rel_dir -> (mtime_ns, items)
+
+    def _dir_mtime(self, rel_dir) -> Optional[int]:
+        abs_path = os.path.join(self.root_path, rel_dir) if rel_dir else self.root_path
+        try:
+            return os.stat(abs_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _cached(self, rel_dir) -> Optional[List[Dict]]:
+        entry = self._cache.get(rel_dir)
+        if entry is not None and entry[0] == self._dir_mtime(rel_dir):
+            return entry[1]
+        return None
+
+    def list_sync(self, rel_dir: Optional[str]) -> List[Dict]:
+        """Blocking listing (root on startup); served from the cache when fresh."""
+        rel_dir = rel_dir or ""
+        cached = self._cached(rel_dir)
+        if cached is not None:
+            return list(cached)
+        mtime = self._dir_mtime(rel_dir)
+        try:
+            items = scan_children(self.root_path, rel_dir)
+        except OSError as e:
+            print(f"Error listing children of {rel_dir or self.root_path}: {e}")
+            return []
+        if mtime is not None:
+            self._cache[rel_dir] = (mtime, items)
+        return list(items)
+
+    def list_async(self, rel_dir: Optional[str], on_batch, on_done) -> int:
+        """
+        on_batch(items) is called on the GUI thread for each batch, then on_done(success).
+        Returns a request id for cancel().
+        """
+        rel_dir = rel_dir or ""
+        request_id = next(self._ids)
+        self._requests[request_id] = (on_batch, on_done)
+
+        cached = self._cached(rel_dir)
+        if cached is not None:
+            QTimer.singleShot(0, lambda: self._deliver(request_id, cached, 0))
+            return request_id
+
+        task = _ListTask(request_id, self.root_path, rel_dir)
+        task.signals.listed.connect(self._on_listed, Qt.QueuedConnection)
+        self.pool.start(task)
+        return request_id
+
+    def cancel(self, request_id):
+        self._requests.pop(request_id, None)
+
+    def invalidate(self, rel_dir: Optional[str] = None):
+        """Drops one cached directory, or all of them."""
+        if rel_dir is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(rel_dir, None)
+
+    def shutdown(self):
+        self._requests.clear()
+        self.pool.waitForDone()
+
+    @Slot(int, str, object, object)
+    def _on_listed(self, request_id, rel_dir, mtime, items):
+        if items is None:
+            callbacks = self._requests.pop(request_id, None)
+            if callbacks:
+                callbacks[1](False)
+            return
+        self._cache[rel_dir] = (mtime, items)
+        self._deliver(request_id, items, 0)
+
+    def _deliver(self, request_id, items, start):
+        callbacks = self._requests.get(request_id)
+        if callbacks is None:
+            return # cancelled
+        on_batch, on_done = callbacks
+        batch = items[start:start + LIST_BATCH_SIZE]
+        if batch:
+            on_batch(batch)
+        start += LIST_BATCH_SIZE
+        if start < len(items):
+            QTimer.singleShot(0, lambda: self._deliver(request_id, items, start))
+        else:
+            self._requests.pop(request_id, None)
+            on_done(True)
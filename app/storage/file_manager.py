@@ -1,59 +1,63 @@
 import os
 import shutil
+from contextlib import contextmanager
+from itertools import islice
 from typing import List, Optional, Dict, Tuple
 from pathlib import Path
  # Remove MetadataCache and VaultIndexer imports
-from app.storage.watcher import VaultWatcher
-from PySide6.QtCore import QObject, QThread, Signal, Slot, Qt
-from PySide6.QtWidgets import QApplication
-import uuid
-
-class FileLoaderWorker(QObject):
-    """Worker that lives in a separate thread."""
-    request_read = Signal(str, str) # request_id, path
-    read_finished = Signal(str, object) # request_id, content
-
-    @Slot(str, str)
-    def do_read(self, request_id, path):
-        print(f"DEBUG Worker [Thread {QThread.currentThread()}]: Received request {request_id} for {path}")
-        try:
-            if not os.path.exists(path):
-                print(f"DEBUG Worker: File not found {path}")
-                self.read_finished.emit(request_id, None)
-                return
-            with open(path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            print(f"DEBUG Worker: Read successful. Size {len(content)}. Emitting finished.")
-            self.read_finished.emit(request_id, content)
-        except Exception as e:
-            print(f"Error reading file async {path}: {e}")
-            self.read_finished.emit(request_id, None)
+from app.storage.watcher import VaultWatcher, CHANGE_RESCAN, CHANGE_MOVED, CHANGE_CREATED
+from app.storage.vault_index import VaultIndex, VaultIndexBuilder, KIND_FOLDER, KIND_NOTE, KIND_IMAGE
+from app.storage.search_index import SearchIndex
+from app.storage.search_runner import SearchRunner
+from app.storage.search_query import SearchQuery, NoteText
+from app.storage.search_snippets import make_snippets
+from app.storage.link_index import LinkIndex
+from app.storage.link_rewriter import LinkRewriter
+from app.storage.stats_index import StatsIndex
+from app.storage.config_manager import ConfigManager
+from app.storage.content_indexer import ContentIndexer
+from app.storage.name_map import BasenameMap
+from app.storage.title_index import TitleIndex, TitleIndexBuilder
+from app.storage.save_queue import SaveQueue
+from app.storage.note_cache import NoteCache
+from app.storage.dir_lister import DirectoryLister
+from app.storage.note_stream import iter_text_chunks, STREAM_THRESHOLD
+from app.storage.read_scheduler import ReadScheduler, READ_PRIORITY_FOREGROUND, READ_PRIORITY_PREFETCH
+from PySide6.QtCore import QObject, QThread, QTimer, Signal, Slot, Qt
+
+# Search hits per page (next pages are read on demand)
+SEARCH_PAGE_SIZE = 50
+# Notes whose reading position is remembered (the least recently left are dropped)
+MAX_NOTE_POSITIONS = 200
 
 class FileManager(QObject):
     """
     Manages file system operations for the note application.
-    Uses a dedicated thread for async I/O to avoid segfaults.
+    Async reads go through a small prioritized reader pool (ReadScheduler).
     """
-    read_requested = Signal(str, str) # Internal signal to talk to worker
+    index_ready = Signal(int) # entry count, emitted when the background index build finishes
+    note_saved = Signal(str, bool) # rel_path, success (write-behind saves)
+    vault_changed = Signal(list) # coalesced watcher change set, emitted after the indexes were updated
+    links_changed = Signal(str) # rel_path whose links were re-indexed or removed ("" after a full sync)
+    link_rewrite_progress = Signal(int, int) # notes processed, total (rename link updates)
+    links_rewritten = Signal(str, str, list, int) # old_rel, new_rel, rewritten rel_paths, links rewritten
 
     def __init__(self, root_path: str):
         super().__init__()
         self.root_path = os.path.abspath(root_path)
         print(f"DEBUG FileManager [Thread {QThread.currentThread()}]: Initializing...")
         
-        # Async Loader Setup
-        self._callbacks = {}
-        self.loader_thread = QThread()
-        self.loader_worker = FileLoaderWorker()
-        self.loader_worker.moveToThread(self.loader_thread)
-        
-        # Connect signals
-        self.read_requested.connect(self.loader_worker.do_read)
-        self.loader_worker.read_finished.connect(self._on_read_finished)
-        
-        # Start thread
-        self.loader_thread.start()
-        print("DEBUG FileManager: Loader thread started.")
+        # Vault config (config.json): shared, cached in memory, written back on a debounce
+        self.config = ConfigManager(self.root_path)
+
+        # Decoded note text shared by read_note, async reads, search and exporters
+        self.note_cache = NoteCache()
+
+        # Sidebar directory listings: off-thread, batched, cached per directory mtime
+        self.dir_lister = DirectoryLister(self.root_path)
+
+        # Async reads: foreground before prefetch, superseded requests cancelled per owner
+        self.read_scheduler = ReadScheduler(self._read_file)
 
         # Use 'images' folder as requested by user
         self.images_path = os.path.join(self.root_path, "images")
@@ -62,16 +66,242 @@ class FileManager(QObject):
         if not os.path.exists(self.images_path):
             os.makedirs(self.images_path, exist_ok=True)
 
+        # Persistent Vault Index (.cogny/index.db)
+        # A previous session's index is used right away (warm); the builder reconciles it in background.
+        self.index = VaultIndex(self.root_path)
+        self.index_builder = VaultIndexBuilder(self.index)
+        self.index_builder.finished_build.connect(self._on_index_built)
+        self.index_builder.start()
+
+        # Basename -> paths map for wikilink/image resolution (warm from the previous session's index)
+        self.name_map = BasenameMap()
+        if self.index.is_ready():
+            self.name_map.load(self.index.file_paths())
+
+        # Quick switcher: trigram index over note paths/titles, built off the GUI thread
+        self.title_index = TitleIndex(recent=self.config.get("recent_notes", []))
+        self.title_index_builder = None
+        self._title_index_stale = False
+        if self.index.is_ready():
+            self._build_title_index()
+
+        # Full-text index (.cogny/search.db), wikilink graph (.cogny/links.db) and
+        # writing statistics (.cogny/stats.db), kept in sync per file off the GUI thread
+        self.search_index = SearchIndex(self.root_path)
+        self.link_index = LinkIndex(self.root_path)
+        self.stats_index = StatsIndex(self.root_path)
+        self.content_indexer = ContentIndexer(self.root_path,
+                                              [self.search_index, self.link_index, self.stats_index])
+        self.content_indexer.note_indexed.connect(self.links_changed)
+        self.content_indexer.note_removed.connect(self.links_changed)
+        self.content_indexer.sync_finished.connect(self._on_content_synced)
+        # Until this session's sync ends the stats may still be the last session's
+        self.content_synced = False
+        self.content_indexer.start()
+
+        # Search bar queries: streamed from a worker, superseded queries cancelled
+        self.search_runner = SearchRunner(self.iter_search_hits, self._close_search_connections)
+        # (query, ranked candidates) of the last ranked search, for its next pages
+        self._ranked_cache = None
+
+        # Rename refactoring: inbound [[links]] retargeted on a worker pool
+        self.link_rewriter = LinkRewriter(self.root_path)
+        self.link_rewriter.progress.connect(self.link_rewrite_progress)
+        self.link_rewriter.finished.connect(self._on_links_rewritten)
+
+        # Write-behind saves: coalesced per path, atomic, drained on cleanup()
+        self.save_queue = SaveQueue(self.root_path)
+        self.save_queue.saved.connect(self._on_note_saved)
+        self.save_queue.start()
+        # Per-session save counters (no-op saves are skipped by the editors)
+        self.saves_written = 0
+        self.saves_skipped = 0
+
+        # batch(): depth and the directories whose index refresh is deferred
+        self._batch_depth = 0
+        self._batch_dirs: List[str] = []
+
         # File System Watcher
         self.watcher = VaultWatcher(self.root_path)
-        # Connect Watcher -> We can expose a signal if needed, or just let UI handle reloads
-        # For now, we can emit a signal ourselves if we want to emulate old indexer behavior,
-        # but UI mostly refreshes on its own or triggered actions.
-        # Let's keep the watcher running.
+        # Coalesced change sets keep the indexes up to date incrementally
+        self.watcher.changes.connect(self._on_watcher_changes)
 
     def _get_rel_path(self, abs_path: str) -> str:
         return os.path.relpath(abs_path, self.root_path)
 
+    # --- Vault Index ---
+
+    @Slot(int)
+    def _on_index_built(self, count):
+        print(f"DEBUG FileManager: Vault index ready ({count} entries).")
+        self.name_map.load(self.index.file_paths())
+        self._build_title_index()
+        self.index_ready.emit(count)
+
+    @Slot(int)
+    def _on_content_synced(self, count):
+        self.content_synced = True
+        self.links_changed.emit("")
+
+    @Slot(list)
+    def _on_watcher_changes(self, changes):
+        if any(c['kind'] == CHANGE_RESCAN for c in changes):
+            # Events were lost: reconcile everything in the background
+            self.note_cache.clear()
+            self.dir_lister.invalidate()
+            if not self.index_builder.isRunning():
+                self.index_builder.start()
+            self.content_indexer.request_full_sync()
+            self.vault_changed.emit(changes)
+            return
+
+        dirs = []
+        for change in changes:
+            path, old_path = change['path'], change['old_path']
+            if change['kind'] == CHANGE_MOVED:
+                self._on_watcher_file_changed(old_path)
+            if change['is_dir'] and change['kind'] in (CHANGE_CREATED, CHANGE_MOVED):
+                # New folders are scanned recursively by refreshing their parent
+                parent = os.path.dirname(path)
+                if parent not in dirs:
+                    dirs.append(parent)
+            else:
+                self._on_watcher_file_changed(path)
+        for rel_dir in dirs:
+            self._index_refresh_dir(rel_dir)
+        self.vault_changed.emit(changes)
+
+    def _on_watcher_file_changed(self, rel_path):
+        """Re-stats one path in every index (removes it, or its subtree, if gone)."""
+        self.note_cache.invalidate(self._get_abs_path(rel_path))
+        if self.index.upsert_path(rel_path):
+            self.name_map.add(rel_path)
+            self.title_index.add(rel_path)
+            if rel_path.endswith('.md'):
+                self.content_indexer.enqueue(rel_path)
+        else:
+            self.name_map.discard(rel_path)
+            self.title_index.discard(rel_path)
+            self.content_indexer.enqueue_removal(rel_path)
+
+    def _index_refresh_dir(self, rel_dir: str):
+        """Refreshes one directory in the vault index and forwards note changes to the content indexer."""
+        changed, removed = self.index.refresh_directory(rel_dir)
+        for path in removed:
+            self.note_cache.invalidate(self._get_abs_path(path))
+            self.name_map.discard(path)
+            self.title_index.discard(path)
+            self.content_indexer.enqueue_removal(path)
+        for path in changed:
+            self.note_cache.invalidate(self._get_abs_path(path))
+            if os.path.isfile(self._get_abs_path(path)):
+                self.name_map.add(path)
+                self.title_index.add(path)
+            if path.endswith('.md'):
+                self.content_indexer.enqueue(path)
+
+    def _build_title_index(self):
+        if self.title_index_builder is not None and self.title_index_builder.isRunning():
+            # Rebuilt from a fresh snapshot once the running build is done
+            self._title_index_stale = True
+            return
+        self._title_index_stale = False
+        # The path snapshot is read here: index connections belong to their thread
+        self.title_index_builder = TitleIndexBuilder(self.title_index, self.index.iter_paths(KIND_NOTE))
+        self.title_index_builder.finished.connect(self._on_title_index_built)
+        self.title_index_builder.start(QThread.LowPriority)
+
+    @Slot()
+    def _on_title_index_built(self):
+        if self._title_index_stale:
+            self._build_title_index()
+
+    def _index_refresh_parent(self, rel_path: str):
+        """Refreshes the index entries of the directory containing rel_path."""
+        rel_dir = os.path.dirname(rel_path)
+        if self._batch_depth:
+            if rel_dir not in self._batch_dirs:
+                self._batch_dirs.append(rel_dir)
+            return
+        self._index_refresh_dir(rel_dir)
+
+    # --- Batched operations ---
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups file operations into one transaction for the rest of the app: watcher
+        notifications are held and index refreshes deferred until the outermost batch
+        ends, then each touched directory is refreshed once and a single coalesced
+        change set is emitted.
+        """
+        self._batch_depth += 1
+        if self._batch_depth == 1:
+            # Queued saves still target the old paths
+            self.save_queue.flush()
+            self.watcher.hold()
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                dirs, self._batch_dirs = self._batch_dirs, []
+                for rel_dir in dirs:
+                    self._index_refresh_dir(rel_dir)
+                self.watcher.release()
+
+    def apply_operations(self, ops: List[Dict]) -> List:
+        """
+        Applies several operations in one batch(). Each op is a dict
+        {'op': 'move' | 'rename' | 'delete', 'path': rel_path, 'target': ...}, where target
+        is the new parent folder (None = root) for a move and the new name for a rename.
+        Returns, per op, the new relative path (move/rename), True (delete) or None on failure.
+        """
+        results = []
+        with self.batch():
+            for op in ops:
+                try:
+                    if op['op'] == 'move':
+                        results.append(self.move_item(op['path'], op.get('target')))
+                    elif op['op'] == 'rename':
+                        results.append(self.rename_item(op['path'], op['target']))
+                    elif op['op'] == 'delete':
+                        self.delete_item(op['path'])
+                        results.append(True)
+                    else:
+                        raise ValueError(f"unknown operation {op['op']!r}")
+                except Exception as e:
+                    print(f"Error in batch {op.get('op')} {op.get('path')}: {e}")
+                    results.append(None)
+        return results
+
+    def first_note(self) -> Optional[str]:
+        """Relative path of the first note in the vault, or None if it has none."""
+        if self.index.is_ready():
+            return self.index.first_note()
+
+        for root, dirs, files in os.walk(self.root_path):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for f in files:
+                if f.endswith('.md'):
+                    return self._get_rel_path(os.path.join(root, f))
+        return None
+
+    def _iter_note_paths(self):
+        """Yields (abs_path, rel_path) for every note, from the index when available."""
+        if self.index.is_ready():
+            for rel_path in self.index.iter_paths(KIND_NOTE):
+                yield self._get_abs_path(rel_path), rel_path
+            return
+
+        for root, dirs, files in os.walk(self.root_path):
+            # Skip hidden
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for f in files:
+                if not f.endswith('.md'): continue
+                path = os.path.join(root, f)
+                yield path, os.path.relpath(path, self.root_path)
+
     def _get_abs_path(self, rel_path: str) -> str:
         return os.path.join(self.root_path, rel_path)
 
@@ -90,7 +320,8 @@ class FileManager(QObject):
         1. Checks if it's already an absolute path.
         2. Checks relative to root.
         3. Checks in common asset folders.
-        4. Recursively searches the vault.
+        4. Looks the basename up in the vault-wide name map (O(1)).
+        5. Recursively searches the vault (only before the first index build).
         """
         # 1. Absolute Path
         if os.path.isabs(filename_or_path):
@@ -117,7 +348,15 @@ class FileManager(QObject):
         if os.path.exists(root_candidate):
             return root_candidate
 
-        # 5. Recursive Search
+        # 5. Basename map lookup
+        if self.name_map.loaded:
+            for rel_path in self.name_map.lookup(filename):
+                candidate = self._get_abs_path(rel_path)
+                if os.path.exists(candidate):
+                    return candidate
+            return None
+
+        # 6. Recursive Search (index not built yet)
         for root, dirs, files in os.walk(self.root_path):
             # Skip hidden
             dirs[:] = [d for d in dirs if not d.startswith('.')]
@@ -130,6 +369,14 @@ class FileManager(QObject):
         """
         Returns a flat list of files for the tree builder.
         """
+        if self.index.is_ready():
+            return [{
+                'id': e['path'],
+                'title': e['title'],
+                'is_folder': e['kind'] == KIND_FOLDER,
+                'parent_id': e['parent']
+            } for e in self.index.list_entries((KIND_FOLDER, KIND_NOTE, KIND_IMAGE))]
+
         items = []
         
         for root, dirs, files in os.walk(self.root_path):
@@ -185,101 +432,142 @@ class FileManager(QObject):
         Returns children of a specific directory (lazy loading).
         parent_rel_path: relative path to root. None for root.
         """
-        if parent_rel_path is None:
-            abs_path = self.root_path
-        else:
-            abs_path = self._get_abs_path(parent_rel_path)
-            
-        if not os.path.exists(abs_path) or not os.path.isdir(abs_path):
-            return []
-            
-        items = []
-        try:
-            with os.scandir(abs_path) as it:
-                for entry in it:
-                     if entry.name.startswith('.'): 
-                         continue
-                     
-
-                     if entry.is_dir():
-                         rel_path = self._get_rel_path(entry.path)
-                         items.append({
-                             'id': rel_path,
-                             'title': entry.name,
-                             'is_folder': True
-                         })
-                     elif entry.is_file():
-                         is_md = entry.name.endswith('.md')
-                         is_image = entry.name.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp'))
-                         
-                         if is_md or is_image:
-                             rel_path = self._get_rel_path(entry.path)
-                             items.append({
-                                 'id': rel_path,
-                                 'title': os.path.splitext(entry.name)[0] if is_md else entry.name,
-                                 'is_folder': False
-                             })
-                         
-            # Sort: Folders first, then items, alphabetical
-            items.sort(key=lambda x: (not x['is_folder'], x['title'].lower()))
-            return items
-        except Exception as e:
-            print(f"Error listing children of {abs_path}: {e}")
-            return []
+        return self.dir_lister.list_sync(parent_rel_path)
+
+    def get_children_async(self, parent_rel_path: Optional[str], on_batch, on_done) -> int:
+        """
+        Same listing as get_children, scanned on a worker thread and delivered to
+        on_batch(items) in batches on the GUI thread, followed by on_done(success).
+        """
+        return self.dir_lister.list_async(parent_rel_path, on_batch, on_done)
+
+    def cancel_children_async(self, request_id: int):
+        self.dir_lister.cancel(request_id)
 
     def read_note(self, rel_path: str) -> Optional[str]:
         """Reads content of a markdown file."""
+        # A queued save is newer than what is on disk
+        pending = self.save_queue.pending_content(rel_path)
+        if pending is not None:
+            return pending
         path = self._get_abs_path(rel_path)
-        if not os.path.exists(path):
-            return None
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return f.read()
+            return self.note_cache.read(path)
         except Exception as e:
             print(f"Error reading file {path}: {e}")
             return None
 
-    def read_note_async(self, rel_path: str, callback):
-        """Reads content of a markdown file asynchronously using QThread."""
-        path = self._get_abs_path(rel_path)
-        req_id = str(uuid.uuid4())
-        self._callbacks[req_id] = callback
-        self.read_requested.emit(req_id, path)
-
-    @Slot(str, object)
-    def _on_read_finished(self, req_id, content):
-        is_main = QThread.currentThread() == QApplication.instance().thread()
-        print(f"DEBUG FileManager [Thread {QThread.currentThread()}]: _on_read_finished for {req_id}. Is Main? {is_main}")
-        
-        if req_id in self._callbacks:
-            callback = self._callbacks.pop(req_id)
-            if callback:
-                print("DEBUG FileManager: Executing callback...")
-                # Callback is already running in MainThread because FileManager lives in MainThread
-                # and signal connection is Auto/Queued.
-                try:
-                    callback(content)
-                    print("DEBUG FileManager: Callback finished.")
-                except Exception as e:
-                     print(f"DEBUG FileManager: Error in callback: {e}")
+    def read_note_async(self, rel_path: str, callback, owner=None, priority=READ_PRIORITY_FOREGROUND):
+        """
+        Reads content of a markdown file on the reader pool; callback(content) runs on the GUI thread.
+        owner: a new request from the same owner (e.g. an editor) cancels its previous one.
+        Returns the request id (for cancel_read) or None when served without a read.
+        """
+        pending = self.save_queue.pending_content(rel_path)
+        if pending is not None:
+            if owner is not None:
+                self.read_scheduler.cancel_owner(owner)
+            QTimer.singleShot(0, lambda: callback(pending))
+            return None
+        return self.read_scheduler.request(self._get_abs_path(rel_path), callback, priority, owner)
+
+    def should_stream(self, rel_path: str) -> bool:
+        """True for notes big enough to be streamed (and not waiting in the save queue)."""
+        if self.save_queue.pending_content(rel_path) is not None:
+            return False
+        try:
+            return os.path.getsize(self._get_abs_path(rel_path)) >= STREAM_THRESHOLD
+        except OSError:
+            return False
+
+    def read_note_stream_async(self, rel_path: str, on_chunk, on_done, owner=None):
+        """
+        Streams a large note: on_chunk(text) is called on the GUI thread for each decoded
+        piece (ending on a line boundary), then on_done(ok). Peak memory stays at one chunk.
+        """
+        return self.read_scheduler.request_stream(self._get_abs_path(rel_path), iter_text_chunks,
+                                                  on_chunk, on_done, owner=owner)
+
+    def prefetch_note(self, rel_path: str):
+        """Low priority background read; runs after every pending foreground read."""
+        return self.read_scheduler.request(self._get_abs_path(rel_path), None, READ_PRIORITY_PREFETCH)
+
+    def cancel_read(self, request_id):
+        self.read_scheduler.cancel(request_id)
+
+    def _read_file(self, path):
+        return self.note_cache.read(path)
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Note cache counters: hits, misses, entries, bytes."""
+        return self.note_cache.stats()
 
     def cleanup(self):
         """Call this on app exit to stop thread."""
-        if self.loader_thread.isRunning():
-            self.loader_thread.quit()
-            self.loader_thread.wait()
+        self.watcher.stop()
+        # Flush-on-exit: every queued save reaches the disk before we return
+        if self.save_queue.isRunning():
+            self.save_queue.stop()
+            self.save_queue.wait()
+        self.save_queue.flush()
+        self.config.flush()
+        self.read_scheduler.shutdown()
+        self.dir_lister.shutdown()
+        self.link_rewriter.shutdown()
+        self.search_runner.shutdown()
+        if self.index_builder.isRunning():
+            self.index_builder.stop()
+            self.index_builder.wait()
+        if self.title_index_builder is not None:
+            self.title_index_builder.wait()
+        if self.content_indexer.isRunning():
+            self.content_indexer.stop()
+            self.content_indexer.wait()
+        self.index.close()
+        self.search_index.close_thread_connection()
+        self.link_index.close_thread_connection()
+        self.stats_index.close_thread_connection()
 
     def save_note(self, rel_path: str, content: str) -> bool:
-        """Saves content to a markdown file."""
+        """Saves content to a markdown file right away (atomic write)."""
         path = self._get_abs_path(rel_path)
         try:
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            rel_path = self._get_rel_path(path)
+            self.save_queue.write_now(rel_path, content)
+            self.saves_written += 1
+            self._update_indexes_after_save(rel_path, content)
             return True
         except Exception as e:
             print(f"Error saving file {path}: {e}")
             return False
 
+    def save_note_async(self, rel_path: str, content: str) -> bool:
+        """
+        Queues a save on the background writer and returns immediately.
+        Saves of the same note that are still queued are merged; note_saved reports the result.
+        """
+        rel_path = self._get_rel_path(self._get_abs_path(rel_path))
+        self.save_queue.enqueue(rel_path, content)
+        self.saves_written += 1
+        return True
+
+    def record_skipped_save(self):
+        """Counts a save request that was skipped because the note had not changed."""
+        self.saves_skipped += 1
+
+    @Slot(str, bool)
+    def _on_note_saved(self, rel_path, success):
+        if success:
+            self._update_indexes_after_save(rel_path)
+        self.note_saved.emit(rel_path, success)
+
+    def _update_indexes_after_save(self, rel_path: str, content: str = None):
+        if self.index.upsert_path(rel_path):
+            self.name_map.add(rel_path)
+            self.title_index.add(rel_path)
+        if rel_path.endswith('.md'):
+            self.content_indexer.enqueue(rel_path, content)
+
     def create_note(self, rel_path: str, is_folder: bool = False) -> bool:
         """Creates a new note or folder."""
         path = self._get_abs_path(rel_path)
@@ -292,6 +580,7 @@ class FileManager(QObject):
                 if not path.endswith('.md'): path += '.md'
                 with open(path, 'w', encoding='utf-8') as f:
                     f.write("")
+            self._index_refresh_parent(self._get_rel_path(path))
             return True
         except Exception as e:
             print(f"Error creating {path}: {e}")
@@ -299,13 +588,21 @@ class FileManager(QObject):
             
     def delete_item(self, rel_path: str):
         path = self._get_abs_path(rel_path)
+        self.save_queue.discard(self._get_rel_path(path))
         if os.path.isdir(path):
             shutil.rmtree(path)
         else:
             os.remove(path)
+        self.index.remove_path(self._get_rel_path(path))
+        self.name_map.discard(self._get_rel_path(path))
+        self.title_index.discard(self._get_rel_path(path))
+        self.content_indexer.enqueue_removal(self._get_rel_path(path))
             
     def rename_item(self, old_rel_path: str, new_name: str) -> str:
         """Returns new relative path."""
+        # Queued saves still target the old path (batch() flushes once up front)
+        if not self._batch_depth:
+            self.save_queue.flush()
         old_path = self._get_abs_path(old_rel_path)
         parent = os.path.dirname(old_path)
         
@@ -318,10 +615,13 @@ class FileManager(QObject):
                 
         new_path = os.path.join(parent, new_name)
         os.rename(old_path, new_path)
+        self._index_refresh_parent(self._get_rel_path(new_path))
         return self._get_rel_path(new_path)
 
     def move_item(self, rel_path: str, new_parent_rel_path: Optional[str]) -> Optional[str]:
         """Moves an item to a new parent directory."""
+        if not self._batch_depth:
+            self.save_queue.flush()
         old_path = self._get_abs_path(rel_path)
         if new_parent_rel_path:
             new_parent_path = self._get_abs_path(new_parent_rel_path)
@@ -333,7 +633,8 @@ class FileManager(QObject):
         
         try:
             shutil.move(old_path, new_path)
-            # Indexer update removed (watcher handles it)
+            self._index_refresh_parent(self._get_rel_path(old_path))
+            self._index_refresh_parent(self._get_rel_path(new_path))
             return self._get_rel_path(new_path)
         except Exception as e:
             print(f"Error moving {old_path} to {new_path}: {e}")
@@ -359,56 +660,181 @@ class FileManager(QObject):
         with open(path, 'wb') as f:
             f.write(data)
             
+        self._index_refresh_parent(self._get_rel_path(path))
         return self._get_rel_path(path)
 
-    def search_content(self, query: str) -> List[Dict]:
+    # --- Links ---
+
+    def get_backlinks(self, rel_path: str) -> List[Dict]:
         """
-        Simple file-system based full text search.
-        Case-insensitive.
-        Returns list of {'path': rel_path, 'title': title, 'snippet': snippet}
+        Wikilinks from other notes that point at rel_path, from the link index.
+        Returns list of {'path', 'target', 'embed', 'line', 'context'} sorted by path and line.
         """
-        query = query.lower()
-        results = []
-        
-        # Limit results for performance
-        MAX_RESULTS = 50
-        
-        for root, dirs, files in os.walk(self.root_path):
-            # Skip hidden
-            dirs[:] = [d for d in dirs if not d.startswith('.')]
-            
-            for f in files:
-                if not f.endswith('.md'): continue
-                
-                path = os.path.join(root, f)
-                rel_path = os.path.relpath(path, self.root_path)
-                
-                try:
-                    with open(path, 'r', encoding='utf-8', errors='ignore') as file_obj:
-                        content = file_obj.read()
-                        
-                        lower_content = content.lower()
-                        if query in lower_content:
-                            # Create Snippet
-                            idx = lower_content.find(query)
-                            start = max(0, idx - 40)
-                            end = min(len(content), idx + len(query) + 40)
-                            snippet = content[start:end].replace('\n', ' ')
-                            
-                            # Highlight match in snippet (HTML bold)
-                            # We need to do this carefully on the original case text
-                            # A simple replace on snippet might miss case, but for now:
-                            # snippet = snippet.replace(query, f"<b>{query}</b>") # Case issue
-                            
-                            results.append({
-                                'path': rel_path,
-                                'title': os.path.splitext(f)[0],
-                                'snippet': f"...{snippet}..."
-                            })
-                            
-                            if len(results) >= MAX_RESULTS:
-                                return results
-                except Exception as e:
-                    print(f"Error searching {rel_path}: {e}")
-                    
-        return results
+        if not self.link_index.available:
+            return []
+        return self.link_index.backlinks(rel_path)
+
+    def get_outgoing_links(self, rel_path: str) -> List[Dict]:
+        """Wikilinks written in rel_path: list of {'target', 'embed', 'line', 'context'}."""
+        if not self.link_index.available:
+            return []
+        return self.link_index.outgoing(rel_path)
+
+    def rewrite_inbound_links(self, old_rel_path: str, new_rel_path: str) -> Optional[int]:
+        """
+        After a rename, retargets the [[old]] / ![[old.png]] links of the vault to the new name
+        in the background (see LinkRewriter). Candidates come from the link index plus the notes
+        still queued for indexing; before the index is built every note is scanned.
+        Folders are skipped: links resolve by basename, which a folder rename keeps.
+        Returns the job id, or None when nothing has to be rewritten.
+        """
+        if os.path.isdir(self._get_abs_path(new_rel_path)):
+            return None
+        if self.link_index.is_ready():
+            paths = set(self.link_index.linking_notes(old_rel_path))
+            paths.update(self.content_indexer.pending_paths())
+            paths.discard(old_rel_path)
+            if new_rel_path.endswith('.md'):
+                paths.add(new_rel_path) # links of the note to itself
+            paths = sorted(p for p in paths if p.endswith('.md'))
+        else:
+            paths = [rel_path for _path, rel_path in self._iter_note_paths()]
+        return self.link_rewriter.start(old_rel_path, new_rel_path, paths)
+
+    @Slot(str, str, list, int)
+    def _on_links_rewritten(self, old_rel_path, new_rel_path, paths, links):
+        for rel_path in paths:
+            self.note_cache.invalidate(self._get_abs_path(rel_path))
+            self._update_indexes_after_save(rel_path)
+        self.links_rewritten.emit(old_rel_path, new_rel_path, paths, links)
+
+    # --- Statistics ---
+
+    def get_vault_stats(self, days: int = 30) -> Dict:
+        """
+        Dashboard data from the stats index (no note is read):
+        {'ready', 'totals': {metric: n}, 'daily': [(date, {metric: delta})], 'top_notes': [(rel_path, words)]}
+        """
+        if not self.stats_index.available:
+            return {'ready': False, 'totals': {}, 'daily': [], 'top_notes': []}
+        return {
+            'ready': self.stats_index.is_ready() and self.content_synced,
+            'totals': self.stats_index.totals(),
+            'daily': self.stats_index.daily(days),
+            'top_notes': self.stats_index.top_notes('words', 10),
+        }
+
+    def get_note_stats(self, rel_path: str) -> Optional[Dict[str, int]]:
+        """Counts of one note (words, chars, headings, images, links, bytes), None if not indexed."""
+        if not self.stats_index.available:
+            return None
+        return self.stats_index.note(rel_path)
+
+    def _search_candidates(self, query: SearchQuery, reuse: bool = False):
+        """
+        (abs_path, rel_path, score) of the notes that may match the query, best first:
+        planned against the inverted index when it is built, otherwise every note (score 0).
+        reuse: serve the plan of the previous call for the same query (next pages).
+        """
+        if self.search_index.is_ready():
+            cached = self._ranked_cache
+            if reuse and cached is not None and cached[0] == query.text:
+                return cached[1]
+            candidates = [(self._get_abs_path(p), p, score) for p, score in query.plan(self.search_index)]
+            self._ranked_cache = (query.text, candidates)
+            return candidates
+        return ((path, rel_path, 0.0) for path, rel_path in self._iter_note_paths())
+
+    def _read_for_search(self, path: str) -> Optional[str]:
+        try:
+            return self.note_cache.read(path)
+        except UnicodeDecodeError:
+            return self.note_cache.read(path, errors='ignore')
+
+    def iter_search_hits(self, query: str, cancelled=None, offset: int = 0):
+        """
+        Yields {'path', 'title', 'snippet', 'snippets', 'score', 'rank'} for every note
+        matching the query (see app.storage.search_query for the syntax), best first.
+        Candidates are planned against the inverted index and only read (to verify
+        them and cut the highlighted snippets) as hits are consumed; cancelled() is
+        polled before each read. Raises QueryError for an invalid query.
+        offset: rank to start from, i.e. the 'rank' of the last hit of the previous page + 1.
+        """
+        parsed = SearchQuery(query)
+        if parsed.is_empty():
+            return
+        patterns = parsed.highlight_patterns()
+        candidates = self._search_candidates(parsed, reuse=offset > 0)
+        for rank, (path, rel_path, score) in islice(enumerate(candidates), offset, None):
+            if cancelled is not None and cancelled():
+                return
+            f = os.path.basename(rel_path)
+            try:
+                note = NoteText(rel_path, lambda path=path: self._read_for_search(path))
+                if parsed.matches(note):
+                    # Matches in <b>, cut from the original text (case preserved).
+                    # Notes matched on their path alone are not read.
+                    snippets = make_snippets(note.content, patterns) if note.loaded else []
+                    yield {
+                        'path': rel_path,
+                        'title': os.path.splitext(f)[0],
+                        'snippet': snippets[0] if snippets else "",
+                        'snippets': snippets,
+                        'score': score,
+                        'rank': rank,
+                    }
+            except Exception as e:
+                print(f"Error searching {rel_path}: {e}")
+
+    def search_content(self, query: str, offset: int = 0) -> List[Dict]:
+        """
+        Full text search, one page of SEARCH_PAGE_SIZE hits. Candidates come from the
+        inverted index (BM25 order) and are then verified against the note text.
+        Raises QueryError for an invalid query.
+        Returns list of hit dicts (see iter_search_hits).
+        """
+        return list(islice(self.iter_search_hits(query, offset=offset), SEARCH_PAGE_SIZE))
+
+    def search_content_async(self, query: str, on_batch, on_done, offset: int = 0) -> int:
+        """
+        Same page as search_content, run on a worker: on_batch(hits) receives the
+        hits on the GUI thread as they are found, then on_done(total).
+        Returns a request id for cancel_search.
+        """
+        return self.search_runner.start(query, on_batch, on_done, SEARCH_PAGE_SIZE, offset)
+
+    def cancel_search(self, request_id: int):
+        self.search_runner.cancel(request_id)
+
+    def _close_search_connections(self):
+        # Runs on the search worker after each query: index connections are per thread
+        self.search_index.close_thread_connection()
+        self.index.close_thread_connection()
+
+    # --- Quick switcher ---
+
+    def search_note_titles(self, query: str, limit: int = 50) -> List[str]:
+        """Notes whose path/title fuzzily match the query, best first; recent notes for an empty query."""
+        return self.title_index.search(query, limit)
+
+    def record_note_opened(self, rel_path: str):
+        """Boosts a note in the quick switcher ranking (remembered in config.json)."""
+        self.title_index.touch(rel_path)
+        self.config.save_config("recent_notes", self.title_index.recent())
+
+    # --- Reading positions ---
+
+    def note_position(self, rel_path: str) -> Optional[Tuple[float, str]]:
+        """(ratio of the document, text of the first visible line) the note was left at, or None."""
+        position = self.config.get("note_positions", {}).get(rel_path)
+        return tuple(position) if position else None
+
+    def record_note_position(self, rel_path: str, ratio: float, line: str):
+        """Remembers where a note was scrolled to (config.json); the top is not stored."""
+        positions = dict(self.config.get("note_positions", {}))
+        positions.pop(rel_path, None)
+        if ratio > 0:
+            positions[rel_path] = [round(ratio, 5), line]
+        while len(positions) > MAX_NOTE_POSITIONS:
+            positions.pop(next(iter(positions)))
+        self.config.save_config("note_positions", positions)
@@ -0,0 +1,211 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from app.storage.vault_index import get_index_dir
+
+LINKS_DB_NAME = "links.db"
+SCHEMA_VERSION = "1"
+
+# [[Note]], [[folder/Note|alias]], [[Note#Heading]], ![[image.png]]
+WIKILINK_RE = re.compile(r"(!?)\[\[([^\[\]\n]+?)\]\]")
+# Characters of the source line kept as context for the backlinks panel
+CONTEXT_CHARS = 160
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS links (
+    src_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    target TEXT NOT NULL,
+    embed INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    context TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_links_key ON links(key);
+CREATE INDEX IF NOT EXISTS idx_links_src ON links(src_id);
+"""
+
+
+def link_key(target: str) -> str:
+    """
+    Case-insensitive name a wikilink resolves by: the basename, without '.md' for notes.
+    [[Folder/Note]] and [[note]] share the key 'note'; ![[img.PNG]] has 'img.png'.
+    """
+    name = target.replace('\\', '/').rsplit('/', 1)[-1].strip().lower()
+    return name[:-3] if name.endswith('.md') else name
+
+
+def split_target(inner: str) -> str:
+    """Link target of the text between [[ ]], without alias (|) or heading (#)."""
+    return inner.split('|', 1)[0].split('#', 1)[0].strip()
+
+
+def parse_links(content: str) -> List[Tuple[str, str, bool, int, str]]:
+    """(key, target, embed, line, context) of every wikilink; [[#Heading]] anchors are skipped."""
+    links = []
+    for line_no, line in enumerate(content.split('\n')):
+        if '[[' not in line:
+            continue
+        for match in WIKILINK_RE.finditer(line):
+            target = split_target(match.group(2))
+            if not target:
+                continue
+            links.append((link_key(target), target, bool(match.group(1)), line_no,
+                          line.strip()[:CONTEXT_CHARS]))
+    return links
+
+
+def target_matches(target: str, rel_path: str) -> bool:
+    """True if a link target can point at rel_path (a folder part must match the path's tail)."""
+    target = target.replace('\\', '/').strip('/').lower()
+    path = rel_path.replace(os.sep, '/').lower()
+    if '/' not in target:
+        return True
+    if path.endswith('.md') and not target.endswith('.md'):
+        path = path[:-3]
+    return path == target or path.endswith('/' + target)
+
+
+class LinkIndex:
+    """
+    Wikilink graph of the vault (.cogny/links.db): one row per [[link]] / ![[embed]]
+    with its source note, resolved by basename key, so both outgoing links and
+    backlinks are single indexed lookups.
+
+    Fed by the ContentIndexer like the search index (saves and watcher events).
+    """
+    def __init__(self, root_path: str):
+        self.root_path = os.path.abspath(root_path)
+        self.db_path = os.path.join(get_index_dir(self.root_path), LINKS_DB_NAME)
+        self._local = threading.local()
+        self.available = False
+        self._ready = False
+
+        try:
+            os.makedirs(get_index_dir(self.root_path), exist_ok=True)
+            conn = self._conn()
+            conn.executescript(_SCHEMA)
+            if self._get_meta(conn, "schema_version") != SCHEMA_VERSION:
+                with conn:
+                    conn.execute("DELETE FROM links")
+                    conn.execute("DELETE FROM docs")
+                    conn.execute("DELETE FROM meta")
+                    self._set_meta(conn, "schema_version", SCHEMA_VERSION)
+            self._ready = self._get_meta(conn, "built") == "1"
+            self.available = True
+        except Exception as e:
+            print(f"Error opening link index {self.db_path}: {e}")
+
+    # --- Connections ---
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close_thread_connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
+    @staticmethod
+    def _get_meta(conn, key) -> Optional[str]:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _set_meta(conn, key, value):
+        conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, value))
+
+    def is_ready(self) -> bool:
+        return self.available and self._ready
+
+    def mark_built(self):
+        conn = self._conn()
+        with conn:
+            self._set_meta(conn, "built", "1")
+        self._ready = True
+
+    # --- Updates (called from the ContentIndexer thread) ---
+
+    def doc_states(self) -> Dict[str, Tuple[int, int]]:
+        """{rel_path: (size, mtime)} of every indexed note."""
+        return {path: (size, mtime) for path, size, mtime in
+                self._conn().execute("SELECT path, size, mtime FROM docs")}
+
+    def commit(self):
+        self._conn().commit()
+
+    def index_note(self, rel_path: str, content: str, size: int, mtime: int, commit: bool = True):
+        """Replaces the outgoing links of one note."""
+        conn = self._conn()
+        row = conn.execute("SELECT id FROM docs WHERE path = ?", (rel_path,)).fetchone()
+        if row:
+            doc_id = row[0]
+            conn.execute("DELETE FROM links WHERE src_id = ?", (doc_id,))
+            conn.execute("UPDATE docs SET size = ?, mtime = ? WHERE id = ?", (size, mtime, doc_id))
+        else:
+            doc_id = conn.execute("INSERT INTO docs(path, size, mtime) VALUES (?, ?, ?)",
+                                  (rel_path, size, mtime)).lastrowid
+        conn.executemany("INSERT INTO links(src_id, key, target, embed, line, context) VALUES (?, ?, ?, ?, ?, ?)",
+                         ((doc_id, key, target, int(embed), line, context)
+                          for key, target, embed, line, context in parse_links(content)))
+        if commit:
+            conn.commit()
+
+    def remove_note(self, rel_path: str, commit: bool = True):
+        """Removes a note, or every note under a folder path."""
+        prefix = rel_path + os.sep
+        conn = self._conn()
+        ids = [(r[0],) for r in conn.execute(
+            "SELECT id FROM docs WHERE path = ? OR substr(path, 1, ?) = ?",
+            (rel_path, len(prefix), prefix))]
+        if ids:
+            conn.executemany("DELETE FROM links WHERE src_id = ?", ids)
+            conn.executemany("DELETE FROM docs WHERE id = ?", ids)
+        if commit:
+            conn.commit()
+
+    # --- Queries ---
+
+    def outgoing(self, rel_path: str) -> List[Dict]:
+        """Links written in a note, in document order."""
+        rows = self._conn().execute(
+            "SELECT l.target, l.embed, l.line, l.context FROM links l JOIN docs d ON d.id = l.src_id "
+            "WHERE d.path = ? ORDER BY l.line", (rel_path,))
+        return [{'target': target, 'embed': bool(embed), 'line': line, 'context': context}
+                for target, embed, line, context in rows]
+
+    def backlinks(self, rel_path: str) -> List[Dict]:
+        """Links from other notes that resolve to rel_path (a note or an image)."""
+        rows = self._conn().execute(
+            "SELECT d.path, l.target, l.embed, l.line, l.context FROM links l JOIN docs d ON d.id = l.src_id "
+            "WHERE l.key = ? ORDER BY d.path, l.line", (link_key(os.path.basename(rel_path)),))
+        return [{'path': path, 'target': target, 'embed': bool(embed), 'line': line, 'context': context}
+                for path, target, embed, line, context in rows
+                if path != rel_path and target_matches(target, rel_path)]
+
+    def linking_notes(self, rel_path: str) -> List[str]:
+        """Distinct notes that link to rel_path."""
+        seen = []
+        for link in self.backlinks(rel_path):
+            if link['path'] not in seen:
+                seen.append(link['path'])
+        return seen
@@ -0,0 +1,168 @@
+import os
+import re
+from itertools import count
+from typing import Iterable, List, Tuple
+from PySide6.QtCore import QObject, QRunnable, QThread, QThreadPool, QTimer, Signal, Slot, Qt
+
+from app.storage.link_index import link_key, target_matches
+from app.storage.save_queue import atomic_write
+
+# Upper bound of notes handled per worker task (progress is reported per task)
+REWRITE_CHUNK_SIZE = 64
+# Workers are mostly waiting on reads and fsyncs, so use more than one per core
+MIN_REWRITE_THREADS = 8
+
+# WIKILINK_RE without the optional '!': a literal start lets the regex engine skip ahead
+_LINK_BODY_RE = re.compile(r"\[\[([^\[\]\n]+?)\]\]")
+
+
+def _new_target(target: str, new_rel: str) -> str:
+    """How a link written as `target` should name new_rel: same qualification and extension style."""
+    new_path = new_rel.replace(os.sep, '/')
+    if '/' not in target.replace('\\', '/'):
+        new_path = new_path.rsplit('/', 1)[-1]
+    if new_path.endswith('.md') and not target.lower().endswith('.md'):
+        new_path = new_path[:-3]
+    return new_path
+
+
+def link_replacements(content: str, old_rel: str, new_rel: str) -> List[Tuple[int, int, str]]:
+    """
+    (start, end, text) spans that retarget the wikilinks resolving to old_rel so they
+    point at new_rel. Aliases (|) and headings (#) are kept; spans are in text order.
+    """
+    old_key = link_key(os.path.basename(old_rel))
+    spans = []
+    for match in _LINK_BODY_RE.finditer(content):
+        inner = match.group(1)
+        cut = len(inner)
+        for sep in '|#':
+            i = inner.find(sep)
+            if i != -1:
+                cut = min(cut, i)
+        target = inner[:cut].strip()
+        if not target or link_key(target) != old_key or not target_matches(target, old_rel):
+            continue
+        new_target = _new_target(target, new_rel)
+        if new_target != target:
+            start = match.start(1)
+            spans.append((start, start + cut, new_target))
+    return spans
+
+
+def rewrite_links(content: str, old_rel: str, new_rel: str) -> Tuple[str, int]:
+    """Content with the links to old_rel retargeted, and the number of links changed."""
+    spans = link_replacements(content, old_rel, new_rel)
+    if not spans:
+        return content, 0
+    parts = []
+    last = 0
+    for start, end, text in spans:
+        parts.append(content[last:start])
+        parts.append(text)
+        last = end
+    parts.append(content[last:])
+    return "".join(parts), len(spans)
+
+
+class _RewriteSignals(QObject):
+    done = Signal(int, object) # job_id, [(rel_path, links rewritten or -1 on error)]
+
+
+class _RewriteTask(QRunnable):
+    def __init__(self, job_id, root_path, paths, old_rel, new_rel):
+        super().__init__()
+        self.job_id = job_id
+        self.root_path = root_path
+        self.paths = paths
+        self.old_rel = old_rel
+        self.new_rel = new_rel
+        self.signals = _RewriteSignals()
+
+    def run(self):
+        old_key = link_key(os.path.basename(self.old_rel))
+        results = []
+        for rel_path in self.paths:
+            path = os.path.join(self.root_path, rel_path)
+            try:
+                with open(path, 'r', encoding='utf-8', newline='') as f:
+                    content = f.read()
+                # Cheap reject before the regex: a full scan reads every note
+                if '[[' not in content or old_key not in content.lower():
+                    results.append((rel_path, 0))
+                    continue
+                new_content, rewritten = rewrite_links(content, self.old_rel, self.new_rel)
+                if rewritten:
+                    # Read untranslated above: keep the note's own line endings
+                    atomic_write(path, new_content, newline='')
+                results.append((rel_path, rewritten))
+            except Exception as e:
+                print(f"Error rewriting links in {rel_path}: {e}")
+                results.append((rel_path, -1))
+        self.signals.done.emit(self.job_id, results)
+
+
+class LinkRewriter(QObject):
+    """
+    Retargets the wikilinks of a renamed note or image across the vault.
+
+    The candidate notes are split in chunks over a worker pool; every note that
+    changes is written atomically. progress() is emitted as chunks complete and
+    finished() once per job, on the GUI thread.
+    """
+    progress = Signal(int, int) # notes processed, total
+    finished = Signal(str, str, list, int) # old_rel, new_rel, rewritten rel_paths, links rewritten
+
+    def __init__(self, root_path: str):
+        super().__init__()
+        self.root_path = os.path.abspath(root_path)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max(MIN_REWRITE_THREADS, QThread.idealThreadCount()))
+        self._ids = count(1)
+        self._jobs = {} # job_id -> progress state
+
+    def start(self, old_rel: str, new_rel: str, paths: Iterable[str]) -> int:
+        """Rewrites the links to old_rel in `paths` (notes, relative). Returns a job id."""
+        paths = list(paths)
+        job_id = next(self._ids)
+        job = {'old': old_rel, 'new': new_rel, 'total': len(paths), 'done': 0, 'tasks': 0,
+               'rewritten': [], 'links': 0, 'errors': 0}
+        self._jobs[job_id] = job
+
+        # Enough chunks to keep every worker busy, small enough for steady progress
+        size = max(1, min(REWRITE_CHUNK_SIZE, -(-len(paths) // self.pool.maxThreadCount())))
+        for i in range(0, len(paths), size):
+            task = _RewriteTask(job_id, self.root_path, paths[i:i + size], old_rel, new_rel)
+            task.signals.done.connect(self._on_task_done, Qt.QueuedConnection)
+            job['tasks'] += 1
+            self.pool.start(task)
+        if not job['tasks']:
+            QTimer.singleShot(0, lambda: self._finish(job_id))
+        return job_id
+
+    def shutdown(self):
+        self.pool.waitForDone()
+        self._jobs.clear()
+
+    @Slot(int, object)
+    def _on_task_done(self, job_id, results):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        for rel_path, rewritten in results:
+            if rewritten > 0:
+                job['rewritten'].append(rel_path)
+                job['links'] += rewritten
+            elif rewritten < 0:
+                job['errors'] += 1
+        job['done'] += len(results)
+        job['tasks'] -= 1
+        self.progress.emit(job['done'], job['total'])
+        if not job['tasks']:
+            self._finish(job_id)
+
+    def _finish(self, job_id):
+        job = self._jobs.pop(job_id, None)
+        if job is None:
+            return
+        self.finished.emit(job['old'], job['new'], sorted(job['rewritten']), job['links'])
@@ -0,0 +1,65 @@
+import os
+import threading
+from typing import Dict, Iterable, List
+
+
+class BasenameMap:
+    """
+    In-memory basename -> [relative paths] lookup for every file in the vault.
+    Used to resolve wikilinks like ![[image.png]] in O(1) wherever the file lives.
+
+    Loaded from the vault index and kept up to date by FileManager from watcher
+    events. Image loader threads read it concurrently, so access is locked.
+    """
+    def __init__(self):
+        self._names: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def load(self, rel_paths: Iterable[str]):
+        """Replaces the whole map. Shorter (shallower) paths come first for each name."""
+        names: Dict[str, List[str]] = {}
+        for rel_path in rel_paths:
+            names.setdefault(os.path.basename(rel_path), []).append(rel_path)
+        for paths in names.values():
+            paths.sort(key=len)
+        with self._lock:
+            self._names = names
+            self.loaded = True
+
+    def add(self, rel_path: str):
+        name = os.path.basename(rel_path)
+        with self._lock:
+            paths = self._names.setdefault(name, [])
+            if rel_path not in paths:
+                paths.append(rel_path)
+                paths.sort(key=len)
+
+    def discard(self, rel_path: str):
+        """Removes a file, or every file under a folder path."""
+        prefix = rel_path + os.sep
+        with self._lock:
+            name = os.path.basename(rel_path)
+            paths = self._names.get(name)
+            if paths and rel_path in paths:
+                paths.remove(rel_path)
+                if not paths:
+                    del self._names[name]
+                return
+
+            # Not a known file: treat it as a folder and drop its subtree
+            for name in list(self._names):
+                kept = [p for p in self._names[name] if not p.startswith(prefix)]
+                if kept:
+                    self._names[name] = kept
+                else:
+                    del self._names[name]
+
+    def lookup(self, name: str) -> List[str]:
+        """Relative paths of every file called `name`, shallowest first."""
+        with self._lock:
+            return list(self._names.get(name, ()))
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(paths) for paths in self._names.values())
@@ -0,0 +1,85 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Decoded text kept in memory across all cached notes
+NOTE_CACHE_BUDGET = 64 * 1024 * 1024
+
+
+class NoteCache:
+    """
+    Byte-budgeted LRU cache of decoded note text, keyed by absolute path.
+
+    Every hit is validated against os.stat (size + mtime), so an external edit is
+    never served stale even if its watcher event has not arrived yet; watcher events
+    additionally drop entries early. Shared by the GUI thread, the reader pool and
+    export workers, hence the lock.
+    """
+    def __init__(self, max_bytes: int = NOTE_CACHE_BUDGET):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # path -> (content, size, mtime_ns, cost)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def read(self, path: str, errors: str = 'strict') -> Optional[str]:
+        """Returns the text of a file, from memory when it is unchanged on disk."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.invalidate(path)
+            return None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[1] == st.st_size and entry[2] == st.st_mtime_ns:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        with open(path, 'r', encoding='utf-8', errors=errors) as f:
+            st = os.fstat(f.fileno())
+            content = f.read()
+        if errors == 'strict':
+            # Lossy decodes are never cached, so read_note keeps its strict semantics
+            self._put(path, content, st.st_size, st.st_mtime_ns)
+        return content
+
+    def _put(self, path, content, size, mtime_ns):
+        cost = sys.getsizeof(content)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._bytes -= old[3]
+            self._entries[path] = (content, size, mtime_ns, cost)
+            self._bytes += cost
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[3]
+
+    def invalidate(self, path: str):
+        """Drops a file, or every cached file under a folder path."""
+        prefix = path + os.sep
+        with self._lock:
+            for key in [k for k in self._entries if k == path or k.startswith(prefix)]:
+                self._bytes -= self._entries.pop(key)[3]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
@@ -0,0 +1,46 @@
+import codecs
+import mmap
+import os
+from typing import Iterator
+
+# Notes at least this big are streamed into the editor instead of read in one go
+STREAM_THRESHOLD = 1024 * 1024
+# Bytes decoded per step; each yielded chunk ends on a line boundary
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def _universal_newlines(text: str) -> str:
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def iter_text_chunks(path: str, chunk_bytes: int = STREAM_CHUNK_BYTES) -> Iterator[str]:
+    """
+    Yields the UTF-8 text of a file in pieces without materializing the whole string.
+
+    The file is memory-mapped and fed to an incremental decoder, so multi-byte
+    characters split across slices are handled. Line endings are translated to
+    '\n' like a text-mode read (read_note) does. Every chunk except the last ends
+    with a newline, which keeps markdown constructs (![[...]], table rows) whole.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            carry = ""
+            for offset in range(0, size, chunk_bytes):
+                text = carry + decoder.decode(mm[offset:offset + chunk_bytes])
+                # A trailing '\r' may be half of a '\r\n' split across slices
+                held = '\r' if text.endswith('\r') else ""
+                text = _universal_newlines(text[:len(text) - len(held)])
+                cut = text.rfind('\n') + 1
+                if cut == 0:
+                    # A single very long line: keep accumulating
+                    carry = text + held
+                    continue
+                carry = text[cut:] + held
+                yield text[:cut]
+            tail = _universal_newlines(carry + decoder.decode(b"", final=True))
+            if tail:
+                yield tail
@@ -0,0 +1,161 @@
+import time
+from itertools import count
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot, Qt
+
+# QThreadPool runs queued runnables with higher priority first
+READ_PRIORITY_FOREGROUND = 10
+READ_PRIORITY_PREFETCH = 0
+
+READ_POOL_SIZE = 2
+
+
+class _ReadSignals(QObject):
+    done = Signal(int, object, float) # request_id, content (None on error), read_ms
+    chunk = Signal(int, str) # request_id, text (streaming reads)
+
+
+class _ReadTask(QRunnable):
+    def __init__(self, request_id, path, read_fn):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.request_id = request_id
+        self.path = path
+        self.read_fn = read_fn
+        self.cancelled = False
+        self.signals = _ReadSignals()
+
+    def run(self):
+        if self.cancelled:
+            return
+        start = time.perf_counter()
+        try:
+            content = self.read_fn(self.path)
+        except Exception as e:
+            print(f"Error reading file async {self.path}: {e}")
+            content = None
+        self.signals.done.emit(self.request_id, content, (time.perf_counter() - start) * 1000)
+
+
+class _StreamTask(_ReadTask):
+    """Emits the file piece by piece (read_fn yields chunks); done carries True on success."""
+    def run(self):
+        if self.cancelled:
+            return
+        start = time.perf_counter()
+        ok = True
+        try:
+            for text in self.read_fn(self.path):
+                if self.cancelled:
+                    return
+                self.signals.chunk.emit(self.request_id, text)
+        except Exception as e:
+            print(f"Error streaming file {self.path}: {e}")
+            ok = False
+        self.signals.done.emit(self.request_id, ok, (time.perf_counter() - start) * 1000)
+
+
+class ReadScheduler(QObject):
+    """
+    Small pool of reader threads for note contents.
+
+    Foreground reads (the note the user opened) run before prefetches. A request made
+    with an `owner` (typically an editor) supersedes that owner's previous request:
+    queued reads are dropped from the pool, running ones have their result discarded.
+    Callbacks run on the GUI thread.
+    """
+    read_finished = Signal(str, float) # path, latency_ms (request -> content delivered)
+    first_chunk_read = Signal(str, float) # path, latency_ms (request -> first streamed chunk)
+
+    def __init__(self, read_fn, pool_size=READ_POOL_SIZE):
+        super().__init__()
+        self.read_fn = read_fn
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(pool_size)
+        self._ids = count(1)
+        self._requests = {} # request_id -> (task, callback, owner, requested_at)
+        self._chunk_callbacks = {} # request_id -> on_chunk (streaming requests)
+        self._by_owner = {} # owner key -> request_id
+
+    def request(self, path, callback, priority=READ_PRIORITY_FOREGROUND, owner=None) -> int:
+        return self._submit(_ReadTask, self.read_fn, path, callback, priority, owner)
+
+    def request_stream(self, path, stream_fn, on_chunk, on_done, priority=READ_PRIORITY_FOREGROUND, owner=None) -> int:
+        """
+        Streaming read: stream_fn(path) yields text chunks, each delivered to on_chunk(text)
+        on the GUI thread as soon as it is decoded; on_done(ok) follows the last one.
+        """
+        request_id = self._submit(_StreamTask, stream_fn, path, on_done, priority, owner)
+        self._chunk_callbacks[request_id] = on_chunk
+        return request_id
+
+    def _submit(self, task_class, read_fn, path, callback, priority, owner) -> int:
+        if owner is not None:
+            previous = self._by_owner.get(id(owner))
+            if previous is not None:
+                self.cancel(previous)
+
+        request_id = next(self._ids)
+        task = task_class(request_id, path, read_fn)
+        task.signals.done.connect(self._on_done, Qt.QueuedConnection)
+        task.signals.chunk.connect(self._on_chunk, Qt.QueuedConnection)
+        self._requests[request_id] = (task, callback, owner, time.perf_counter())
+        if owner is not None:
+            self._by_owner[id(owner)] = request_id
+        self.pool.start(task, priority)
+        return request_id
+
+    def cancel(self, request_id):
+        entry = self._requests.pop(request_id, None)
+        self._chunk_callbacks.pop(request_id, None)
+        if entry is None:
+            return
+        task, _, owner, _ = entry
+        task.cancelled = True
+        self.pool.tryTake(task)
+        if owner is not None and self._by_owner.get(id(owner)) == request_id:
+            del self._by_owner[id(owner)]
+
+    def cancel_owner(self, owner):
+        request_id = self._by_owner.get(id(owner))
+        if request_id is not None:
+            self.cancel(request_id)
+
+    def cancel_all(self):
+        for request_id in list(self._requests):
+            self.cancel(request_id)
+
+    def shutdown(self):
+        self.cancel_all()
+        self.pool.waitForDone()
+
+    @Slot(int, str)
+    def _on_chunk(self, request_id, text):
+        on_chunk = self._chunk_callbacks.get(request_id)
+        if on_chunk is None:
+            return # cancelled / superseded
+        task, _, _, requested_at = self._requests[request_id]
+        if not getattr(task, "first_chunk_ms", None):
+            task.first_chunk_ms = (time.perf_counter() - requested_at) * 1000
+            self.first_chunk_read.emit(task.path, task.first_chunk_ms)
+        try:
+            on_chunk(text)
+        except Exception as e:
+            print(f"Error in chunk callback for {task.path}: {e}")
+
+    @Slot(int, object, float)
+    def _on_done(self, request_id, content, read_ms):
+        self._chunk_callbacks.pop(request_id, None)
+        entry = self._requests.pop(request_id, None)
+        if entry is None:
+            return # cancelled / superseded
+        task, callback, owner, requested_at = entry
+        if owner is not None and self._by_owner.get(id(owner)) == request_id:
+            del self._by_owner[id(owner)]
+
+        latency_ms = (time.perf_counter() - requested_at) * 1000
+        self.read_finished.emit(task.path, latency_ms)
+        if callback:
+            try:
+                callback(content)
+            except Exception as e:
+                print(f"Error in read callback for {task.path}: {e}")
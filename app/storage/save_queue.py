@@ -0,0 +1,137 @@
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+from PySide6.QtCore import QThread, Signal
+
+
+def atomic_write(path: str, content: str, newline: Optional[str] = None):
+    """
+    Writes text so that `path` always holds either the old or the new content:
+    the data goes to a hidden temp file in the same folder, is fsynced and then
+    renamed over the target. A crash mid-write leaves the note untouched.
+    newline is passed to open(): by default '\n' becomes the platform line ending,
+    as with a plain open(path, 'w'); '' writes the text as is.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline=newline) as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            try:
+                os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+            except OSError:
+                pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class SaveQueue(QThread):
+    """
+    Write-behind queue for note saves.
+
+    Repeated saves of the same path before the writer gets to it are merged into
+    a single write of the latest content. Writes are atomic (see atomic_write).
+    stop() drains everything still queued before the thread exits.
+    """
+    saved = Signal(str, bool) # rel_path, success
+
+    def __init__(self, root_path):
+        super().__init__()
+        self.root_path = os.path.abspath(root_path)
+        self._cond = threading.Condition()
+        # Held while a file is being written, so synchronous writers never race the thread
+        self._io_lock = threading.Lock()
+        self._pending = OrderedDict()
+        self._writing = None
+        self._stop = False
+
+    # --- Producer API (GUI thread) ---
+
+    def enqueue(self, rel_path: str, content: str):
+        with self._cond:
+            self._pending.pop(rel_path, None)
+            self._pending[rel_path] = content
+            self._cond.notify_all()
+
+    def pending_content(self, rel_path: str):
+        """Content queued (or being written) for a path, None if it is up to date on disk."""
+        with self._cond:
+            if rel_path in self._pending:
+                return self._pending[rel_path]
+            if self._writing and self._writing[0] == rel_path:
+                return self._writing[1]
+        return None
+
+    def write_now(self, rel_path: str, content: str):
+        """Synchronous atomic write that supersedes anything queued for the path."""
+        with self._io_lock:
+            with self._cond:
+                self._pending.pop(rel_path, None)
+            atomic_write(os.path.join(self.root_path, rel_path), content)
+
+    def discard(self, rel_path: str):
+        """Drops queued writes for a path or a folder subtree (the files are about to go away)."""
+        prefix = rel_path + os.sep
+        with self._io_lock:
+            with self._cond:
+                for path in [p for p in self._pending if p == rel_path or p.startswith(prefix)]:
+                    del self._pending[path]
+
+    def flush(self):
+        """Blocks until every queued write has reached the disk."""
+        with self._cond:
+            while self._pending or self._writing:
+                if not self.isRunning():
+                    break
+                self._cond.wait()
+        if not self.isRunning():
+            # Thread not running (not started or already stopped): write inline
+            self._drain()
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+
+    # --- Worker ---
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._stop and not self._pending:
+                    self._cond.wait()
+                if not self._pending:
+                    break
+            self._write_next()
+
+    def _drain(self):
+        while self._pending:
+            self._write_next()
+
+    def _write_next(self):
+        with self._io_lock:
+            with self._cond:
+                if not self._pending:
+                    return
+                self._writing = self._pending.popitem(last=False)
+            rel_path, content = self._writing
+            success = True
+            try:
+                atomic_write(os.path.join(self.root_path, rel_path), content)
+            except Exception as e:
+                print(f"Error saving file {rel_path}: {e}")
+                success = False
+            with self._cond:
+                self._writing = None
+                self._cond.notify_all()
+        self.saved.emit(rel_path, success)
@@ -0,0 +1,455 @@
+import math
+import os
+import re
+import sqlite3
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from app.storage.vault_index import get_index_dir
+
+SEARCH_DB_NAME = "search.db"
+SCHEMA_VERSION = "4"
+
+# How a query word must match an indexed token (see text_specs)
+EXACT, PREFIX, SUFFIX, INFIX, ANY = "exact", "prefix", "suffix", "infix", "any"
+# Word fragments shorter than this do not narrow the candidates (ANY): a single
+# letter would pull the postings of half the vocabulary.
+MIN_FRAGMENT_LENGTH = 2
+# Vocabulary words per "term IN (...)" statement when a fragment expands to many
+EXPANSION_CHUNK = 500
+# Length of the vocabulary grams that find words containing a fragment mid-word
+GRAM_LENGTH = 3
+# Candidate sets up to this size are checked per document instead of by a term range scan
+PROBE_LIMIT = 2000
+
+# BM25 parameters; title and heading occurrences count as several body occurrences
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_WEIGHT = 3.0
+HEADING_WEIGHT = 2.0
+
+TOKEN_RE = re.compile(r"\w+")
+_WORD_CHAR_RE = re.compile(r"\w")
+# Upper bound for prefix range scans: sorts after any other UTF-8 continuation
+_PREFIX_END = chr(0x10FFFF)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    positions BLOB NOT NULL,
+    heading INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (term, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings(doc_id, term);
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS term_grams (
+    gram TEXT NOT NULL,
+    term TEXT NOT NULL,
+    PRIMARY KEY (gram, term)
+) WITHOUT ROWID;
+"""
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens of a text, in order. Token ordinals are the positions."""
+    return TOKEN_RE.findall(text.lower())
+
+
+def tokenize_lines(text: str) -> Tuple[List[str], List[bool]]:
+    """tokenize(text) plus, per token, whether it is in a heading (outside code fences)."""
+    tokens = []
+    in_heading = []
+    in_code = False
+    for line in text.split('\n'):
+        stripped = line.lstrip()
+        if stripped.startswith('```'):
+            in_code = not in_code
+        line_tokens = TOKEN_RE.findall(line.lower())
+        tokens.extend(line_tokens)
+        in_heading.extend([not in_code and stripped.startswith('#')] * len(line_tokens))
+    return tokens, in_heading
+
+
+def text_specs(text: str) -> List[Tuple[str, str]]:
+    """
+    (word, mode) specs of the tokens a note must contain, consecutively, for `text`
+    to appear in it as a case-insensitive substring. Inner words are whole tokens; the
+    first may be the end of a longer token and the last the start of one (a lone word
+    may sit anywhere inside one), unless the text itself begins or ends with a
+    non-word character there.
+    """
+    text = text.lower()
+    words = tokenize(text)
+    specs = []
+    for i, word in enumerate(words):
+        starts = i > 0 or not _WORD_CHAR_RE.match(text[0])
+        ends = i < len(words) - 1 or not _WORD_CHAR_RE.match(text[-1])
+        if starts and ends:
+            mode = EXACT
+        elif len(word) < MIN_FRAGMENT_LENGTH:
+            mode = ANY
+        else:
+            mode = PREFIX if starts else SUFFIX if ends else INFIX
+        specs.append((word, mode))
+    return specs
+
+
+def _word_matcher(term: str, mode: str):
+    """Predicate for a token, the in-memory version of a spec."""
+    if mode == EXACT:
+        return lambda t: t == term
+    if mode == PREFIX:
+        return lambda t: t.startswith(term)
+    if mode == SUFFIX:
+        return lambda t: t.endswith(term)
+    if mode == INFIX:
+        return lambda t: term in t
+    return lambda t: True
+
+
+def _grams(word: str) -> set:
+    return {word[i:i + GRAM_LENGTH] for i in range(len(word) - GRAM_LENGTH + 1)}
+
+
+def title_of(rel_path: str) -> str:
+    return os.path.splitext(os.path.basename(rel_path))[0]
+
+
+class SearchIndex:
+    """
+    On-disk inverted index (term -> postings with token positions) for note contents,
+    stored in .cogny/search.db.
+
+    The index only narrows down candidate notes; callers verify the final match
+    against the real text, so a stale entry can never produce a wrong hit. Query
+    words are looked up as whole tokens, token prefixes (range scans on the
+    postings) or, for text that may start or sit inside a word, through the
+    trigrams of the `terms` vocabulary, so any substring of a note finds it.
+    Queries (app.storage.search_query) are planned with phrase_docs()/path_docs() and
+    ordered by rank(), BM25 from the postings alone (no note is read).
+    """
+    def __init__(self, root_path: str):
+        self.root_path = os.path.abspath(root_path)
+        self.db_path = os.path.join(get_index_dir(self.root_path), SEARCH_DB_NAME)
+        self._local = threading.local()
+        self.available = False
+        self._ready = False
+
+        try:
+            os.makedirs(get_index_dir(self.root_path), exist_ok=True)
+            conn = self._conn()
+            conn.executescript(_SCHEMA)
+            if self._get_meta(conn, "schema_version") != SCHEMA_VERSION:
+                # Columns may have changed: recreate the tables (the sync rebuilds them)
+                conn.executescript("DROP TABLE postings; DROP TABLE docs; DROP TABLE terms; DROP TABLE term_grams; DELETE FROM meta;")
+                conn.executescript(_SCHEMA)
+                with conn:
+                    self._set_meta(conn, "schema_version", SCHEMA_VERSION)
+            self._ready = self._get_meta(conn, "built") == "1"
+            self.available = True
+        except Exception as e:
+            print(f"Error opening search index {self.db_path}: {e}")
+
+    # --- Connections ---
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close_thread_connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
+    @staticmethod
+    def _get_meta(conn, key) -> Optional[str]:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _set_meta(conn, key, value):
+        conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, value))
+
+    def is_ready(self) -> bool:
+        return self.available and self._ready
+
+    def mark_built(self):
+        conn = self._conn()
+        with conn:
+            # Words no note uses any more (edited away) only slow fragment lookups down
+            conn.execute("DELETE FROM terms WHERE NOT EXISTS "
+                         "(SELECT 1 FROM postings WHERE postings.term = terms.term)")
+            conn.execute("DELETE FROM term_grams WHERE NOT EXISTS "
+                         "(SELECT 1 FROM terms WHERE terms.term = term_grams.term)")
+            self._set_meta(conn, "built", "1")
+        self._ready = True
+
+    # --- Updates (called from the ContentIndexer thread) ---
+
+    def doc_states(self) -> Dict[str, Tuple[int, int]]:
+        """{rel_path: (size, mtime)} of every indexed note."""
+        return {path: (size, mtime) for path, size, mtime in
+                self._conn().execute("SELECT path, size, mtime FROM docs")}
+
+    def commit(self):
+        self._conn().commit()
+
+    def index_note(self, rel_path: str, content: str, size: int, mtime: int, commit: bool = True):
+        """(Re)indexes one note. Bulk callers pass commit=False and call commit() per batch."""
+        tokens, in_heading = tokenize_lines(content)
+        positions: Dict[str, array] = {}
+        headings: Dict[str, int] = {}
+        for pos, term in enumerate(tokens):
+            p = positions.get(term)
+            if p is None:
+                p = positions[term] = array('I')
+            p.append(pos)
+            if in_heading[pos]:
+                headings[term] = headings.get(term, 0) + 1
+
+        conn = self._conn()
+        row = conn.execute("SELECT id FROM docs WHERE path = ?", (rel_path,)).fetchone()
+        if row:
+            doc_id = row[0]
+            conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+            conn.execute("UPDATE docs SET size = ?, mtime = ?, length = ? WHERE id = ?",
+                         (size, mtime, len(tokens), doc_id))
+        else:
+            cur = conn.execute("INSERT INTO docs(path, size, mtime, length) VALUES (?, ?, ?, ?)",
+                               (rel_path, size, mtime, len(tokens)))
+            doc_id = cur.lastrowid
+        conn.executemany("INSERT INTO postings(term, doc_id, positions, heading) VALUES (?, ?, ?, ?)",
+                         ((term, doc_id, p.tobytes(), headings.get(term, 0)) for term, p in positions.items()))
+        self._add_terms(conn, list(positions))
+        if commit:
+            conn.commit()
+
+    @staticmethod
+    def _add_terms(conn, terms: List[str]):
+        """Adds the words not in the vocabulary yet, with their grams."""
+        known = set()
+        for i in range(0, len(terms), EXPANSION_CHUNK):
+            chunk = terms[i:i + EXPANSION_CHUNK]
+            known.update(r[0] for r in conn.execute(
+                f"SELECT term FROM terms WHERE term IN ({','.join('?' for _ in chunk)})", chunk))
+        new = [term for term in terms if term not in known]
+        conn.executemany("INSERT INTO terms(term) VALUES (?)", ((term,) for term in new))
+        conn.executemany("INSERT OR IGNORE INTO term_grams(gram, term) VALUES (?, ?)",
+                         ((gram, term) for term in new for gram in _grams(term)))
+
+    def remove_note(self, rel_path: str, commit: bool = True):
+        """Removes a note, or every note under a folder path."""
+        prefix = rel_path + os.sep
+        conn = self._conn()
+        ids = [(r[0],) for r in conn.execute(
+            "SELECT id FROM docs WHERE path = ? OR substr(path, 1, ?) = ?",
+            (rel_path, len(prefix), prefix))]
+        if ids:
+            conn.executemany("DELETE FROM postings WHERE doc_id = ?", ids)
+            conn.executemany("DELETE FROM docs WHERE id = ?", ids)
+        if commit:
+            conn.commit()
+
+    # --- Queries ---
+
+    @staticmethod
+    def _inner_terms(conn, fragment: str, suffix: bool) -> List[str]:
+        """
+        Vocabulary words holding fragment after their first character (at their end
+        with suffix); words starting with it may be left out, the prefix scan has them.
+        """
+        grams = _grams(fragment)
+        if grams:
+            query = " INTERSECT ".join("SELECT term FROM term_grams WHERE gram = ?" for _ in grams)
+            rows = conn.execute(query, tuple(grams))
+        elif suffix:
+            # Shorter than a gram: scan the vocabulary
+            rows = conn.execute("SELECT term FROM terms WHERE substr(term, ?) = ? AND length(term) > ?",
+                                (-len(fragment), fragment, len(fragment)))
+        else:
+            rows = conn.execute("SELECT term FROM terms WHERE instr(term, ?) > 1", (fragment,))
+        words = [r[0] for r in rows if fragment in r[0][1:]]
+        return [w for w in words if w.endswith(fragment)] if suffix else words
+
+    def _term_clauses(self, conn, term: str, mode: str) -> Optional[List[Tuple[str, tuple]]]:
+        """
+        Conditions on postings.term (ORed) selecting the tokens of a spec, [] when no
+        indexed word matches, None for ANY. Whole words and prefixes use the postings
+        key directly; only the words holding the fragment further in are looked up in
+        the vocabulary.
+        """
+        if mode == ANY:
+            return None
+        if mode == EXACT:
+            return [("term = ?", (term,))]
+        prefix = ("term >= ? AND term < ?", (term, term + _PREFIX_END))
+        if mode == PREFIX:
+            return [prefix]
+        if mode == SUFFIX:
+            clauses = [("term = ?", (term,))]
+            words = self._inner_terms(conn, term, suffix=True)
+        else:
+            clauses = [prefix]
+            words = [w for w in self._inner_terms(conn, term, suffix=False) if not w.startswith(term)]
+        for i in range(0, len(words), EXPANSION_CHUNK):
+            chunk = tuple(words[i:i + EXPANSION_CHUNK])
+            clauses.append((f"term IN ({','.join('?' for _ in chunk)})", chunk))
+        return clauses
+
+    @staticmethod
+    def _term_docs(conn, clauses, within: Optional[set] = None) -> set:
+        """Documents containing a spec. With `within`, small sets are probed doc by doc."""
+        if within is not None and len(within) <= PROBE_LIMIT and len(clauses) == 1:
+            clause, params = clauses[0]
+            return {doc_id for doc_id in within if conn.execute(
+                f"SELECT 1 FROM postings WHERE doc_id = ? AND {clause} LIMIT 1",
+                (doc_id,) + params).fetchone()}
+        docs = set()
+        for clause, params in clauses:
+            docs.update(r[0] for r in conn.execute(f"SELECT doc_id FROM postings WHERE {clause}", params))
+        return docs if within is None else docs & within
+
+    @staticmethod
+    def _term_positions(conn, clauses, doc_id: int) -> set:
+        """Token positions of a spec (all its expansions merged) in one document."""
+        positions = set()
+        for clause, params in clauses:
+            for (blob,) in conn.execute(f"SELECT positions FROM postings WHERE doc_id = ? AND {clause}",
+                                        (doc_id,) + params):
+                p = array('I')
+                p.frombytes(blob)
+                positions.update(p)
+        return positions
+
+    def _match_docs(self, conn, specs) -> Optional[List[int]]:
+        """
+        Ids of the documents containing the specs as consecutive tokens, None when
+        no spec narrows them (all ANY).
+        """
+        # (offset in the phrase, mode, clauses) of the specs that can be looked up
+        lookups = []
+        for offset, (term, mode) in enumerate(specs):
+            clauses = self._term_clauses(conn, term, mode)
+            if clauses is not None:
+                lookups.append((offset, mode, clauses))
+        if not lookups:
+            return None
+
+        # 1. Intersect document sets, exact words first (no position blobs decoded yet)
+        docs = None
+        for _offset, _mode, clauses in sorted(lookups, key=lambda l: (l[1] != EXACT, len(l[2]))):
+            docs = self._term_docs(conn, clauses, docs)
+            if not docs:
+                return []
+
+        # 2. Phrase check on the surviving documents only
+        if len(lookups) == 1:
+            return list(docs)
+        first_offset, _mode, first_clauses = lookups[0]
+        matched = []
+        for doc_id in docs:
+            starts = {p - first_offset for p in self._term_positions(conn, first_clauses, doc_id)}
+            for offset, _mode, clauses in lookups[1:]:
+                following = self._term_positions(conn, clauses, doc_id)
+                starts = {s for s in starts if s + offset in following}
+                if not starts:
+                    break
+            if starts:
+                matched.append(doc_id)
+        return matched
+
+    def _doc_info(self, conn, doc_ids: List[int]) -> Dict[int, Tuple[str, int]]:
+        """{doc_id: (path, length in tokens)}."""
+        info = {}
+        for i in range(0, len(doc_ids), 500):
+            chunk = doc_ids[i:i + 500]
+            placeholders = ",".join("?" for _ in chunk)
+            for doc_id, path, length in conn.execute(
+                    f"SELECT id, path, length FROM docs WHERE id IN ({placeholders})", chunk):
+                info[doc_id] = (path, length)
+        return info
+
+    def phrase_docs(self, specs: List[Tuple[str, str]]) -> Optional[set]:
+        """
+        Ids of the documents containing the (word, mode) specs as consecutive tokens,
+        None (any document) when no spec can be looked up.
+        """
+        if not specs:
+            return None
+        docs = self._match_docs(self._conn(), specs)
+        return set(docs) if docs is not None else None
+
+    def path_docs(self, fragment: str) -> set:
+        """Ids of the documents whose path ('/' separators, any case) contains fragment."""
+        fragment = fragment.lower()
+        return {doc_id for doc_id, path in self._conn().execute("SELECT id, path FROM docs")
+                if fragment in path.replace(os.sep, '/').lower()}
+
+    def all_docs(self) -> set:
+        return {row[0] for row in self._conn().execute("SELECT id FROM docs")}
+
+    def rank(self, doc_ids, specs: List[Tuple[str, str]]) -> List[Tuple[str, float]]:
+        """
+        The documents as (rel_path, score), best first; by path when nothing scores.
+
+        BM25 over the (word, mode) specs, where a spec's frequency counts its
+        occurrences in the body, plus HEADING_WEIGHT per occurrence in a heading and
+        TITLE_WEIGHT per occurrence in the note title.
+        """
+        if not doc_ids:
+            return []
+        conn = self._conn()
+        info = self._doc_info(conn, list(doc_ids))
+        scores = dict.fromkeys(info, 0.0)
+        if specs:
+            n_docs, avg_length = conn.execute("SELECT COUNT(*), AVG(length) FROM docs").fetchone()
+            avg_length = max(1.0, avg_length or 0)
+            titles = {doc_id: tokenize(title_of(path)) for doc_id, (path, _length) in info.items()}
+
+        for term, mode in specs:
+            clauses = self._term_clauses(conn, term, mode)
+            if clauses is None:
+                continue # too short a fragment to score
+            df_docs = set()
+            freqs: Dict[int, float] = {}
+            for clause, params in clauses:
+                for doc_id, size, heading in conn.execute(
+                        f"SELECT doc_id, length(positions), heading FROM postings WHERE {clause}", params):
+                    df_docs.add(doc_id)
+                    if doc_id in scores:
+                        # positions are 4-byte ordinals: their count is the term frequency
+                        freqs[doc_id] = freqs.get(doc_id, 0) + size // 4 + HEADING_WEIGHT * heading
+            idf = math.log(1 + (n_docs - len(df_docs) + 0.5) / (len(df_docs) + 0.5))
+
+            matcher = _word_matcher(term, mode)
+            for doc_id in scores:
+                in_title = sum(1 for t in titles[doc_id] if matcher(t))
+                freq = freqs.get(doc_id, 0) + TITLE_WEIGHT * in_title
+                if not freq:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * info[doc_id][1] / avg_length)
+                scores[doc_id] += idf * freq * (BM25_K1 + 1) / (freq + norm)
+
+        return sorted(((info[doc_id][0], score) for doc_id, score in scores.items()),
+                      key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,426 @@
+"""
+Search query language shared by the search bar and scripts/search_vault.py.
+
+    word            notes containing the text, also inside longer words (case-insensitive); words are ANDed
+    "exact phrase"  the text with any whitespace between its words, also starting or ending mid-word
+    a OR b          either side; AND is implicit but may be written
+    -word           excludes notes matching the term (also -"phrase", -path:, ...)
+    ( ... )         grouping
+    path:folder/    notes whose path contains the text (path:"with spaces/")
+    tag:#x  #x      notes tagged x (inline #x or front matter tags), or nested x/...
+    /regex/         notes matching a regular expression (case-insensitive)
+
+A query is planned against the search index before any note is read: words,
+phrases and tags narrow the candidates through their postings, path filters are
+answered from the indexed paths, and only the surviving notes are read to verify
+the expensive operators (phrases, tags, regexes, exclusions) and to cut snippets.
+"""
+import os
+import re
+from typing import Callable, List, Optional, Set, Tuple
+
+from app.storage.search_index import EXACT, text_specs, tokenize
+
+TAG_RE = re.compile(r"(?<![\w/#&])#([\w][\w/-]*)")
+_FRONT_MATTER_TAGS_RE = re.compile(r"^tags:\s*(.*)$", re.MULTILINE)
+
+
+class QueryError(ValueError):
+    """Raised for queries that cannot be run (e.g. an invalid regular expression)."""
+
+
+def note_tags(content: str) -> Set[str]:
+    """Lowercased tags of a note: inline #tags and the front matter `tags:` list."""
+    tags = {t.lower() for t in TAG_RE.findall(content) if not t.isdigit()}
+    if content.startswith('---'):
+        end = content.find('\n---', 3)
+        if end != -1:
+            front = content[3:end]
+            match = _FRONT_MATTER_TAGS_RE.search(front)
+            if match:
+                inline = match.group(1).strip().strip('[]')
+                values = inline.split(',') if inline else []
+                if not inline:
+                    # Block list: the "- tag" lines right after "tags:"
+                    for line in front[match.end():].split('\n')[1:]:
+                        if not line.strip().startswith('-'):
+                            break
+                        values.append(line.strip()[1:])
+                tags.update(v.strip().strip('"\'').lstrip('#').lower() for v in values if v.strip())
+    return tags
+
+
+class NoteText:
+    """A candidate note for verification; the text is read on first use only."""
+    def __init__(self, rel_path: str, read: Callable[[], Optional[str]]):
+        self.rel_path = rel_path
+        self.path = rel_path.replace(os.sep, '/').lower()
+        self._read = read
+        self._content = None
+        self._lower = None
+        self._tags = None
+        self.loaded = False
+
+    @property
+    def content(self) -> str:
+        if not self.loaded:
+            self._content = self._read() or ""
+            self.loaded = True
+        return self._content
+
+    @property
+    def lower(self) -> str:
+        if self._lower is None:
+            self._lower = self.content.lower()
+        return self._lower
+
+    @property
+    def tags(self) -> Set[str]:
+        if self._tags is None:
+            self._tags = note_tags(self.content)
+        return self._tags
+
+
+# --- Query tree ---
+# candidates(index) returns the doc ids that may match, or None for "any document";
+# matches(note) is the exact check. Cheap nodes (cost 0) are evaluated first.
+
+class _Term:
+    """
+    A bare word or a quoted phrase (any whitespace between its words), both matched
+    as substrings of the note. The index is asked for that same substring (see
+    text_specs), so a term finds every note that its exclusion (-term) would drop.
+    """
+    cost = 1
+
+    def __init__(self, text: str, phrase: bool):
+        self.text = text.lower()
+        self.phrase = phrase
+        self.words = tokenize(text)
+        self._regex = re.compile(r"\s+".join(re.escape(part) for part in self.text.split()), re.IGNORECASE) if phrase else None
+
+    def specs(self) -> List[Tuple[str, str]]:
+        return text_specs(" ".join(self.text.split()))
+
+    def candidates(self, index):
+        return index.phrase_docs(self.specs()) if self.words else None
+
+    def matches(self, note: NoteText) -> bool:
+        if self._regex is not None:
+            return bool(self._regex.search(note.content))
+        return self.text in note.lower
+
+    def highlight(self) -> str:
+        return self._regex.pattern if self._regex is not None else re.escape(self.text)
+
+
+class _Tag:
+    cost = 1
+
+    def __init__(self, tag: str):
+        self.tag = tag.lstrip('#').lower()
+        self.words = tokenize(self.tag)
+
+    def specs(self) -> List[Tuple[str, str]]:
+        return [(w, EXACT) for w in self.words]
+
+    def candidates(self, index):
+        return index.phrase_docs(self.specs()) if self.words else None
+
+    def matches(self, note: NoteText) -> bool:
+        prefix = self.tag + '/'
+        return any(t == self.tag or t.startswith(prefix) for t in note.tags)
+
+    def highlight(self) -> str:
+        return '#' + re.escape(self.tag)
+
+
+class _Path:
+    cost = 0 # no read needed
+
+    def __init__(self, fragment: str):
+        self.fragment = fragment.replace('\\', '/').lower()
+
+    def specs(self):
+        return []
+
+    def candidates(self, index):
+        return index.path_docs(self.fragment)
+
+    def matches(self, note: NoteText) -> bool:
+        return self.fragment in note.path
+
+    def highlight(self) -> Optional[str]:
+        return None
+
+
+class _Regex:
+    cost = 2
+
+    def __init__(self, pattern: str):
+        try:
+            self.regex = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+        except re.error as e:
+            raise QueryError(f"Expresión regular no válida: {e}")
+
+    def specs(self):
+        return []
+
+    def candidates(self, index):
+        return None # no index support: verified on the other clauses' candidates
+
+    def matches(self, note: NoteText) -> bool:
+        return bool(self.regex.search(note.content))
+
+    def highlight(self) -> str:
+        return self.regex.pattern
+
+
+class _And:
+    def __init__(self, children):
+        # Cheapest checks first: a path filter can reject a note before it is read
+        self.children = sorted(children, key=lambda c: c.cost)
+        self.cost = max(c.cost for c in children)
+
+    def specs(self):
+        return [spec for c in self.children for spec in c.specs()]
+
+    def candidates(self, index):
+        docs = None
+        for child in self.children:
+            found = child.candidates(index)
+            if found is not None:
+                docs = found if docs is None else docs & found
+                if not docs:
+                    return docs
+        return docs
+
+    def matches(self, note: NoteText) -> bool:
+        return all(c.matches(note) for c in self.children)
+
+    def highlights(self):
+        return [h for c in self.children for h in _highlights(c)]
+
+
+class _Or:
+    def __init__(self, children):
+        self.children = sorted(children, key=lambda c: c.cost)
+        self.cost = max(c.cost for c in children)
+
+    def specs(self):
+        return [spec for c in self.children for spec in c.specs()]
+
+    def candidates(self, index):
+        docs = set()
+        for child in self.children:
+            found = child.candidates(index)
+            if found is None:
+                return None
+            docs |= found
+        return docs
+
+    def matches(self, note: NoteText) -> bool:
+        return any(c.matches(note) for c in self.children)
+
+    def highlights(self):
+        return [h for c in self.children for h in _highlights(c)]
+
+
+class _Not:
+    def __init__(self, child):
+        self.child = child
+        self.cost = child.cost
+
+    def specs(self):
+        return [] # excluded terms do not score
+
+    def candidates(self, index):
+        return None
+
+    def matches(self, note: NoteText) -> bool:
+        return not self.child.matches(note)
+
+    def highlights(self):
+        return []
+
+
+def _highlights(node) -> List[str]:
+    if hasattr(node, 'highlights'):
+        return node.highlights()
+    pattern = node.highlight()
+    return [pattern] if pattern else []
+
+
+# --- Parser ---
+
+_KEYWORDS = ('AND', 'OR')
+_WORD_END = set(' \t\r\n()"')
+
+
+def _regex_end(text: str, start: int) -> Optional[int]:
+    """
+    Index of the '/' closing a /regex/ opened at start, or None: the first unescaped
+    '/' must end the token, so /usr/bin or an unclosed /abc are words, not regexes.
+    """
+    j = start + 1
+    while j < len(text) and text[j] != '/':
+        j += 2 if text[j] == '\\' else 1
+    if j >= len(text) or j == start + 1:
+        return None
+    return j if j + 1 == len(text) or text[j + 1] in _WORD_END else None
+
+
+def _lex(text: str):
+    """Yields (kind, value, complete) tokens: '(', ')', 'AND', 'OR', '-', 'phrase', 'regex', 'path', 'tag', 'word'."""
+    i = 0
+    n = len(text)
+    while i < n:
+        c = text[i]
+        if c.isspace():
+            i += 1
+        elif c in '()':
+            yield c, c, True
+            i += 1
+        elif c == '"':
+            end = text.find('"', i + 1)
+            complete = end != -1
+            end = end if complete else n
+            yield 'phrase', text[i + 1:end], complete
+            i = end + 1
+        elif c == '/' and _regex_end(text, i) is not None:
+            j = _regex_end(text, i)
+            yield 'regex', text[i + 1:j], True
+            i = j + 1
+        elif c == '-' and i + 1 < n and not text[i + 1].isspace():
+            yield '-', c, True
+            i += 1
+        else:
+            j = i
+            while j < n and text[j] not in _WORD_END:
+                j += 1
+            word = text[i:j]
+            lowered = word.lower()
+            for field in ('path:', 'tag:'):
+                if lowered.startswith(field):
+                    value = word[len(field):]
+                    if not value and j < n and text[j] == '"':
+                        end = text.find('"', j + 1)
+                        end = end if end != -1 else n
+                        value = text[j + 1:end]
+                        j = end + 1
+                    yield field[:-1], value, True
+                    break
+            else:
+                if word in _KEYWORDS:
+                    yield word, word, True
+                elif word.startswith('#') and len(word) > 1:
+                    yield 'tag', word, True
+                else:
+                    yield 'word', word, True
+            i = j
+
+
+class _Parser:
+    """Recursive descent, lenient: stray operators and parentheses are ignored."""
+    def __init__(self, text: str):
+        self.tokens = list(_lex(text))
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def next(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self):
+        nodes = []
+        while self.peek() is not None:
+            node = self.or_expr()
+            if node is not None:
+                nodes.append(node)
+            elif self.peek() is not None:
+                self.next() # stray ')' or operator
+        return _combine(_And, nodes)
+
+    def or_expr(self):
+        nodes = [self.and_expr()]
+        while self.peek() == 'OR':
+            self.next()
+            nodes.append(self.and_expr())
+        return _combine(_Or, [n for n in nodes if n is not None])
+
+    def and_expr(self):
+        nodes = []
+        while self.peek() not in (None, ')', 'OR'):
+            if self.peek() == 'AND':
+                self.next()
+                continue
+            node = self.unary()
+            if node is not None:
+                nodes.append(node)
+        return _combine(_And, nodes)
+
+    def unary(self):
+        if self.peek() == '-':
+            self.next()
+            if self.peek() in (None, ')', 'OR', 'AND'):
+                return None
+            child = self.unary()
+            return _Not(child) if child is not None else None
+        return self.primary()
+
+    def primary(self):
+        kind, value, complete = self.next()
+        if kind == '(':
+            node = self.or_expr()
+            if self.peek() == ')':
+                self.next()
+            return node
+        if kind == 'phrase':
+            return _Term(value, True) if value.strip() else None
+        if kind == 'regex':
+            return _Regex(value) if value else None
+        if kind == 'path':
+            return _Path(value) if value else None
+        if kind == 'tag':
+            return _Tag(value) if value.lstrip('#') else None
+        if kind == 'word':
+            return _Term(value, False) if value != '-' else None
+        return None # ')' is handled by the callers
+
+
+def _combine(cls, nodes):
+    if not nodes:
+        return None
+    return nodes[0] if len(nodes) == 1 else cls(nodes)
+
+
+class SearchQuery:
+    """A parsed query: plan() asks the index for ranked candidates, matches() verifies one note."""
+    def __init__(self, text: str):
+        self.text = text
+        self.root = _Parser(text).parse()
+
+    def is_empty(self) -> bool:
+        return self.root is None
+
+    def plan(self, search_index) -> List[Tuple[str, float]]:
+        """
+        (rel_path, score) of the notes that may match, best first (BM25 over the
+        query's positive words, phrases and tags; path order when there are none).
+        """
+        if self.root is None:
+            return []
+        docs = self.root.candidates(search_index)
+        if docs is None:
+            docs = search_index.all_docs()
+        return search_index.rank(docs, list(dict.fromkeys(self.root.specs())))
+
+    def matches(self, note: NoteText) -> bool:
+        return self.root is not None and self.root.matches(note)
+
+    def highlight_patterns(self) -> List[str]:
+        """Regular expressions of the parts of the text to highlight in snippets."""
+        return _highlights(self.root) if self.root is not None else []
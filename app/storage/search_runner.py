@@ -0,0 +1,112 @@
+import threading
+import time
+from itertools import count
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot, Qt
+
+# Hits are handed to the GUI as soon as the first one is found, then at most
+# every SEARCH_BATCH_INTERVAL seconds (or SEARCH_BATCH_SIZE hits)
+SEARCH_BATCH_INTERVAL = 0.05
+SEARCH_BATCH_SIZE = 100
+
+
+class _SearchSignals(QObject):
+    batch = Signal(int, object) # request_id, [hit dicts]
+    done = Signal(int, int, float, float) # request_id, hits, first hit ms (-1 if none), total ms
+
+
+class _SearchTask(QRunnable):
+    def __init__(self, request_id, iter_hits, query, limit, offset, thread_cleanup):
+        super().__init__()
+        self.request_id = request_id
+        self.iter_hits = iter_hits
+        self.query = query
+        self.limit = limit
+        self.offset = offset
+        self.thread_cleanup = thread_cleanup
+        self.cancelled = threading.Event()
+        self.signals = _SearchSignals()
+
+    def run(self):
+        start = time.perf_counter()
+        first_ms = -1.0
+        hits = 0
+        pending = []
+        last_flush = start
+        try:
+            for hit in self.iter_hits(self.query, self.cancelled.is_set, self.offset):
+                if self.cancelled.is_set():
+                    break
+                pending.append(hit)
+                hits += 1
+                now = time.perf_counter()
+                if first_ms < 0:
+                    first_ms = (now - start) * 1000
+                if hits == 1 or len(pending) >= SEARCH_BATCH_SIZE or now - last_flush >= SEARCH_BATCH_INTERVAL:
+                    self.signals.batch.emit(self.request_id, pending)
+                    pending = []
+                    last_flush = now
+                if self.limit and hits >= self.limit:
+                    break
+        except Exception as e:
+            print(f"Error searching '{self.query}': {e}")
+        finally:
+            if self.thread_cleanup:
+                self.thread_cleanup()
+        if pending and not self.cancelled.is_set():
+            self.signals.batch.emit(self.request_id, pending)
+        self.signals.done.emit(self.request_id, hits, first_ms, (time.perf_counter() - start) * 1000)
+
+
+class SearchRunner(QObject):
+    """
+    Runs vault searches on a worker and streams the hits back in batches.
+
+    iter_hits(query, cancelled, offset) is any generator of hit dicts that polls
+    cancelled() between notes; cancel() stops a query at the next note and drops whatever it
+    already queued, so superseded queries never reach the caller.
+    """
+    def __init__(self, iter_hits, thread_cleanup=None):
+        super().__init__()
+        self.iter_hits = iter_hits
+        self.thread_cleanup = thread_cleanup
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(1)
+        self._ids = count(1)
+        self._requests = {} # request_id -> (task, on_batch, on_done)
+
+    def start(self, query: str, on_batch, on_done, limit: int = 0, offset: int = 0) -> int:
+        """
+        on_batch(hits) is called on the GUI thread as hits are found, then
+        on_done(total_hits); the search stops after `limit` hits (0: no limit).
+        offset is passed through to iter_hits (paging). Returns a request id for cancel().
+        """
+        request_id = next(self._ids)
+        task = _SearchTask(request_id, self.iter_hits, query, limit, offset, self.thread_cleanup)
+        task.signals.batch.connect(self._on_batch, Qt.QueuedConnection)
+        task.signals.done.connect(self._on_done, Qt.QueuedConnection)
+        self._requests[request_id] = (task, on_batch, on_done)
+        self.pool.start(task)
+        return request_id
+
+    def cancel(self, request_id):
+        request = self._requests.pop(request_id, None)
+        if request is not None:
+            request[0].cancelled.set()
+
+    def shutdown(self):
+        for request_id in list(self._requests):
+            self.cancel(request_id)
+        self.pool.waitForDone()
+
+    @Slot(int, object)
+    def _on_batch(self, request_id, hits):
+        request = self._requests.get(request_id)
+        if request is not None:
+            request[1](hits)
+
+    @Slot(int, int, float, float)
+    def _on_done(self, request_id, hits, first_ms, total_ms):
+        request = self._requests.pop(request_id, None)
+        if request is None:
+            return # cancelled
+        request[2](hits)
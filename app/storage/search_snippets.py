@@ -0,0 +1,58 @@
+import html
+import re
+from typing import List, Tuple
+
+# Characters of context on each side of a match
+SNIPPET_CONTEXT = 40
+MAX_SNIPPETS = 3
+# Matches looked at per note: enough to fill MAX_SNIPPETS windows
+_MAX_MATCHES = 50
+
+
+def _match_spans(content: str, patterns: List[str]) -> List[Tuple[int, int]]:
+    """Non-overlapping spans of the patterns in the text (case-insensitive), in text order."""
+    found = []
+    for pattern in set(patterns):
+        # Each pattern on its own: a user regex keeps its own group numbers
+        for i, match in enumerate(re.finditer(pattern, content, re.IGNORECASE | re.MULTILINE)):
+            if i >= _MAX_MATCHES:
+                break
+            if match.end() > match.start():
+                found.append(match.span())
+    spans = []
+    # Leftmost first, longest first at the same start (a phrase wins over its words)
+    for start, end in sorted(found, key=lambda span: (span[0], -span[1])):
+        if not spans or start >= spans[-1][1]:
+            spans.append((start, end))
+    return spans[:_MAX_MATCHES]
+
+
+def make_snippets(content: str, patterns: List[str], max_snippets: int = MAX_SNIPPETS,
+                  context: int = SNIPPET_CONTEXT) -> List[str]:
+    """
+    Up to max_snippets HTML excerpts around the first matches of the patterns
+    (SearchQuery.highlight_patterns), in text order, with every match in <b>.
+    Overlapping windows are merged.
+    """
+    windows = [] # [start, end, [match spans]]
+    for start, end in _match_spans(content, patterns):
+        if windows and start - context <= windows[-1][1]:
+            windows[-1][1] = min(len(content), end + context)
+            windows[-1][2].append((start, end))
+        elif len(windows) < max_snippets:
+            windows.append([max(0, start - context), min(len(content), end + context), [(start, end)]])
+        else:
+            break
+
+    snippets = []
+    for win_start, win_end, spans in windows:
+        parts = ["..." if win_start > 0 else ""]
+        last = win_start
+        for start, end in spans:
+            parts.append(html.escape(content[last:start]))
+            parts.append(f"<b>{html.escape(content[start:end])}</b>")
+            last = end
+        parts.append(html.escape(content[last:win_end]))
+        parts.append("..." if win_end < len(content) else "")
+        snippets.append("".join(parts).replace('\n', ' '))
+    return snippets
@@ -0,0 +1,267 @@
+import os
+import re
+import sqlite3
+import threading
+from array import array
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app.storage.link_index import parse_links
+from app.storage.vault_index import get_index_dir
+
+STATS_DB_NAME = "stats.db"
+SCHEMA_VERSION = "1"
+
+# Per-note counts, in docs column order
+COUNTS = ('words', 'chars', 'headings', 'images', 'links')
+# Daily delta series: note count, the per-note counts and bytes on disk
+METRICS = ('notes',) + COUNTS + ('bytes',)
+
+WORD_RE = re.compile(r"\w+")
+HEADING_RE = re.compile(r"#+\s+\S")
+MD_IMAGE_RE = re.compile(r"!\[[^\]\n]*\]\([^)\n]*\)")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    words INTEGER NOT NULL,
+    chars INTEGER NOT NULL,
+    headings INTEGER NOT NULL,
+    images INTEGER NOT NULL,
+    links INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS series (
+    metric TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (metric, year)
+) WITHOUT ROWID;
+"""
+
+
+def note_counts(content: str) -> Dict[str, int]:
+    """Words, characters, headings (outside code fences), images and links of a note."""
+    headings = 0
+    in_code = False
+    for line in content.split('\n'):
+        stripped = line.lstrip()
+        if stripped.startswith('```'):
+            in_code = not in_code
+        elif not in_code and stripped.startswith('#') and HEADING_RE.match(stripped):
+            headings += 1
+    links = parse_links(content)
+    embeds = sum(1 for link in links if link[2])
+    return {
+        'words': len(WORD_RE.findall(content)),
+        'chars': len(content),
+        'headings': headings,
+        'images': embeds + len(MD_IMAGE_RE.findall(content)),
+        'links': len(links) - embeds,
+    }
+
+
+def _year_start(year: int) -> int:
+    return date(year, 1, 1).toordinal()
+
+
+class StatsIndex:
+    """
+    Writing statistics of the vault (.cogny/stats.db): counts per note and, per metric,
+    a daily series of deltas stored as one int64 array blob per year.
+
+    Every update adds (new - old) counts to the day it happened, so the vault totals
+    are the sums of the series and the dashboard never has to read a note. During the
+    first build each note is credited to the day of its mtime, which back-fills the
+    history; afterwards changes are credited to the day they are indexed.
+
+    Fed by the ContentIndexer like the search and link indexes.
+    """
+    def __init__(self, root_path: str):
+        self.root_path = os.path.abspath(root_path)
+        self.db_path = os.path.join(get_index_dir(self.root_path), STATS_DB_NAME)
+        self._local = threading.local()
+        self.available = False
+        self._ready = False
+        # (metric, year) -> array('q') of daily deltas, loaded on first use by the indexer thread
+        self._series: Optional[Dict[Tuple[str, int], array]] = None
+        self._dirty = set()
+
+        try:
+            os.makedirs(get_index_dir(self.root_path), exist_ok=True)
+            conn = self._conn()
+            conn.executescript(_SCHEMA)
+            if self._get_meta(conn, "schema_version") != SCHEMA_VERSION:
+                with conn:
+                    conn.execute("DELETE FROM series")
+                    conn.execute("DELETE FROM docs")
+                    conn.execute("DELETE FROM meta")
+                    self._set_meta(conn, "schema_version", SCHEMA_VERSION)
+            self._ready = self._get_meta(conn, "built") == "1"
+            self.available = True
+        except Exception as e:
+            print(f"Error opening stats index {self.db_path}: {e}")
+
+    # --- Connections ---
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close_thread_connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
+    @staticmethod
+    def _get_meta(conn, key) -> Optional[str]:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _set_meta(conn, key, value):
+        conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, value))
+
+    def is_ready(self) -> bool:
+        return self.available and self._ready
+
+    def mark_built(self):
+        conn = self._conn()
+        with conn:
+            self._flush_series(conn)
+            self._set_meta(conn, "built", "1")
+        self._ready = True
+
+    # --- Series ---
+
+    @staticmethod
+    def _load_series(conn) -> Dict[Tuple[str, int], array]:
+        series = {}
+        for metric, year, blob in conn.execute("SELECT metric, year, data FROM series"):
+            data = array('q')
+            data.frombytes(blob)
+            series[(metric, year)] = data
+        return series
+
+    def _add_deltas(self, day: int, deltas: Dict[str, int]):
+        if self._series is None:
+            self._series = self._load_series(self._conn())
+        year = date.fromordinal(day).year
+        offset = day - _year_start(year)
+        for metric, value in deltas.items():
+            if not value:
+                continue
+            data = self._series.get((metric, year))
+            if data is None:
+                data = self._series[(metric, year)] = array('q', [0]) * 366
+            data[offset] += value
+            self._dirty.add((metric, year))
+
+    def _flush_series(self, conn):
+        for key in self._dirty:
+            conn.execute("INSERT OR REPLACE INTO series(metric, year, data) VALUES (?, ?, ?)",
+                         (key[0], key[1], self._series[key].tobytes()))
+        self._dirty.clear()
+
+    # --- Updates (called from the ContentIndexer thread) ---
+
+    def doc_states(self) -> Dict[str, Tuple[int, int]]:
+        """{rel_path: (size, mtime)} of every indexed note."""
+        return {path: (size, mtime) for path, size, mtime in
+                self._conn().execute("SELECT path, size, mtime FROM docs")}
+
+    def commit(self):
+        conn = self._conn()
+        self._flush_series(conn)
+        conn.commit()
+
+    def index_note(self, rel_path: str, content: str, size: int, mtime: int, commit: bool = True):
+        """Stores the counts of one note and credits the change to today (or its mtime day on the first build)."""
+        counts = note_counts(content)
+        conn = self._conn()
+        row = conn.execute(f"SELECT id, size, {', '.join(COUNTS)} FROM docs WHERE path = ?", (rel_path,)).fetchone()
+        if row:
+            deltas = {name: counts[name] - old for name, old in zip(COUNTS, row[2:])}
+            deltas['bytes'] = size - row[1]
+            conn.execute(f"UPDATE docs SET size = ?, mtime = ?, {', '.join(f'{c} = ?' for c in COUNTS)} WHERE id = ?",
+                         (size, mtime, *(counts[c] for c in COUNTS), row[0]))
+        else:
+            deltas = dict(counts, notes=1, bytes=size)
+            conn.execute(f"INSERT INTO docs(path, size, mtime, {', '.join(COUNTS)}) VALUES (?, ?, ?, {', '.join('?' for _ in COUNTS)})",
+                         (rel_path, size, mtime, *(counts[c] for c in COUNTS)))
+        day = date.today().toordinal() if self._ready else date.fromtimestamp(mtime / 1e9).toordinal()
+        self._add_deltas(day, deltas)
+        if commit:
+            self.commit()
+
+    def remove_note(self, rel_path: str, commit: bool = True):
+        """Removes a note, or every note under a folder path, crediting the loss to today."""
+        prefix = rel_path + os.sep
+        conn = self._conn()
+        rows = conn.execute(
+            f"SELECT id, size, {', '.join(COUNTS)} FROM docs WHERE path = ? OR substr(path, 1, ?) = ?",
+            (rel_path, len(prefix), prefix)).fetchall()
+        if rows:
+            deltas = {'notes': -len(rows), 'bytes': -sum(r[1] for r in rows)}
+            for i, name in enumerate(COUNTS, start=2):
+                deltas[name] = -sum(r[i] for r in rows)
+            conn.executemany("DELETE FROM docs WHERE id = ?", [(r[0],) for r in rows])
+            self._add_deltas(date.today().toordinal(), deltas)
+        if commit:
+            self.commit()
+
+    # --- Queries ---
+
+    def totals(self) -> Dict[str, int]:
+        """Vault totals per metric: the sum of each daily series."""
+        totals = dict.fromkeys(METRICS, 0)
+        for (metric, _year), data in self._load_series(self._conn()).items():
+            if metric in totals:
+                totals[metric] += sum(data)
+        return totals
+
+    def daily(self, days: int = 30, end: Optional[date] = None) -> List[Tuple[date, Dict[str, int]]]:
+        """(day, {metric: delta}) for the `days` days up to `end` (today), oldest first."""
+        end = end or date.today()
+        first = end - timedelta(days=days - 1)
+        years = list(range(first.year, end.year + 1))
+        series = {}
+        for metric, year, blob in self._conn().execute(
+                f"SELECT metric, year, data FROM series WHERE year IN ({','.join('?' for _ in years)})", years):
+            data = array('q')
+            data.frombytes(blob)
+            series[(metric, year)] = data
+
+        result = []
+        for i in range(days):
+            day = first + timedelta(days=i)
+            offset = day.toordinal() - _year_start(day.year)
+            result.append((day, {metric: series[(metric, day.year)][offset] if (metric, day.year) in series else 0
+                                 for metric in METRICS}))
+        return result
+
+    def note(self, rel_path: str) -> Optional[Dict[str, int]]:
+        row = self._conn().execute(f"SELECT size, {', '.join(COUNTS)} FROM docs WHERE path = ?", (rel_path,)).fetchone()
+        if not row:
+            return None
+        return dict(zip(('bytes',) + COUNTS, row))
+
+    def top_notes(self, metric: str = 'words', limit: int = 10) -> List[Tuple[str, int]]:
+        """Largest notes by one of the per-note counts (or 'bytes')."""
+        column = 'size' if metric == 'bytes' else metric
+        if column not in COUNTS + ('size',):
+            raise ValueError(f"Unknown metric: {metric}")
+        return self._conn().execute(
+            f"SELECT path, {column} FROM docs ORDER BY {column} DESC, path LIMIT ?", (limit,)).fetchall()
@@ -0,0 +1,321 @@
+import heapq
+import os
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+from PySide6.QtCore import QThread
+
+# Recently opened notes remembered for the ranking boost (most recent first)
+RECENT_LIMIT = 50
+# Score added to the most recently opened note, decreasing linearly with its rank
+RECENT_BOOST = 6.0
+# Candidates fully scored per query (see TitleIndex._cut for which are kept)
+MAX_SCORED = 1000
+# A query trigram may be missing from a match once per this many trigrams (typos);
+# when nothing matches, a second pass allows one miss per RELAXED_MISS_EVERY
+MISS_EVERY = 4
+RELAXED_MISS_EVERY = 2
+# Longest title word prefix indexed for queries too short to have trigrams
+PREFIX_LEN = 2
+
+_EMPTY = array('i')
+
+
+def _normalize(text: str) -> str:
+    """Lowercase, '/' separators and no accents, so 'reunion' finds 'Reunión'."""
+    text = text.lower().replace('\\', '/')
+    if not text.isascii():
+        text = ''.join(c for c in unicodedata.normalize('NFD', text) if not unicodedata.combining(c))
+    return text
+
+
+def _word_prefixes(title: str) -> set:
+    """1..PREFIX_LEN character prefixes of the title and of each word in it."""
+    prefixes = set()
+    start = True
+    for i, c in enumerate(title):
+        if c.isalnum():
+            if start:
+                prefixes.update(title[i:i + n] for n in range(1, PREFIX_LEN + 1))
+            start = False
+        else:
+            start = True
+    return prefixes
+
+
+def trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _contains(post: array, item: int) -> bool:
+    i = bisect_left(post, item)
+    return i < len(post) and post[i] == item
+
+
+class _Postings:
+    """
+    One generation of the index: id -> path/key/title lists, trigram -> sorted id arrays
+    over the keys, and title word prefix -> sorted id arrays for 1-2 character queries.
+
+    Ids only grow, so appending keeps every posting sorted. Removed notes leave a
+    None behind (skipped by queries); a full load() compacts them away.
+    """
+    def __init__(self, rel_paths: Iterable[str] = ()):
+        self.paths: List[Optional[str]] = []
+        self.keys: List[Optional[str]] = []   # normalized path without .md: what trigrams cover
+        self.titles: List[Optional[str]] = [] # normalized title
+        self.ids: Dict[str, int] = {}
+
+        grams: Dict[str, List[int]] = {}
+        prefixes: Dict[str, List[int]] = {}
+        for rel_path in rel_paths:
+            i = self._register(rel_path)
+            if i is None:
+                continue
+            for table, items in ((grams, trigrams(self.keys[i])), (prefixes, _word_prefixes(self.titles[i]))):
+                for item in items:
+                    posting = table.get(item)
+                    if posting is None:
+                        posting = table[item] = []
+                    posting.append(i)
+        self.grams: Dict[str, array] = {gram: array('i', posting) for gram, posting in grams.items()}
+        self.prefixes: Dict[str, array] = {prefix: array('i', posting) for prefix, posting in prefixes.items()}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _register(self, rel_path: str) -> Optional[int]:
+        if not rel_path.endswith('.md') or rel_path in self.ids:
+            return None
+        i = len(self.paths)
+        key = _normalize(rel_path[:-3])
+        self.paths.append(rel_path)
+        self.keys.append(key)
+        self.titles.append(key.rsplit('/', 1)[-1])
+        self.ids[rel_path] = i
+        return i
+
+    def add(self, rel_path: str):
+        i = self._register(rel_path)
+        if i is None:
+            return
+        for table, items in ((self.grams, trigrams(self.keys[i])), (self.prefixes, _word_prefixes(self.titles[i]))):
+            for item in items:
+                posting = table.get(item)
+                if posting is None:
+                    posting = table[item] = array('i')
+                posting.append(i)
+
+    def discard(self, rel_path: str) -> List[str]:
+        """Removes a note, or every note under a folder path. Returns the removed paths."""
+        i = self.ids.pop(rel_path, None)
+        if i is not None:
+            removed = [rel_path]
+            ids = [i]
+        else:
+            prefix = rel_path + os.sep
+            removed = [p for p in self.ids if p.startswith(prefix)]
+            ids = [self.ids.pop(p) for p in removed]
+        for i in ids:
+            self.paths[i] = self.keys[i] = self.titles[i] = None
+        return removed
+
+
+class TitleIndex:
+    """
+    In-memory trigram index over the path and title of every note, for the quick switcher.
+
+    search() ranks fuzzily: candidates share most of the query's trigrams (a few may be
+    missing, so typos still match), then title/prefix matches, shorter titles and
+    recently opened notes are scored up. Only the rarest trigrams' postings are walked,
+    which keeps a query within a frame on a 100k-note vault.
+
+    The full build runs on a TitleIndexBuilder thread; FileManager feeds watcher and save
+    events through add()/discard(), which are replayed on a build that is still running.
+    """
+    def __init__(self, recent: Iterable[str] = ()):
+        self._data = _Postings()
+        self._lock = threading.Lock()
+        self._recent: List[str] = list(recent)[:RECENT_LIMIT]
+        # add/discard calls made while a load() is building, replayed on its result
+        self._pending: Optional[List] = None
+        self._generation = 0
+        self.loaded = False
+
+    def load(self, rel_paths: Iterable[str]):
+        """Replaces the whole index (compacting removed ids). Safe to call from a worker thread."""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            if self._pending is None:
+                self._pending = []
+        data = _Postings(rel_paths)
+        with self._lock:
+            for op, rel_path in self._pending:
+                getattr(data, op)(rel_path)
+            if generation == self._generation:
+                self._pending = None
+            self._data = data
+            self.loaded = True
+
+    def add(self, rel_path: str):
+        if not rel_path.endswith('.md'):
+            return
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(('add', rel_path))
+            self._data.add(rel_path)
+
+    def discard(self, rel_path: str):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(('discard', rel_path))
+            removed = set(self._data.discard(rel_path))
+            if removed:
+                self._recent = [p for p in self._recent if p not in removed]
+
+    def touch(self, rel_path: str):
+        """Records that a note was opened (most recent first)."""
+        with self._lock:
+            if self._recent and self._recent[0] == rel_path:
+                return
+            if rel_path in self._recent:
+                self._recent.remove(rel_path)
+            self._recent.insert(0, rel_path)
+            del self._recent[RECENT_LIMIT:]
+
+    def recent(self) -> List[str]:
+        with self._lock:
+            return list(self._recent)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    # --- Queries ---
+
+    def search(self, query: str, limit: int = 50) -> List[str]:
+        """Best matching note paths for `query`, best first. An empty query lists recent notes."""
+        query = _normalize(query).strip()
+        with self._lock:
+            data = self._data
+            if not query:
+                return [p for p in self._recent if p in data.ids or not self.loaded][:limit]
+
+            tokens = query.split()
+            grams = set()
+            for token in tokens:
+                grams |= trigrams(token)
+            if grams:
+                # Exact trigram matches first; typo tolerance only when there are none
+                found = self._trigram_candidates(data, grams, 0)
+                if not found and len(grams) >= MISS_EVERY:
+                    found = self._trigram_candidates(data, grams, len(grams) // MISS_EVERY)
+                if not found and len(grams) > 2:
+                    found = self._trigram_candidates(data, grams, len(grams) // RELAXED_MISS_EVERY)
+            else:
+                posting = data.prefixes.get(tokens[0][:PREFIX_LEN], _EMPTY)
+                found = {i: 1 for i in posting if data.paths[i] is not None}
+
+            recent = {path: rank for rank, path in enumerate(self._recent)}
+            if len(found) > MAX_SCORED:
+                found = self._cut(data, found, max(tokens, key=len), not grams,
+                                  [data.ids[p] for p in recent if p in data.ids])
+            scored = []
+            for i, count in found.items():
+                score = self._score(data, i, query, tokens, count / len(grams) if grams else 1.0)
+                rank = recent.get(data.paths[i])
+                if rank is not None:
+                    score += RECENT_BOOST * (1 - rank / RECENT_LIMIT)
+                scored.append((score, data.paths[i]))
+        return [path for _score, path in heapq.nlargest(limit, scored)]
+
+    @staticmethod
+    def _trigram_candidates(data: _Postings, grams: set, misses: int) -> Dict[int, int]:
+        """{id: trigram hits} of the notes missing at most `misses` of the query trigrams."""
+        posts = sorted((data.grams[g] for g in grams if g in data.grams), key=len)
+        # Trigrams no note has are misses for every candidate
+        misses -= len(grams) - len(posts)
+        if misses < 0 or not posts:
+            return {}
+        if not misses:
+            # Every trigram required: intersect from the rarest posting up
+            ids = set(posts[0])
+            for post in posts[1:]:
+                if not ids:
+                    break
+                if len(ids) * 16 < len(post):
+                    ids = {i for i in ids if _contains(post, i)}
+                else:
+                    ids.intersection_update(post)
+            return {i: len(posts) for i in ids if data.paths[i] is not None}
+
+        # Pigeonhole: a match misses at most `misses` trigrams, so it is in one of the misses + 1 rarest postings
+        seeds = set()
+        for post in posts[:misses + 1]:
+            seeds.update(post)
+        hits = Counter()
+        for post in posts:
+            if len(seeds) * 16 < len(post):
+                hits.update(i for i in seeds if _contains(post, i))
+            else:
+                hits.update(seeds.intersection(post))
+        needed = len(posts) - misses
+        return {i: n for i, n in hits.items() if n >= needed and data.paths[i] is not None}
+
+    @staticmethod
+    def _cut(data: _Postings, found: Dict[int, int], token: str, prefix: bool, recent_ids: List[int]) -> Dict[int, int]:
+        """
+        Keeps MAX_SCORED candidates for full scoring: recent notes first, then the ones
+        whose title contains (or, for prefix queries, starts with) the longest token.
+        """
+        titles = data.titles
+        kept = {i: found[i] for i in recent_ids if i in found}
+        if prefix:
+            preferred = [i for i in found if titles[i].startswith(token)]
+        else:
+            preferred = [i for i in found if token in titles[i]]
+        for i in preferred[:MAX_SCORED - len(kept)]:
+            kept[i] = found[i]
+        if len(kept) < MAX_SCORED:
+            for i in found:
+                if i not in kept:
+                    kept[i] = found[i]
+                    if len(kept) >= MAX_SCORED:
+                        break
+        return kept
+
+    @staticmethod
+    def _score(data: _Postings, i: int, query: str, tokens: List[str], overlap: float) -> float:
+        title = data.titles[i]
+        key = data.keys[i]
+        score = 10.0 * overlap
+        if title == query:
+            score += 10
+        elif title.startswith(query):
+            score += 6
+        for token in tokens:
+            pos = title.find(token)
+            if pos == 0:
+                score += 4
+            elif pos > 0:
+                score += 3 if not title[pos - 1].isalnum() else 2
+            elif token in key:
+                score += 1  # folder match
+            else:
+                score -= 2  # only approximately present (typo)
+        return score - len(title) * 0.02
+
+
+class TitleIndexBuilder(QThread):
+    """Builds a TitleIndex off the GUI thread from a snapshot of the note paths."""
+    def __init__(self, title_index: TitleIndex, rel_paths: List[str]):
+        super().__init__()
+        self.title_index = title_index
+        self.rel_paths = rel_paths
+
+    def run(self):
+        self.title_index.load(self.rel_paths)
@@ -0,0 +1,344 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+from PySide6.QtCore import QThread, Signal
+
+# Hidden folder (skipped by every vault walk) that holds Cogny's persistent indexes
+INDEX_DIR_NAME = ".cogny"
+INDEX_DB_NAME = "index.db"
+SCHEMA_VERSION = "1"
+
+KIND_FOLDER = "folder"
+KIND_NOTE = "note"
+KIND_IMAGE = "image"
+KIND_FILE = "file"
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.svg')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    name TEXT NOT NULL,
+    title TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    kind TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_parent ON entries(parent);
+CREATE INDEX IF NOT EXISTS idx_entries_name ON entries(name);
+CREATE INDEX IF NOT EXISTS idx_entries_kind ON entries(kind);
+"""
+
+
+def classify(name: str, is_dir: bool) -> str:
+    """Returns the index kind of a directory entry."""
+    if is_dir:
+        return KIND_FOLDER
+    lower = name.lower()
+    if lower.endswith('.md'):
+        return KIND_NOTE
+    if lower.endswith(IMAGE_EXTENSIONS):
+        return KIND_IMAGE
+    return KIND_FILE
+
+
+def get_index_dir(root_path: str) -> str:
+    return os.path.join(root_path, INDEX_DIR_NAME)
+
+
+class VaultIndex:
+    """
+    Persistent metadata index of the vault stored in .cogny/index.db.
+    One row per visible file or folder: path, parent, title, size, mtime and kind.
+    Paths are relative to the vault root; the root itself is the parent ''.
+
+    Each thread gets its own SQLite connection, so the background builder,
+    the GUI thread and export workers can all query it safely.
+    """
+    def __init__(self, root_path: str):
+        self.root_path = os.path.abspath(root_path)
+        self.db_path = os.path.join(get_index_dir(self.root_path), INDEX_DB_NAME)
+        self._local = threading.local()
+        self.available = False
+        self._ready = False
+
+        try:
+            os.makedirs(get_index_dir(self.root_path), exist_ok=True)
+            conn = self._conn()
+            self._ensure_schema(conn)
+            self._ready = self._get_meta(conn, "built") == "1"
+            self.available = True
+        except Exception as e:
+            print(f"Error opening vault index {self.db_path}: {e}")
+
+    # --- Connections ---
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close_thread_connection(self):
+        """Closes the connection owned by the calling thread (workers call this on exit)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
+    def close(self):
+        self.close_thread_connection()
+
+    def _ensure_schema(self, conn):
+        conn.executescript(_SCHEMA)
+        if self._get_meta(conn, "schema_version") != SCHEMA_VERSION:
+            with conn:
+                conn.execute("DELETE FROM entries")
+                conn.execute("DELETE FROM meta")
+                self._set_meta(conn, "schema_version", SCHEMA_VERSION)
+
+    @staticmethod
+    def _get_meta(conn, key) -> Optional[str]:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _set_meta(conn, key, value):
+        conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, value))
+
+    def is_ready(self) -> bool:
+        """True once a full build has completed (in this session or a previous one)."""
+        return self.available and self._ready
+
+    # --- Scanning ---
+
+    def _scan_dir(self, rel_dir: str, recursive: bool) -> Iterator[Tuple]:
+        """Yields entry rows for a directory (and its subtree if recursive), skipping hidden names."""
+        pending = [rel_dir]
+        while pending:
+            current = pending.pop()
+            abs_dir = os.path.join(self.root_path, current) if current else self.root_path
+            try:
+                with os.scandir(abs_dir) as it:
+                    for entry in it:
+                        if entry.name.startswith('.'):
+                            continue
+                        try:
+                            is_dir = entry.is_dir()
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        path = os.path.join(current, entry.name) if current else entry.name
+                        kind = classify(entry.name, is_dir)
+                        title = entry.name if is_dir else os.path.splitext(entry.name)[0]
+                        yield (path, current, entry.name, title,
+                               0 if is_dir else st.st_size, st.st_mtime_ns, kind)
+                        if is_dir and recursive:
+                            pending.append(path)
+            except OSError as e:
+                print(f"Error scanning {abs_dir}: {e}")
+
+    def _row_for_path(self, rel_path: str) -> Optional[Tuple]:
+        abs_path = os.path.join(self.root_path, rel_path)
+        try:
+            st = os.stat(abs_path)
+        except OSError:
+            return None
+        name = os.path.basename(rel_path)
+        is_dir = os.path.isdir(abs_path)
+        title = name if is_dir else os.path.splitext(name)[0]
+        return (rel_path, os.path.dirname(rel_path), name, title,
+                0 if is_dir else st.st_size, st.st_mtime_ns, classify(name, is_dir))
+
+    # --- Writes ---
+
+    def build(self, should_stop=None) -> int:
+        """
+        Full reconcile of the index against the disk.
+        Only rows whose size/mtime changed are rewritten. Returns the entry count.
+        """
+        if not self.available:
+            return 0
+        conn = self._conn()
+        existing = {path: (size, mtime) for path, size, mtime in
+                    conn.execute("SELECT path, size, mtime FROM entries")}
+
+        upserts = []
+        seen = set()
+        for row in self._scan_dir("", recursive=True):
+            if should_stop and should_stop():
+                return len(existing)
+            path = row[0]
+            seen.add(path)
+            if existing.get(path) != (row[4], row[5]):
+                upserts.append(row)
+
+        removed = [(p,) for p in existing.keys() - seen]
+
+        with conn:
+            if upserts:
+                conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)", upserts)
+            if removed:
+                conn.executemany("DELETE FROM entries WHERE path = ?", removed)
+            self._set_meta(conn, "built", "1")
+
+        self._ready = True
+        return len(seen)
+
+    def upsert_path(self, rel_path: str) -> bool:
+        """Re-stats a single path. Removes it from the index if it no longer exists."""
+        if not self.available or not rel_path:
+            return False
+        row = self._row_for_path(rel_path)
+        if row is None:
+            self.remove_path(rel_path)
+            return False
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+        return True
+
+    def remove_path(self, rel_path: str):
+        """Removes a path and, for folders, its whole subtree."""
+        if not self.available or not rel_path:
+            return
+        prefix = rel_path + os.sep
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM entries WHERE path = ? OR substr(path, 1, ?) = ?",
+                         (rel_path, len(prefix), prefix))
+
+    def refresh_directory(self, rel_dir: str) -> Tuple[List[str], List[str]]:
+        """
+        Incremental update for one directory, as reported by the watcher.
+        Compares its direct children with the index; new folders are scanned recursively.
+        Returns (changed_paths, removed_paths).
+        """
+        if not self.available:
+            return [], []
+        rel_dir = "" if rel_dir in (".", None) else rel_dir
+        abs_dir = os.path.join(self.root_path, rel_dir) if rel_dir else self.root_path
+        if rel_dir and not os.path.isdir(abs_dir):
+            self.remove_path(rel_dir)
+            return [], [rel_dir]
+
+        conn = self._conn()
+        existing = {path: (size, mtime, kind) for path, size, mtime, kind in
+                    conn.execute("SELECT path, size, mtime, kind FROM entries WHERE parent = ?", (rel_dir,))}
+
+        upserts = []
+        new_folders = []
+        seen = set()
+        for row in self._scan_dir(rel_dir, recursive=False):
+            path = row[0]
+            seen.add(path)
+            old = existing.get(path)
+            if old != (row[4], row[5], row[6]):
+                upserts.append(row)
+                if row[6] == KIND_FOLDER and (old is None or old[2] != KIND_FOLDER):
+                    new_folders.append(path)
+
+        for folder in new_folders:
+            upserts.extend(self._scan_dir(folder, recursive=True))
+
+        removed = list(existing.keys() - seen)
+        with conn:
+            if upserts:
+                conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)", upserts)
+            for path in removed:
+                prefix = path + os.sep
+                conn.execute("DELETE FROM entries WHERE path = ? OR substr(path, 1, ?) = ?",
+                             (path, len(prefix), prefix))
+
+        return [row[0] for row in upserts], removed
+
+    # --- Queries ---
+
+    def list_entries(self, kinds: Tuple[str, ...] = (KIND_FOLDER, KIND_NOTE, KIND_IMAGE)) -> List[Dict]:
+        """Returns every indexed entry of the given kinds."""
+        placeholders = ",".join("?" for _ in kinds)
+        rows = self._conn().execute(
+            f"SELECT path, parent, name, title, size, mtime, kind FROM entries WHERE kind IN ({placeholders})",
+            tuple(kinds))
+        return [self._row_to_dict(r) for r in rows]
+
+    def get_children(self, rel_dir: Optional[str]) -> List[Dict]:
+        rows = self._conn().execute(
+            "SELECT path, parent, name, title, size, mtime, kind FROM entries WHERE parent = ?",
+            (rel_dir or "",))
+        return [self._row_to_dict(r) for r in rows]
+
+    def get_entry(self, rel_path: str) -> Optional[Dict]:
+        row = self._conn().execute(
+            "SELECT path, parent, name, title, size, mtime, kind FROM entries WHERE path = ?",
+            (rel_path,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def iter_paths(self, kind: str = KIND_NOTE) -> List[str]:
+        """Relative paths of every entry of a kind, in path order."""
+        rows = self._conn().execute("SELECT path FROM entries WHERE kind = ? ORDER BY path", (kind,))
+        return [r[0] for r in rows]
+
+    def file_paths(self) -> List[str]:
+        """Relative paths of every file (anything that is not a folder)."""
+        rows = self._conn().execute("SELECT path FROM entries WHERE kind != ?", (KIND_FOLDER,))
+        return [r[0] for r in rows]
+
+    def find_by_name(self, name: str) -> List[str]:
+        """Relative paths of every entry whose basename is exactly `name`."""
+        rows = self._conn().execute("SELECT path FROM entries WHERE name = ? ORDER BY length(path)", (name,))
+        return [r[0] for r in rows]
+
+    def first_note(self) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT path FROM entries WHERE kind = ? ORDER BY parent, path LIMIT 1", (KIND_NOTE,)).fetchone()
+        return row[0] if row else None
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @staticmethod
+    def _row_to_dict(row) -> Dict:
+        path, parent, name, title, size, mtime, kind = row
+        return {
+            'path': path,
+            'parent': parent or None,
+            'name': name,
+            'title': title,
+            'size': size,
+            'mtime': mtime,
+            'kind': kind,
+        }
+
+
+class VaultIndexBuilder(QThread):
+    """Builds (or reconciles) the vault index once in the background."""
+    finished_build = Signal(int) # entry count
+
+    def __init__(self, index: VaultIndex):
+        super().__init__()
+        self.index = index
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+
+    def run(self):
+        count = 0
+        try:
+            count = self.index.build(should_stop=lambda: self._stop)
+        except Exception as e:
+            print(f"Error building vault index: {e}")
+        finally:
+            self.index.close_thread_connection()
+        if not self._stop:
+            self.finished_build.emit(count)
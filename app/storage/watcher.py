@@ -1,31 +1,458 @@
 import os
-from PySide6.QtCore import QObject, Signal, QFileSystemWatcher
+import sys
+import select
+import struct
+import threading
+from collections import OrderedDict
+from PySide6.QtCore import QObject, Signal, QFileSystemWatcher, QTimer, QElapsedTimer, Qt
 
-class VaultWatcher(QObject):
-    file_changed = Signal(str) # rel_path
-    directory_changed = Signal(str) # path changed
-    
-    def __init__(self, vault_path: str):
+# Change kinds in a change set
+CHANGE_CREATED = "created"
+CHANGE_MODIFIED = "modified"
+CHANGE_DELETED = "deleted"
+CHANGE_MOVED = "moved"
+# Events were lost (kernel queue overflow): consumers must rescan everything
+CHANGE_RESCAN = "rescan"
+
+# A change set is emitted once no event arrived for DEBOUNCE_MS,
+# or at the latest MAX_DELAY_MS after the first pending event.
+DEBOUNCE_MS = 200
+MAX_DELAY_MS = 1000
+
+
+def _is_hidden(rel_path: str) -> bool:
+    return any(part.startswith('.') for part in rel_path.split(os.sep) if part)
+
+
+# --- inotify backend (Linux) ---
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_EXCL_UNLINK = 0x04000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (_IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE |
+               _IN_DELETE_SELF | _IN_ONLYDIR | _IN_EXCL_UNLINK)
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class _InotifyBackend(QObject):
+    """
+    One inotify instance for the whole vault, read on a daemon thread.
+    Directories are registered in the background and as they are created; hidden
+    trees are never registered. Raw events are handed over in one list per read.
+    """
+    raw_events = Signal(list) # [(kind, rel_path, old_rel_path, is_dir)]
+
+    def __init__(self, vault_path):
         super().__init__()
+        import ctypes
         self.vault_path = vault_path
-        self.watcher = QFileSystemWatcher()
-        self.watcher.addPath(vault_path)
-        
-        # Recursively add subdirectories
-        for root, dirs, _ in os.walk(vault_path):
-            # Ignore hidden
-            if any(part.startswith('.') for part in root.split(os.sep)):
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self._ctypes = ctypes
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._wd_paths = {} # wd -> rel_dir
+        self._lock = threading.Lock()
+        self._limit_warned = False
+        self._stop_r, self._stop_w = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="VaultWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        try:
+            os.write(self._stop_w, b'x')
+        except OSError:
+            pass
+        self._thread.join(2)
+        for fd in (self._fd, self._stop_r, self._stop_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def watch_count(self):
+        with self._lock:
+            return len(self._wd_paths)
+
+    def _add_watch(self, rel_dir):
+        abs_dir = os.path.join(self.vault_path, rel_dir) if rel_dir else self.vault_path
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(abs_dir), _WATCH_MASK)
+        if wd < 0:
+            errno = self._ctypes.get_errno()
+            if errno == 28 and not self._limit_warned: # ENOSPC: max_user_watches reached
+                self._limit_warned = True
+                print("WARNING VaultWatcher: inotify watch limit reached; "
+                      "raise fs.inotify.max_user_watches to watch the whole vault.")
+            return False
+        with self._lock:
+            self._wd_paths[wd] = rel_dir
+        return True
+
+    def _add_tree(self, rel_dir):
+        """Registers a directory and every visible subdirectory."""
+        pending = [rel_dir]
+        while pending:
+            current = pending.pop()
+            if not self._add_watch(current):
+                continue
+            abs_dir = os.path.join(self.vault_path, current) if current else self.vault_path
+            try:
+                with os.scandir(abs_dir) as it:
+                    for entry in it:
+                        if not entry.name.startswith('.') and entry.is_dir(follow_symlinks=False):
+                            pending.append(os.path.join(current, entry.name) if current else entry.name)
+            except OSError:
+                pass
+
+    def _forget_tree(self, rel_dir):
+        prefix = rel_dir + os.sep
+        with self._lock:
+            gone = [wd for wd, p in self._wd_paths.items() if p == rel_dir or p.startswith(prefix)]
+            for wd in gone:
+                del self._wd_paths[wd]
+        for wd in gone:
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def _rename_tree(self, old_rel, new_rel):
+        prefix = old_rel + os.sep
+        with self._lock:
+            for wd, p in self._wd_paths.items():
+                if p == old_rel:
+                    self._wd_paths[wd] = new_rel
+                elif p.startswith(prefix):
+                    self._wd_paths[wd] = new_rel + p[len(old_rel):]
+
+    def _run(self):
+        self._add_tree("")
+        while True:
+            try:
+                ready, _, _ = select.select([self._fd, self._stop_r], [], [])
+            except (OSError, ValueError):
+                return
+            if self._stop_r in ready:
+                return
+            try:
+                data = os.read(self._fd, 256 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                return
+            events = self._parse(data)
+            if events:
+                self.raw_events.emit(events)
+
+    def _parse(self, data):
+        events = []
+        moved_from = {} # cookie -> (rel_path, is_dir)
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                events.append((CHANGE_RESCAN, "", None, True))
                 continue
-            self.watcher.addPath(root)
-            
+            with self._lock:
+                rel_dir = self._wd_paths.get(wd)
+                if mask & _IN_IGNORED:
+                    self._wd_paths.pop(wd, None)
+            if rel_dir is None or not name:
+                continue
+
+            rel_path = os.path.join(rel_dir, name) if rel_dir else name
+            is_dir = bool(mask & _IN_ISDIR)
+            hidden = name.startswith('.')
+
+            if mask & _IN_MOVED_FROM:
+                moved_from[cookie] = (rel_path, is_dir, hidden)
+            elif mask & _IN_MOVED_TO:
+                source = moved_from.pop(cookie, None)
+                if hidden:
+                    if source and not source[2]:
+                        events.append((CHANGE_DELETED, source[0], None, source[1]))
+                        if source[1]:
+                            self._forget_tree(source[0])
+                    continue
+                if source is None:
+                    # Moved in from outside the vault (or from an unwatched folder)
+                    if is_dir:
+                        self._add_tree(rel_path)
+                    events.append((CHANGE_CREATED, rel_path, None, is_dir))
+                elif source[2]:
+                    # Atomic save: hidden temp file renamed over the note
+                    events.append((CHANGE_MODIFIED, rel_path, None, is_dir))
+                else:
+                    if is_dir:
+                        self._rename_tree(source[0], rel_path)
+                    events.append((CHANGE_MOVED, rel_path, source[0], is_dir))
+            elif hidden:
+                continue
+            elif mask & _IN_CREATE:
+                if is_dir:
+                    self._add_tree(rel_path)
+                events.append((CHANGE_CREATED, rel_path, None, is_dir))
+            elif mask & _IN_DELETE:
+                if is_dir:
+                    self._forget_tree(rel_path)
+                events.append((CHANGE_DELETED, rel_path, None, is_dir))
+            elif mask & (_IN_CLOSE_WRITE | _IN_MODIFY):
+                events.append((CHANGE_MODIFIED, rel_path, None, is_dir))
+
+        # Moved out of the vault (no matching IN_MOVED_TO)
+        for rel_path, is_dir, hidden in moved_from.values():
+            if hidden:
+                continue
+            if is_dir:
+                self._forget_tree(rel_path)
+            events.append((CHANGE_DELETED, rel_path, None, is_dir))
+        return events
+
+
+# --- QFileSystemWatcher backend (other platforms / inotify unavailable) ---
+
+class _QtBackend(QObject):
+    """
+    Portable fallback. Watches directories only (registered lazily as they are found)
+    and diffs each changed directory against a snapshot of its entries; a deleted and a
+    created entry with the same inode are reported as a rename. Content changes of
+    existing files are not seen by directory watches.
+    """
+    raw_events = Signal(list)
+
+    def __init__(self, vault_path):
+        super().__init__()
+        self.vault_path = vault_path
+        self.watcher = QFileSystemWatcher()
+        self._snapshots = {} # rel_dir -> {name: (inode, is_dir)}
         self.watcher.directoryChanged.connect(self._on_dir_changed)
-        self.watcher.fileChanged.connect(self._on_file_changed)
+        # Registration happens after the event loop starts, so startup is not blocked
+        QTimer.singleShot(0, lambda: self._add_tree(""))
+
+    def stop(self):
+        paths = self.watcher.directories()
+        if paths:
+            self.watcher.removePaths(paths)
+
+    def watch_count(self):
+        return len(self.watcher.directories())
+
+    def _snapshot(self, rel_dir):
+        abs_dir = os.path.join(self.vault_path, rel_dir) if rel_dir else self.vault_path
+        entries = {}
+        try:
+            with os.scandir(abs_dir) as it:
+                for entry in it:
+                    if not entry.name.startswith('.'):
+                        entries[entry.name] = (entry.inode(), entry.is_dir(follow_symlinks=False))
+        except OSError:
+            return None
+        return entries
+
+    def _add_tree(self, rel_dir):
+        pending = [rel_dir]
+        while pending:
+            current = pending.pop()
+            entries = self._snapshot(current)
+            if entries is None:
+                continue
+            self._snapshots[current] = entries
+            self.watcher.addPath(os.path.join(self.vault_path, current) if current else self.vault_path)
+            pending.extend(os.path.join(current, n) if current else n for n, (_, d) in entries.items() if d)
+
+    def _forget_tree(self, rel_dir):
+        prefix = rel_dir + os.sep
+        for path in [p for p in self._snapshots if p == rel_dir or p.startswith(prefix)]:
+            del self._snapshots[path]
+            self.watcher.removePath(os.path.join(self.vault_path, path))
 
     def _on_dir_changed(self, path):
-        print(f"DEBUG: Directory changed: {path}")
-        self.directory_changed.emit(path)
+        rel_dir = os.path.relpath(path, self.vault_path)
+        rel_dir = "" if rel_dir == "." else rel_dir
+        if rel_dir.startswith('..') or _is_hidden(rel_dir):
+            return
+        old = self._snapshots.get(rel_dir)
+        new = self._snapshot(rel_dir)
+        if old is None:
+            return
+        if new is None:
+            return # Deleted: reported by the parent directory
+        self._snapshots[rel_dir] = new
+
+        join = (lambda n: os.path.join(rel_dir, n)) if rel_dir else (lambda n: n)
+        removed = {n: v for n, v in old.items() if n not in new or new[n][0] != v[0]}
+        added = {n: v for n, v in new.items() if n not in old or old[n][0] != v[0]}
+        by_inode = {v[0]: n for n, v in removed.items()}
+
+        moves = {}
+        for name, (inode, _) in added.items():
+            source = by_inode.pop(inode, None)
+            if source is not None:
+                del removed[source]
+                moves[name] = source
+
+        # Deletions first: a name replaced by a new inode (an external atomic save)
+        # reads as deleted + created, which _merge turns into modified
+        events = []
+        for name, (_, is_dir) in removed.items():
+            if is_dir:
+                self._forget_tree(join(name))
+            events.append((CHANGE_DELETED, join(name), None, is_dir))
+        for name, (_, is_dir) in added.items():
+            source = moves.get(name)
+            if source is not None:
+                if is_dir:
+                    self._forget_tree(join(source))
+                    self._add_tree(join(name))
+                events.append((CHANGE_MOVED, join(name), join(source), is_dir))
+            else:
+                if is_dir:
+                    self._add_tree(join(name))
+                events.append((CHANGE_CREATED, join(name), None, is_dir))
+        if events:
+            self.raw_events.emit(events)
+
+
+class VaultWatcher(QObject):
+    """
+    Watches the vault and emits coalesced change sets.
+
+    Bursts of events (git checkout, sync clients) are merged per debounce window into
+    one `changes` list of {'path', 'kind', 'old_path', 'is_dir'} dicts with vault-relative
+    paths, kind being created / modified / deleted / moved (old_path set) / rescan.
+    Hidden files and folders are ignored. Uses inotify on Linux, QFileSystemWatcher elsewhere.
+    """
+    changes = Signal(list)
+    directory_changed = Signal(str) # abs path of each directory touched by a change set
+
+    def __init__(self, vault_path: str):
+        super().__init__()
+        self.vault_path = os.path.abspath(vault_path)
+        self._pending = OrderedDict() # path -> change dict
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.timeout.connect(self._emit_changes)
+        self._first_event = QElapsedTimer()
+        self._holds = 0 # hold() depth: events are merged but not emitted
+
+        self.backend = None
+        if sys.platform.startswith('linux'):
+            try:
+                self.backend = _InotifyBackend(self.vault_path)
+            except Exception as e:
+                print(f"VaultWatcher: inotify unavailable ({e}), using QFileSystemWatcher.")
+        if self.backend is None:
+            self.backend = _QtBackend(self.vault_path)
+        self.backend.raw_events.connect(self._on_raw_events, Qt.QueuedConnection)
+
+    def stop(self):
+        self._debounce.stop()
+        self.backend.stop()
+
+    def watch_count(self) -> int:
+        return self.backend.watch_count()
+
+    def hold(self):
+        """Keeps merging events without emitting them until the matching release()."""
+        self._holds += 1
+        self._debounce.stop()
+
+    def release(self):
+        """
+        Ends a hold(). The merged change set is emitted one debounce window later, so
+        the raw events of the held operations (queued from the backend) join it.
+        """
+        self._holds = max(0, self._holds - 1)
+        if self._holds == 0:
+            self._first_event.invalidate()
+            self._debounce.start(DEBOUNCE_MS)
+
+    # --- Coalescing ---
+
+    def _on_raw_events(self, events):
+        for kind, path, old_path, is_dir in events:
+            self._merge(kind, path, old_path, is_dir)
+        if not self._pending or self._holds:
+            return
+        if not self._first_event.isValid():
+            self._first_event.start()
+        remaining = MAX_DELAY_MS - self._first_event.elapsed()
+        self._debounce.start(max(0, min(DEBOUNCE_MS, remaining)))
+
+    def _merge(self, kind, path, old_path, is_dir):
+        pending = self._pending
+        if kind == CHANGE_RESCAN:
+            pending.clear()
+            pending[""] = self._change(CHANGE_RESCAN, "", None, True)
+            return
+        if "" in pending:
+            return # A full rescan is already due
+
+        prev = pending.get(path)
+        if kind == CHANGE_CREATED:
+            if prev and prev['kind'] == CHANGE_DELETED and not is_dir:
+                pending[path] = self._change(CHANGE_MODIFIED, path, None, is_dir)
+            else:
+                pending.pop(path, None)
+                pending[path] = self._change(CHANGE_CREATED, path, None, is_dir)
+        elif kind == CHANGE_MODIFIED:
+            if prev is None or prev['kind'] == CHANGE_DELETED:
+                pending[path] = self._change(CHANGE_MODIFIED, path, None, is_dir)
+            # created / moved / modified already cover a content change
+        elif kind == CHANGE_DELETED:
+            if is_dir:
+                prefix = path + os.sep
+                for p in [p for p in pending if p.startswith(prefix)]:
+                    del pending[p]
+            if prev and prev['kind'] == CHANGE_CREATED:
+                del pending[path] # Never existed as far as consumers know
+            elif prev and prev['kind'] == CHANGE_MOVED:
+                del pending[path]
+                pending[prev['old_path']] = self._change(CHANGE_DELETED, prev['old_path'], None, is_dir)
+            else:
+                pending[path] = self._change(CHANGE_DELETED, path, None, is_dir)
+        elif kind == CHANGE_MOVED:
+            source = pending.pop(old_path, None)
+            if source and source['kind'] == CHANGE_CREATED:
+                pending[path] = self._change(CHANGE_CREATED, path, None, is_dir)
+            elif source and source['kind'] == CHANGE_MOVED:
+                pending[path] = self._change(CHANGE_MOVED, path, source['old_path'], is_dir)
+            else:
+                pending[path] = self._change(CHANGE_MOVED, path, old_path, is_dir)
+
+    @staticmethod
+    def _change(kind, path, old_path, is_dir):
+        return {'path': path, 'kind': kind, 'old_path': old_path, 'is_dir': is_dir}
+
+    def _emit_changes(self):
+        changes = list(self._pending.values())
+        self._pending = OrderedDict()
+        self._first_event.invalidate()
+        if not changes:
+            return
+        self.changes.emit(changes)
 
-    def _on_file_changed(self, path):
-        # Update specific file
-        rel_path = os.path.relpath(path, self.vault_path)
-        self.file_changed.emit(rel_path)
+        dirs = []
+        for change in changes:
+            for p in (change['path'], change['old_path']):
+                if p is None:
+                    continue
+                parent = os.path.dirname(p) if p else ""
+                abs_dir = os.path.join(self.vault_path, parent) if parent else self.vault_path
+                if abs_dir not in dirs:
+                    dirs.append(abs_dir)
+        for abs_dir in dirs:
+            self.directory_changed.emit(abs_dir)
@@ -5,6 +5,9 @@ from PySide6.QtGui import QColor
 import json
 from app.ui.themes import ThemeManager
 
+# Themes whose dialogs use the dark palette
+DARK_THEMES = ["Dark", "Dracula", "AnuPpuccin", "Midnight Gold"]
+
 class ModernDialog(QDialog):
     def __init__(self, title, message, parent=None):
         super().__init__(parent)
@@ -19,7 +22,7 @@ class ModernDialog(QDialog):
         self.setLayout(self.layout)
         
         # Determine specific colors based on theme
-        if self.current_theme in ["Dark", "Dracula", "AnuPpuccin", "Midnight Gold"]:
+        if self.current_theme in DARK_THEMES:
             bg_color = "#18181b"
             border_color = "#3f3f46"
             text_color = "#e4e4e7"
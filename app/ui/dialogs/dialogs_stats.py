@@ -0,0 +1,126 @@
+import os
+from PySide6.QtWidgets import QLabel, QGridLayout, QWidget, QSizePolicy
+from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QPainter, QColor
+from app.ui.widgets import ModernDialog, DARK_THEMES
+
+TOTAL_LABELS = [
+    ('notes', "Notas"),
+    ('words', "Palabras"),
+    ('chars', "Caracteres"),
+    ('headings', "Encabezados"),
+    ('images', "Imágenes"),
+    ('links', "Vínculos"),
+    ('bytes', "Tamaño"),
+]
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class DailyChart(QWidget):
+    """Bar chart of one daily delta series (positive up, negative down)."""
+    def __init__(self, values, color, text_color, parent=None):
+        super().__init__(parent)
+        self.values = values
+        self.color = QColor(color)
+        self.text_color = QColor(text_color)
+        self.setMinimumHeight(120)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = self.rect().adjusted(2, 2, -2, -2)
+        peak = max((abs(v) for v in self.values), default=0) or 1
+        has_negative = any(v < 0 for v in self.values)
+        baseline = rect.top() + rect.height() * (0.7 if has_negative else 1.0)
+        up = baseline - rect.top()
+        down = rect.bottom() - baseline
+
+        slot = rect.width() / max(1, len(self.values))
+        for i, value in enumerate(self.values):
+            if not value:
+                continue
+            height = (up if value > 0 else down) * abs(value) / peak
+            x = rect.left() + i * slot + slot * 0.15
+            top = baseline - height if value > 0 else baseline
+            painter.fillRect(QRectF(x, top, slot * 0.7, max(1.0, height)),
+                             self.color if value > 0 else self.text_color)
+
+        painter.setPen(self.text_color)
+        painter.drawLine(rect.left(), int(baseline), rect.right(), int(baseline))
+        painter.end()
+
+
+class StatsDialog(ModernDialog):
+    """Writing statistics dashboard; all figures come precomputed from the stats index."""
+    def __init__(self, stats, parent=None):
+        super().__init__("Estadísticas e Insights", None, parent)
+        self.setMinimumWidth(560)
+        dark = self.current_theme in DARK_THEMES
+        text_color = "#e4e4e7" if dark else "#18181b"
+        subtext_color = "#a1a1aa" if dark else "#52525b"
+        accent = "#8b5cf6"
+
+        def label(text, size=13, color=text_color, bold=False):
+            lbl = QLabel(text)
+            weight = "font-weight: 600;" if bold else ""
+            lbl.setStyleSheet(f"color: {color}; font-size: {size}px; border: none; {weight}")
+            return lbl
+
+        if not stats.get('ready'):
+            self.content_layout.insertWidget(
+                self.content_layout.count() - 1,
+                label("Indexando la bóveda: las cifras pueden estar incompletas.", 12, subtext_color))
+
+        # Totals
+        totals = stats.get('totals', {})
+        grid = QGridLayout()
+        grid.setHorizontalSpacing(24)
+        for i, (metric, name) in enumerate(TOTAL_LABELS):
+            value = totals.get(metric, 0)
+            text = format_bytes(value) if metric == 'bytes' else f"{value:,}".replace(",", ".")
+            grid.addWidget(label(name, 12, subtext_color), (i // 4) * 2, i % 4)
+            grid.addWidget(label(text, 18, text_color, bold=True), (i // 4) * 2 + 1, i % 4)
+        self._add(grid)
+
+        # Writing habits: daily word deltas
+        daily = stats.get('daily', [])
+        words = [deltas['words'] for _day, deltas in daily]
+        active = sum(1 for _day, deltas in daily if any(deltas.values()))
+        written = sum(v for v in words if v > 0)
+        self._add(label(f"Palabras por día (últimos {len(daily)} días)", 14, text_color, bold=True))
+        self._add(DailyChart(words, accent, subtext_color))
+        if daily:
+            self._add(label(f"{daily[0][0]:%d/%m} – {daily[-1][0]:%d/%m}  ·  {active} días activos  ·  "
+                            f"{written:,} palabras escritas".replace(",", "."), 12, subtext_color))
+
+        # Database growth: notes and size gained in the period
+        notes_gained = sum(deltas['notes'] for _day, deltas in daily)
+        bytes_gained = sum(deltas['bytes'] for _day, deltas in daily)
+        self._add(label(f"Crecimiento: {notes_gained:+d} notas, {'+' if bytes_gained >= 0 else '-'}"
+                        f"{format_bytes(abs(bytes_gained))}", 12, subtext_color))
+
+        # Largest notes
+        top = stats.get('top_notes', [])
+        if top:
+            self._add(label("Notas más extensas", 14, text_color, bold=True))
+            for rel_path, count in top[:5]:
+                title = os.path.splitext(os.path.basename(rel_path))[0]
+                self._add(label(f"{title}  —  {count:,} palabras".replace(",", "."), 12, subtext_color))
+
+        self.add_button("Cerrar", "primary")
+
+    def _add(self, item):
+        # Keep the button row last
+        index = self.content_layout.count() - 1
+        if isinstance(item, QWidget):
+            self.content_layout.insertWidget(index, item)
+        else:
+            self.content_layout.insertLayout(index, item)
@@ -0,0 +1,92 @@
+import os
+from PySide6.QtWidgets import QLineEdit, QListWidget, QListWidgetItem, QLabel
+from PySide6.QtCore import Qt
+from app.ui.widgets import ModernDialog, DARK_THEMES
+
+MAX_RESULTS = 50
+
+
+class QuickSwitcherDialog(ModernDialog):
+    """
+    Ctrl+P note switcher. Every keystroke queries the in-memory title index directly
+    (no debounce: a query fits in a frame); an empty query lists the recent notes.
+    """
+    def __init__(self, file_manager, parent=None):
+        super().__init__(None, None, parent)
+        self.fm = file_manager
+        self.selected_note = None
+        self.setMinimumWidth(560)
+
+        dark = self.current_theme in DARK_THEMES
+        text_color = "#e4e4e7" if dark else "#18181b"
+        subtext_color = "#a1a1aa" if dark else "#52525b"
+        border_color = "#3f3f46" if dark else "#e4e4e7"
+        selected_bg = "#3f3f46" if dark else "#ede9fe"
+
+        self.input = QLineEdit()
+        self.input.setPlaceholderText("Buscar nota por título o ruta...")
+        self.input.setStyleSheet(f"""
+            QLineEdit {{
+                color: {text_color}; background: transparent; font-size: 15px;
+                border: 1px solid {border_color}; border-radius: 8px; padding: 8px;
+            }}
+        """)
+        self.input.textChanged.connect(self.update_results)
+        self.input.returnPressed.connect(self.accept_current)
+
+        self.list_widget = QListWidget()
+        self.list_widget.setMinimumHeight(320)
+        self.list_widget.setStyleSheet(f"""
+            QListWidget {{ color: {text_color}; background: transparent; border: none; font-size: 13px; }}
+            QListWidget::item {{ padding: 6px; border-radius: 6px; }}
+            QListWidget::item:selected {{ background: {selected_bg}; color: {text_color}; }}
+        """)
+        self.list_widget.itemActivated.connect(self.accept_current)
+        self.list_widget.itemClicked.connect(self.accept_current)
+
+        self.hint = QLabel()
+        self.hint.setStyleSheet(f"color: {subtext_color}; font-size: 12px; border: none;")
+
+        # Above the (empty) button row
+        for widget in (self.input, self.list_widget, self.hint):
+            self.content_layout.insertWidget(self.content_layout.count() - 1, widget)
+
+        self.update_results("")
+        self.input.setFocus()
+
+    def update_results(self, text):
+        self.list_widget.clear()
+        for rel_path in self.fm.search_note_titles(text, MAX_RESULTS):
+            title = os.path.splitext(os.path.basename(rel_path))[0]
+            folder = os.path.dirname(rel_path)
+            item = QListWidgetItem(f"{title}    {folder}" if folder else title)
+            item.setData(Qt.UserRole, rel_path)
+            item.setToolTip(rel_path)
+            self.list_widget.addItem(item)
+        if self.list_widget.count():
+            self.list_widget.setCurrentRow(0)
+
+        if not self.fm.title_index.loaded:
+            self.hint.setText("Indexando notas...")
+        elif not self.list_widget.count():
+            self.hint.setText("Sin resultados" if text.strip() else "Escribe para buscar")
+        else:
+            self.hint.setText("↑↓ para navegar · Enter para abrir · Esc para cerrar")
+
+    def keyPressEvent(self, event):
+        # Arrow keys move the selection while the focus stays in the query field
+        if event.key() in (Qt.Key_Down, Qt.Key_Up, Qt.Key_PageDown, Qt.Key_PageUp):
+            count = self.list_widget.count()
+            if count:
+                step = {Qt.Key_Down: 1, Qt.Key_Up: -1, Qt.Key_PageDown: 10, Qt.Key_PageUp: -10}[event.key()]
+                row = min(count - 1, max(0, self.list_widget.currentRow() + step))
+                self.list_widget.setCurrentRow(row)
+            return
+        super().keyPressEvent(event)
+
+    def accept_current(self, *args):
+        item = self.list_widget.currentItem()
+        if item is None:
+            return
+        self.selected_note = item.data(Qt.UserRole)
+        self.accept()
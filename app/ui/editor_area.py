@@ -6,8 +6,19 @@ from app.ui.editors.note_editor import NoteEditor
 from app.ui.components.inputs import TitleEditor
 from app.ui.components.dialogs import ModernInfo, ModernAlert, ModernConfirm
 from app.ui.editors.highlighter import MarkdownHighlighter
+from app.ui.editors.chunk_loader import ChunkLoader, focus_offset
 from app.ui.themes import ThemeManager
 from app.ui.markdown_renderer import MarkdownRenderer
+from app.storage.link_rewriter import link_replacements
+import hashlib
+
+
+# Characters of the first visible line kept to find the reading position again
+READING_LINE_CHARS = 80
+
+
+def content_hash(content):
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
 
 class EditorArea(QWidget):
     status_message = Signal(str, int) # message, timeout
@@ -18,11 +29,15 @@ class EditorArea(QWidget):
         super().__init__(parent)
         self.fm = file_manager
         self.current_note_id = None
+        # Hash of the content last loaded/written for current_note_id (dirty tracking)
+        self._saved_hash = None
         # self.note_loader = None removed
         self.setup_ui()
+        self.fm.note_saved.connect(self._on_note_saved)
 
     def set_file_manager(self, file_manager):
         self.fm = file_manager
+        self.fm.note_saved.connect(self._on_note_saved)
         self.text_editor.fm = file_manager
         # Reset editor
         self.clear()
@@ -59,6 +74,10 @@ class EditorArea(QWidget):
         # Highlighter
         self.highlighter = MarkdownHighlighter(self.text_editor.document(), self.text_editor)
         self.text_editor.highlighter = self.highlighter
+
+        # Progressive loading of the note text (frame-budgeted slices)
+        self.chunk_loader = ChunkLoader(self.text_editor, parent=self)
+        self.chunk_loader.finished.connect(self._on_chunks_loaded)
         
         # Load Theme
         self.apply_current_theme()
@@ -86,21 +105,22 @@ class EditorArea(QWidget):
 
     def load_note(self, note_id, is_folder=None, title=None, preload_images=False, async_load=True):
         if is_folder:
+             self.remember_position()
+             self.chunk_loader.cancel()
              self.current_note_id = None
              self.show_folder_placeholder(title)
              return
 
+        # Leaving the previous note (or reloading this one): keep its reading position
+        self.remember_position()
+        self.chunk_loader.cancel()
         self.current_note_id = note_id
+        self._saved_hash = None
         
         
-        # Save Last Opened Note for Splash Screen logic
-        try:
-             # We assume ConfigManager is available or can be instantiated (since it is lightweight)
-             from app.storage.config_manager import ConfigManager
-             config = ConfigManager(self.fm.root_path)
-             config.save_config("last_opened_note", note_id)
-        except Exception as e:
-             print(f"Error saving last opened note: {e}")
+        # Save Last Opened Note for Splash Screen logic (in memory; the shared config writes it back later)
+        self.fm.config.save_config("last_opened_note", note_id)
+        self.fm.record_note_opened(note_id)
         
         
         # Display Title (Strip .md extension)
@@ -144,8 +164,11 @@ class EditorArea(QWidget):
                 return
             self._on_content_ready(markdown_content, note_id, preload_images, async_load)
 
-        if async_load:
-            self.fm.read_note_async(note_id, on_loaded)
+        if async_load and not preload_images and self.fm.should_stream(note_id):
+            # Very large note: show the first chunk as soon as it is decoded
+            self._start_streaming(note_id)
+        elif async_load:
+            self.fm.read_note_async(note_id, on_loaded, owner=self)
         else:
             markdown_content = self.fm.read_note(note_id)
             on_loaded(markdown_content)
@@ -158,16 +181,7 @@ class EditorArea(QWidget):
         if markdown_content:
             markdown_content = markdown_content.replace('\ufffc', '')
 
-        # Setup Base URL
-        try:
-            from PySide6.QtCore import QUrl
-            import os
-            full_path = os.path.join(self.fm.root_path, note_id)
-            note_dir = os.path.dirname(full_path)
-            base_url = QUrl.fromLocalFile(note_dir + os.sep)
-            self.text_editor.document().setBaseUrl(base_url)
-        except Exception as e:
-            print(f"Error checking base url: {e}")
+        self._setup_base_url(note_id)
 
         # Trigger Preload if requested
         if preload_images and markdown_content:
@@ -206,9 +220,57 @@ class EditorArea(QWidget):
         print("DEBUG: No images to preload or list empty. Starting rendering directly.")
         self._start_rendering(markdown_content, async_load=async_load)
 
-    def _start_rendering(self, markdown_content, async_load=True):
+    def _setup_base_url(self, note_id):
+        try:
+            from PySide6.QtCore import QUrl
+            import os
+            full_path = os.path.join(self.fm.root_path, note_id)
+            note_dir = os.path.dirname(full_path)
+            base_url = QUrl.fromLocalFile(note_dir + os.sep)
+            self.text_editor.document().setBaseUrl(base_url)
+        except Exception as e:
+            print(f"Error checking base url: {e}")
+
+    # --- Streaming load (very large notes) ---
+
+    def _start_streaming(self, note_id):
+        self._stream_started = False
+        self.fm.read_note_stream_async(
+            note_id,
+            lambda text: self._on_stream_chunk(note_id, text),
+            lambda ok: self._on_stream_done(note_id, ok),
+            owner=self)
+
+    def _on_stream_chunk(self, note_id, text):
+        if self.current_note_id != note_id:
+            return
+        text = text.replace('\ufffc', '')
+        if not self._stream_started:
+            self._stream_started = True
+            self._setup_base_url(note_id)
+            self._start_rendering(text, async_load=True, streaming=True)
+            return
+        self.chunk_loader.feed(text)
+
+    def _on_stream_done(self, note_id, ok):
+        if self.current_note_id != note_id:
+            return
+        if not ok:
+            self.status_message.emit("Error al leer la nota.", 3000)
+        if not self._stream_started:
+            # Empty file (or unreadable): nothing was rendered yet
+            self._stream_started = True
+            self._start_rendering("", async_load=True)
+        else:
+            self.chunk_loader.end_stream()
+
+    # --- Progressive rendering ---
+
+    def _start_rendering(self, markdown_content, async_load=True, streaming=False):
         # --- PROGRESSIVE LOADING STRATEGY ---
-        CHUNK_SIZE = 10000 # Characters per frame (approx 2-3 pages)
+        # The first slice (at the saved reading position) is shown right away, the rest
+        # follows in slices sized to the frame budget (see ChunkLoader)
+        focus = 0 if streaming else self._reading_position(markdown_content)
         
         # 1. Initial Setup (Block heavy signals but allow updates?)
         self.text_editor.setUpdatesEnabled(False)
@@ -216,76 +278,46 @@ class EditorArea(QWidget):
         # We block document signals initially to load the first chunk fast
         self.text_editor.document().blockSignals(True)
         
-        # Split content
-        self._pending_chunks = [markdown_content[i:i+CHUNK_SIZE] for i in range(0, len(markdown_content), CHUNK_SIZE)]
-        
-        # 2. Load First Chunk Immediately (Synchronous)
-        if self._pending_chunks:
-            first_chunk = self._pending_chunks.pop(0)
-            self.text_editor.setPlainText(first_chunk)
-            # Render images and tables for this chunk range
-            self.text_editor.render_images(0, len(first_chunk))
-            self.text_editor.render_tables(0, len(first_chunk))
-            
-            # Restore visuals for first chunk
-            self.highlighter.setDocument(self.text_editor.document())
-        else:
-            self.text_editor.setPlainText("")
+        # 2. Load First Slice Immediately (Synchronous)
+        self.chunk_loader.start(markdown_content, focus, streaming)
+        # Restore visuals for first chunk
+        self.highlighter.setDocument(self.text_editor.document())
             
         # 3. Enable Updates so user sees first chunk
         self.text_editor.document().blockSignals(False)
         self.text_editor.blockSignals(False)
         self.text_editor.setUpdatesEnabled(True)
+        # The first chunk went in with signals blocked; later chunks update the index incrementally
+        self.text_editor.heading_index.rebuild()
         
-        # 4. Schedule rest of the content (if any)
-        if self._pending_chunks:
-            if async_load:
-                from PySide6.QtCore import QTimer
-                QTimer.singleShot(0, self._load_next_chunk)
-            else:
-                 # Flush synchronously
-                 from PySide6.QtWidgets import QApplication
-                 while self._pending_chunks:
-                     chunk = self._pending_chunks.pop(0)
-                     try:
-                         self.text_editor.append_chunk(chunk)
-                         # Process events to allow layout updates and splash animations
-                         QApplication.processEvents()
-                     except Exception:
-                         pass
-                 self._finish_loading()
-        else:
-            self._finish_loading()
+        # 4. Schedule rest of the content (if any); finished -> _on_chunks_loaded
+        self.chunk_loader.resume(sync=not async_load)
+
+    def _on_chunks_loaded(self, stats):
+        self.last_load_stats = stats
+        self._finish_loading()
+
+    def _reading_position(self, markdown_content):
+        """Offset of the line the note was left at (0: the top)."""
+        position = self.fm.note_position(self.current_note_id) if self.current_note_id else None
+        if not position or not markdown_content:
+            return 0
+        return focus_offset(markdown_content, position[0], position[1])
 
-    def _load_next_chunk(self):
-        if not self._pending_chunks or self.current_note_id is None:
-            self._finish_loading()
+    def remember_position(self):
+        """Saves where the current note is scrolled to, for the next time it is opened."""
+        if self.current_note_id is None or getattr(self.text_editor, "is_loading", False):
             return
-            
-        # Take next chunk
-        chunk = self._pending_chunks.pop(0)
-        
-        # Append without blocking global signals (so UI paints?)
-        # Actually, appending triggers layout. If we block signals, we might suppress painting?
-        # QWidget UpdatesEnabled handles painting.
-        # layout changes happen on document modification.
-        # We want the user to see it growing.
-        
-        try:
-            self.text_editor.append_chunk(chunk)
-        except Exception as e:
-            print(f"Error appending chunk: {e}")
-            
-        # Schedule next
-        if self._pending_chunks:
-            from PySide6.QtCore import QTimer
-            QTimer.singleShot(0, self._load_next_chunk)
-        else:
-            self._finish_loading()
+        doc = self.text_editor.document()
+        block = self.text_editor.cursorForPosition(self.text_editor.viewport().rect().topLeft()).block()
+        ratio = block.position() / max(1, doc.characterCount())
+        self.fm.record_note_position(self.current_note_id, ratio, block.text()[:READING_LINE_CHARS])
 
     def _finish_loading(self):
         if getattr(self.text_editor, "is_loading", False):
              self.text_editor.set_loading_state(False)
+        # A table that ended the last chunk was kept as text in case it continued
+        self.text_editor.finish_chunks()
              
         # Force one final update with DELAY
         # This 100ms delay ensures that the MarkdownHighlighter has finished 
@@ -293,6 +325,10 @@ class EditorArea(QWidget):
         from PySide6.QtCore import QTimer
         QTimer.singleShot(100, self.text_editor.update_extra_selections)
         
+        # The freshly loaded document is the clean baseline for dirty tracking
+        self._saved_hash = content_hash(self._serialize_content())
+        self.text_editor.document().setModified(False)
+
         self.status_message.emit("Nota cargada (completa).", 2000)
         print("DEBUG: Loading finished. Emitting note_loaded(True)")
         self.note_loaded.emit(True)
@@ -319,28 +355,57 @@ class EditorArea(QWidget):
         # But that complicates things (saving triggers rename).
         # Let's assume Title Edit handles Rename elsewhere or we ignore title mismatch for now.
         # We just save content.
+
+        # Skip no-op saves: nothing typed since the last write, a half-loaded document,
+        # or edits that ended up with the same text as on disk.
+        doc = self.text_editor.document()
+        if getattr(self.text_editor, "is_loading", False) or (not doc.isModified() and self._saved_hash is not None):
+            return self._skip_save(title, silent)
+
+        content = self._serialize_content()
+        digest = content_hash(content)
+        if digest == self._saved_hash:
+            doc.setModified(False)
+            return self._skip_save(title, silent)
+        
+        # Write-behind: the write happens on the save queue thread, errors come back via note_saved
+        success = self.fm.save_note_async(self.current_note_id, content)
+        if success:
+            self._saved_hash = digest
+            doc.setModified(False)
+        
+        if not silent:
+            if success:
+                 self.status_message.emit("Guardado.", 2000)
+            else:
+                 self.status_message.emit("Error al guardar.", 2000)
         
+        return title
+
+    def _serialize_content(self):
         # USE toPlainText() to preserve Markdown Source.
         # toMarkdown() was double-escaping characters (e.g. \` -> \\\`) because it thought they were literal text in a Rich Doc.
         content = self.text_editor.toPlainText()
         
         # Cleanup: Remove Object Replacement Characters (\ufffc) inserted by inserted images/attachments visuals.
         # These should not be saved to disk.
-        content = content.replace('\ufffc', '')
-        
         # We need to preserve `attachment://` links. 
         # `toPlainText` preserves them as text string `[filename](attachment://id)`.
-        
-        success = self.fm.save_note(self.current_note_id, content)
-        
+        return content.replace('\ufffc', '')
+
+    def _skip_save(self, title, silent):
+        self.fm.record_skipped_save()
         if not silent:
-            if success:
-                 self.status_message.emit("Guardado.", 2000)
-            else:
-                 self.status_message.emit("Error al guardar.", 2000)
-        
+            self.status_message.emit("Sin cambios.", 2000)
         return title
 
+    def _on_note_saved(self, note_id, success):
+        if not success and note_id == self.current_note_id:
+            # Force the next save to retry the write
+            self._saved_hash = None
+            self.text_editor.document().setModified(True)
+            self.status_message.emit("Error al guardar.", 3000)
+
     def rename_current_note(self, new_title):
         if not self.current_note_id or not new_title.strip():
             return
@@ -371,6 +436,8 @@ class EditorArea(QWidget):
                 self.current_note_id = new_rel_path
                 self.note_renamed.emit(old_id, new_rel_path)
                 self.status_message.emit(f"Renombrado a {new_title}", 2000)
+                # Inbound [[links]] follow the new name (background job, see FileManager)
+                self.fm.rewrite_inbound_links(old_id, new_rel_path)
             else:
                  print("DEBUG: Rename returned None?")
         except Exception as e:
@@ -379,8 +446,35 @@ class EditorArea(QWidget):
             # Revert title edit if failed?
             # self.title_edit.setPlainText(old_title)
 
+    def retarget_links(self, old_rel_path, new_rel_path):
+        """
+        Applies a rename's link rewrite to the open document. The file on disk was already
+        rewritten; doing it here too keeps the next save from writing the old links back.
+        """
+        if self.current_note_id is None:
+            return
+        if getattr(self.text_editor, "is_loading", False):
+            # Half-loaded document: load the rewritten file instead
+            import os
+            self.load_note(self.current_note_id, False, os.path.basename(self.current_note_id))
+            return
+
+        spans = link_replacements(self.text_editor.toPlainText(), old_rel_path, new_rel_path)
+        if not spans:
+            return
+        cursor = QTextCursor(self.text_editor.document())
+        cursor.beginEditBlock()
+        for start, end, text in reversed(spans):
+            cursor.setPosition(start)
+            cursor.setPosition(end, QTextCursor.KeepAnchor)
+            cursor.insertText(text)
+        cursor.endEditBlock()
+        self.save_current_note(silent=True)
+
     def clear(self):
+        self.chunk_loader.cancel()
         self.current_note_id = None
+        self._saved_hash = None
         self.title_edit.clear()
         self.text_editor.clear()
 
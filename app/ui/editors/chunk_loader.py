@@ -0,0 +1,271 @@
+import time
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtWidgets import QApplication
+
+# Time per slice: a slice runs between two frames, so it must leave room for painting
+FRAME_BUDGET_MS = 8.0
+# Size of the first slice (shown synchronously) before any rate is measured
+FIRST_SLICE_CHARS = 10000
+MIN_SLICE_CHARS = 1000
+MAX_SLICE_CHARS = 400000
+# Fraction of the budget aimed at, so a slightly slower slice still fits
+BUDGET_HEADROOM = 0.8
+
+
+def _is_table_line(text, start):
+    end = text.find('\n', start)
+    return text[start:end if end != -1 else len(text)].strip().startswith('|')
+
+
+def _cut_ok(text, pos):
+    """pos is a line start: a slice may begin there if no table runs across it."""
+    if pos <= 0 or pos >= len(text):
+        return True
+    previous = text.rfind('\n', 0, pos - 1) + 1
+    return not _is_table_line(text, previous) and not _is_table_line(text, pos)
+
+
+def safe_cut(text, target, lo, hi):
+    """
+    A line start in [lo, hi] as close to target as possible (backwards first) where
+    the text can be split without cutting a table, or None if there is none.
+    """
+    target = max(lo, min(target, hi))
+    newline = text.rfind('\n', max(0, lo - 1), target)
+    while newline != -1 and newline + 1 >= lo:
+        if _cut_ok(text, newline + 1):
+            return newline + 1
+        newline = text.rfind('\n', max(0, lo - 1), newline)
+    newline = text.find('\n', target, hi)
+    while newline != -1 and newline + 1 <= hi:
+        if _cut_ok(text, newline + 1):
+            return newline + 1
+        newline = text.find('\n', newline + 1, hi)
+    return None
+
+
+def iter_slices(text, size):
+    """Splits text into pieces of about `size` characters, each holding whole lines and tables."""
+    start = 0
+    while start < len(text):
+        end = safe_cut(text, start + size, start + 1, len(text)) or len(text)
+        yield text[start:end]
+        start = end
+
+
+def focus_offset(text, ratio, line):
+    """
+    Start of the line the reader was at: `line` (the text of the first visible line)
+    searched near `ratio` of the text, which is only approximate because rendered
+    tables and images change the length of the document.
+    """
+    approx = min(len(text), max(0, int(ratio * len(text))))
+    if line:
+        window = max(20000, len(text) // 20)
+        before = text.rfind('\n' + line, max(0, approx - window), approx + len(line) + 1)
+        after = text.find('\n' + line, approx, approx + window)
+        found = [p + 1 for p in (before, after) if p != -1]
+        if text.startswith(line) and approx < window:
+            found.append(0)
+        if found:
+            return min(found, key=lambda p: abs(p - approx))
+    return text.rfind('\n', 0, approx) + 1
+
+
+class ChunkLoader(QObject):
+    """
+    Loads a note into a NoteEditor in slices that each fit a frame budget.
+
+    The first slice starts at `focus` (the saved reading position) and is shown at
+    once; the document then grows in both directions, alternating a slice appended
+    below with one inserted above (the viewport stays on the same text). Every slice
+    is timed and the next one is sized from the measured characters per millisecond,
+    so slices with heavy tables or images get shorter and plain text ones longer.
+    Slices are cut at line boundaries outside tables.
+
+    Streaming loads start at the top and append text as feed() delivers it.
+    finished(stats) reports {'chars', 'slices', 'total_ms', 'worst_ms'}.
+    """
+    finished = Signal(object)
+
+    def __init__(self, editor, budget_ms=FRAME_BUDGET_MS, parent=None):
+        super().__init__(parent)
+        self.editor = editor
+        self.budget_ms = budget_ms
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._run_slice)
+        self._generation = 0
+        self._active = False
+        self._text = ""
+
+    def start(self, text, focus=0, streaming=False):
+        """Replaces the document with the first slice; resume() loads the rest."""
+        self.cancel()
+        self._text = text
+        self._chars = len(text)
+        self._stream_done = not streaming
+        self._sync = False
+        self._active = True
+        self._prefer_above = False
+        # Chars per ms and next slice size, per direction (inserting above costs more:
+        # the text below has to be laid out again)
+        self._rate = {False: None, True: None}
+        self._size = {False: FIRST_SLICE_CHARS, True: FIRST_SLICE_CHARS}
+        self._slices = 0
+        self._worst_ms = 0.0
+        self._started = time.perf_counter()
+
+        begin = (safe_cut(text, focus, 1, focus) or 0) if focus > 0 else 0
+        end = self._forward_end(begin)
+        self._above = begin # text[:above] still to insert at the top
+        self._below = end # text[below:] still to append
+
+        slice_start = time.perf_counter()
+        self.editor.setPlainText(text[begin:end])
+        self.editor.render_chunk(0, more=self._more_below())
+        self._measure(end - begin, slice_start, False)
+
+    def resume(self, sync=False):
+        """
+        Loads the remaining slices: one per event loop turn, or all of them now (sync,
+        e.g. behind the splash screen, which still gets events once per frame budget).
+        """
+        self._sync = sync
+        if not sync:
+            self._schedule()
+            return
+        generation = self._generation
+        last_events = time.perf_counter()
+        while self._active and generation == self._generation and self._has_work():
+            self._run_slice()
+            if (time.perf_counter() - last_events) * 1000 >= self.budget_ms:
+                QApplication.processEvents()
+                last_events = time.perf_counter()
+        if self._active and generation == self._generation and not self._more_below():
+            self._finish()
+
+    def feed(self, text):
+        """Streaming: more of the note was read."""
+        if not self._active:
+            return
+        # Streaming only appends: drop what is already in the document
+        self._text = self._text[self._below:] + text
+        self._below = 0
+        self._chars += len(text)
+        self._schedule()
+
+    def end_stream(self):
+        if not self._active:
+            return
+        self._stream_done = True
+        self._schedule()
+
+    def cancel(self):
+        self._generation += 1
+        self._active = False
+        self._timer.stop()
+
+    def is_active(self):
+        return self._active
+
+    # --- Slices ---
+
+    def _more_below(self):
+        return self._below < len(self._text) or not self._stream_done
+
+    def _has_work(self):
+        return self._above > 0 or self._below < self._append_limit()
+
+    def _append_limit(self):
+        """End of the text that can be appended now: while streaming, the last complete line."""
+        if self._stream_done:
+            return len(self._text)
+        return self._text.rfind('\n') + 1
+
+    def _forward_end(self, begin):
+        limit = self._append_limit()
+        if begin >= limit:
+            return begin
+        return safe_cut(self._text, begin + self._size[False], begin + 1, limit) or limit
+
+    def _schedule(self):
+        if self._active and not self._sync and not self._timer.isActive():
+            self._timer.start()
+
+    def _run_slice(self):
+        if not self._active:
+            return
+        can_append = self._below < self._append_limit()
+        can_insert = self._above > 0
+        if not can_append and not can_insert:
+            if not self._more_below():
+                self._finish()
+            return # streaming: waiting for feed()
+
+        # Alternate directions; what is below the viewport wins ties
+        above = can_insert and (not can_append or self._prefer_above)
+        self._prefer_above = not above
+        slice_start = time.perf_counter()
+        if above:
+            begin = safe_cut(self._text, self._above - self._size[True], 1, self._above - 1) or 0
+            self._insert_above(self._text[begin:self._above])
+            chars = self._above - begin
+            self._above = begin
+        else:
+            end = self._forward_end(self._below)
+            chunk = self._text[self._below:end]
+            self._below = end
+            self.editor.append_chunk(chunk, more=self._more_below())
+            chars = len(chunk)
+        self._measure(chars, slice_start, above)
+
+        if self._has_work() or self._more_below():
+            self._schedule()
+        elif not self._sync:
+            self._finish()
+
+    def _insert_above(self, chunk):
+        # Keep the first visible line where it is on screen while text grows above it.
+        # By position: text inserted at the start of a block lands in that same block.
+        editor = self.editor
+        doc = editor.document()
+        scrollbar = editor.verticalScrollBar()
+        layout = doc.documentLayout()
+        anchor = editor.cursorForPosition(editor.viewport().rect().topLeft()).block()
+        offset = layout.blockBoundingRect(anchor).top() - scrollbar.value()
+        position = anchor.position()
+        initial = doc.characterCount()
+        editor.setUpdatesEnabled(False)
+        try:
+            editor.insert_chunk(0, chunk)
+            anchor = doc.findBlock(position + doc.characterCount() - initial)
+            scrollbar.setValue(int(layout.blockBoundingRect(anchor).top() - offset))
+        finally:
+            editor.setUpdatesEnabled(True)
+
+    def _measure(self, chars, slice_start, above):
+        elapsed = (time.perf_counter() - slice_start) * 1000
+        self._slices += 1
+        self._worst_ms = max(self._worst_ms, elapsed)
+        if chars and elapsed > 0.05:
+            rate = chars / elapsed
+            previous = self._rate[above]
+            self._rate[above] = rate if previous is None else (previous + rate) / 2
+            target = int(self._rate[above] * self.budget_ms * BUDGET_HEADROOM)
+            self._size[above] = max(MIN_SLICE_CHARS, min(MAX_SLICE_CHARS, target))
+            if not above and self._rate[True] is None:
+                # Nothing inserted above yet: start well below the append size
+                self._size[True] = max(MIN_SLICE_CHARS, self._size[False] // 4)
+
+    def _finish(self):
+        self._active = False
+        self._timer.stop()
+        stats = {
+            'chars': self._chars,
+            'slices': self._slices,
+            'total_ms': (time.perf_counter() - self._started) * 1000,
+            'worst_ms': self._worst_ms,
+        }
+        self.finished.emit(stats)
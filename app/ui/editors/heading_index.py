@@ -0,0 +1,125 @@
+import re
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional
+from PySide6.QtCore import QObject, Signal
+
+HEADING_RE = re.compile(r"^(#+)\s+(.*)")
+
+
+def heading_key(title: str) -> str:
+    """How [[#Heading]] anchors are matched: case-insensitive, surrounding spaces ignored."""
+    return title.strip().lower()
+
+
+class HeadingIndex(QObject):
+    """
+    Headings of one QTextDocument as {'block', 'level', 'title'} dicts in document order.
+
+    Kept current from contentsChange: only the blocks an edit touched are re-parsed,
+    headings further down just have their block number shifted. Anchor lookups go
+    through a title map and QTextDocument.findBlockByNumber, so jumps never walk
+    the document. changed() fires when a heading is added, removed or edited.
+    """
+    changed = Signal()
+
+    def __init__(self, document, parent=None):
+        super().__init__(parent)
+        self.document = document
+        self._entries: List[Dict] = []
+        self._by_key: Dict[str, List[Dict]] = {}
+        self.rebuild()
+        document.contentsChange.connect(self.on_contents_change)
+
+    # --- Queries ---
+
+    def headings(self) -> List[Dict]:
+        return self._entries
+
+    def find(self, title: str) -> Optional[int]:
+        """Block number of the first heading with this title, or None."""
+        entries = self._by_key.get(heading_key(title))
+        if not entries:
+            return None
+        return min(e['block'] for e in entries)
+
+    def section_at(self, block_number: int) -> int:
+        """Position in headings() of the heading whose section contains a block, -1 before the first."""
+        return bisect_right(self._entries, block_number, key=lambda e: e['block']) - 1
+
+    # --- Maintenance ---
+
+    def _parse(self, block) -> Optional[Dict]:
+        text = block.text().strip()
+        if not text.startswith('#'):
+            return None
+        match = HEADING_RE.match(text)
+        if not match or not match.group(2).strip():
+            return None
+        return {'block': block.blockNumber(), 'level': len(match.group(1)), 'title': match.group(2).strip()}
+
+    def _scan(self, first: int, last: int) -> List[Dict]:
+        entries = []
+        block = self.document.findBlockByNumber(first)
+        while block.isValid() and block.blockNumber() <= last:
+            entry = self._parse(block)
+            if entry:
+                entries.append(entry)
+            block = block.next()
+        return entries
+
+    def _add_keys(self, entries):
+        for entry in entries:
+            self._by_key.setdefault(heading_key(entry['title']), []).append(entry)
+
+    def _drop_keys(self, entries):
+        for entry in entries:
+            key = heading_key(entry['title'])
+            same = self._by_key.get(key, [])
+            for i, other in enumerate(same):
+                if other is entry:
+                    del same[i]
+                    break
+            if not same:
+                self._by_key.pop(key, None)
+
+    def rebuild(self):
+        """Full re-parse (document replaced while its signals were blocked, etc.)."""
+        self._entries = self._scan(0, self.document.blockCount() - 1)
+        self._by_key = {}
+        self._add_keys(self._entries)
+        self._block_count = self.document.blockCount()
+        self._char_count = self.document.characterCount()
+        self.changed.emit()
+
+    def on_contents_change(self, position, chars_removed, chars_added):
+        doc = self.document
+        char_count = doc.characterCount()
+        if char_count - chars_added + chars_removed != self._char_count:
+            # Edits happened with the document's signals blocked: our counts are stale
+            self.rebuild()
+            return
+
+        block_count = doc.blockCount()
+        delta = block_count - self._block_count
+        first = doc.findBlock(position).blockNumber()
+        last_block = doc.findBlock(position + chars_added)
+        last = last_block.blockNumber() if last_block.isValid() else block_count - 1
+        # Blocks first..last of the new text replaced first..last - delta of the old one
+        old_last = last - delta
+        self._block_count = block_count
+        self._char_count = char_count
+
+        key = lambda e: e['block']
+        lo = bisect_left(self._entries, first, key=key)
+        hi = bisect_right(self._entries, old_last, key=key)
+        old = self._entries[lo:hi]
+        new = self._scan(first, last)
+        if delta:
+            for entry in self._entries[hi:]:
+                entry['block'] += delta
+        self._entries[lo:hi] = new
+        self._drop_keys(old)
+        self._add_keys(new)
+
+        if [(e['level'], e['title']) for e in old] != [(e['level'], e['title']) for e in new]:
+            self.changed.emit()
@@ -3,9 +3,13 @@ from PySide6.QtCore import QUrl, QByteArray, QBuffer, QIODevice, Qt, QTimer
 from PySide6.QtGui import QImage, QTextDocument, QColor, QTextFormat, QGuiApplication, QTextCursor, QKeySequence, QTextLength
 from app.ui.themes import ThemeManager
 from app.features.images.loader import ImageHandler
+from app.ui.editors.heading_index import HeadingIndex
 import os
 import re
 
+# [[#Heading]] anchors inside a note
+ANCHOR_LINK_RE = re.compile(r"\[\[(#.*?)\]\]")
+
 class NoteEditor(QTextEdit):
     def __init__(self, file_manager, parent=None):
         super().__init__(parent)
@@ -13,6 +17,8 @@ class NoteEditor(QTextEdit):
         self.cursorPositionChanged.connect(self.update_highlighting)
         # Optimized: Use contentsChange for incremental updates instead of full textChanged scan
         self.document().contentsChange.connect(self.on_contents_change)
+        # Headings of the document, for anchor jumps, TOC and the outline panel
+        self.heading_index = HeadingIndex(self.document(), self)
         self.textChanged.connect(self.update_copy_buttons)
         self.verticalScrollBar().valueChanged.connect(self.update_copy_buttons_position)
         
@@ -21,11 +27,19 @@ class NoteEditor(QTextEdit):
         self.current_font_size = 14
         self.current_editor_bg = None
         self.is_loading = False # Performance flag
+        # Start of a table left as text by the last loaded chunk (its rows may continue)
+        self._open_table_pos = None
         
         self.apply_theme("Light") # Default
 
     def set_loading_state(self, loading: bool):
         self.is_loading = loading
+        # Loaded chunks are not edits: keep them off the undo stack (which also makes
+        # every append cost more as the stack grows). Re-enabling starts a clean stack.
+        self.document().setUndoRedoEnabled(not loading)
+        if not loading:
+            # Skipped for every chunk while loading (each call walks the whole document)
+            self.update_copy_buttons()
 
     def setReadOnly(self, ro):
         super().setReadOnly(ro)
@@ -179,6 +193,8 @@ class NoteEditor(QTextEdit):
         self.setViewportMargins(margin, 20, margin, 20)
 
     def update_copy_buttons(self):
+        if self.is_loading:
+            return
         code_blocks = []
         block = self.document().begin()
         while block.isValid():
@@ -210,6 +226,8 @@ class NoteEditor(QTextEdit):
         self.update_copy_buttons_position()
 
     def update_copy_buttons_position(self):
+        if self.is_loading:
+            return # set_loading_state(False) places them once the note is in
         button_idx = 0
         block = self.document().begin()
         
@@ -573,61 +591,43 @@ class NoteEditor(QTextEdit):
         
         block = cursor.block()
         text = block.text()
-        pos_in_block = cursor.positionInBlock()
-        
-        for match in re.finditer(r"\[\[(#.*?)\]\]", text):
-            start = match.start()
-            end = match.end()
-            if start <= pos_in_block <= end:
-                target = match.group(1) # "#Header"
-                self.scroll_to_header(target)
-                return
+        if '[[#' in text:
+            pos_in_block = cursor.positionInBlock()
+            for match in ANCHOR_LINK_RE.finditer(text):
+                if match.start() <= pos_in_block <= match.end():
+                    target = match.group(1) # "#Header"
+                    self.scroll_to_header(target)
+                    return
 
         super().mouseReleaseEvent(event)
 
     def scroll_to_header(self, header_target):
-        target_clean = header_target.lstrip('#').strip().lower()
-        
-        block = self.document().begin()
-        while block.isValid():
-            text = block.text().strip()
-            if text.startswith("#"):
-                header_content = re.sub(r"^#+\s*", "", text).lower().strip()
-                
-                if header_content == target_clean:
-                    cursor = self.textCursor()
-                    cursor.setPosition(block.position())
-                    self.setTextCursor(cursor)
-                    self.ensureCursorVisible()
-                    return
-            block = block.next()
+        block_number = self.heading_index.find(header_target.lstrip('#'))
+        if block_number is not None:
+            self.scroll_to_block(block_number)
+
+    def scroll_to_block(self, block_number):
+        block = self.document().findBlockByNumber(block_number)
+        if not block.isValid():
+            return
+        cursor = self.textCursor()
+        cursor.setPosition(block.position())
+        self.setTextCursor(cursor)
+        self.ensureCursorVisible()
 
     def generate_toc(self):
         toc_lines = ["## Índice"]
         
-        block = self.document().begin()
-        while block.isValid():
-            text = block.text().strip()
-            if text.startswith("#"):
-                match = re.match(r"^(#+)\s+(.*)", text)
-                if match:
-                    hashes = match.group(1)
-                    title = match.group(2).strip()
-                    level = len(hashes)
-                    
-                    if title.lower() == "índice":
-                         block = block.next()
-                         continue
-                         
-                    link = f"[[#{title}]]"
-                    indent = "  " * (level - 1)
-                    toc_lines.append(f"{indent}* {link}")
-                    
-            block = block.next()
+        for heading in self.heading_index.headings():
+            title = heading['title']
+            if title.lower() == "índice":
+                continue
+            indent = "  " * (heading['level'] - 1)
+            toc_lines.append(f"{indent}* [[#{title}]]")
             
         if len(toc_lines) > 1:
             cursor = self.textCursor()
-            cursor.insertText("\\n".join(toc_lines) + "\\n\\n")
+            cursor.insertText("\n".join(toc_lines) + "\n\n")
 
     def on_contents_change(self, position, charsRemoved, charsAdded):
         if getattr(self, "is_loading", False):
@@ -893,7 +893,7 @@ class NoteEditor(QTextEdit):
         return getattr(NoteEditor, cache_key)
 
     def _start_async_image_load(self, path):
-        ImageHandler.load_async(path, self.fm.root_path, self._on_image_loaded)
+        ImageHandler.load_async(path, self.fm.root_path, self._on_image_loaded, self.fm.name_map)
 
     def _on_image_loaded(self, path, image):
         ImageHandler.mark_finished(path)
@@ -939,7 +939,7 @@ class NoteEditor(QTextEdit):
             # Pass strict context via Bound Method which Qt can route safely?
             # Actually, we rely on _on_preload_single_finished being a method of self (QObject)
             # This ensures AutoConnection routes to MainThread.
-            ImageHandler.load_async(path, self.fm.root_path, self._on_preload_single_finished)
+            ImageHandler.load_async(path, self.fm.root_path, self._on_preload_single_finished, self.fm.name_map)
 
     def _on_preload_single_finished(self, path, image):
         self._preload_processed += 1
@@ -953,33 +953,48 @@ class NoteEditor(QTextEdit):
                  callback()
 
     def render_images(self, start_pos=0, end_pos=None):
-        text = self.toPlainText()
+        """
+        Inserts the images referenced between start_pos and end_pos (default: the end).
+        Only the blocks of that range are scanned, so rendering each loaded chunk
+        costs the chunk's size, not the document's.
+        """
+        doc = self.document()
         if end_pos is None:
-            end_pos = len(text)
+            end_pos = doc.characterCount()
             
         cursor = self.textCursor()
         matches = []
         
         from PySide6.QtCore import QRegularExpression
         regex_std = QRegularExpression(r"!\[.*?\]\((.*?)\)")
-        search_text = text[start_pos:end_pos]
-        
-        it_std = regex_std.globalMatch(search_text)
-        while it_std.hasNext():
-            m = it_std.next()
-            g_start = start_pos + m.capturedStart()
-            g_end = start_pos + m.capturedEnd()
-            matches.append((g_start, g_end, m.captured(1), False))
-            
         regex_wiki = QRegularExpression(r"!\[\[(.*?)\]\]")
-        it_wiki = regex_wiki.globalMatch(search_text)
-        while it_wiki.hasNext():
-            m = it_wiki.next()
-            content = m.captured(1)
-            filename = content.split("|")[0] if "|" in content else content
-            g_start = start_pos + m.capturedStart()
-            g_end = start_pos + m.capturedEnd()
-            matches.append((g_start, g_end, filename.strip(), True))
+
+        # Image links never span lines: match block by block (offsets are UTF-16, like positions)
+        block = doc.findBlock(start_pos)
+        while block.isValid() and block.position() < end_pos:
+            search_text = block.text()
+            base = block.position()
+            block = block.next()
+            if '![' not in search_text:
+                continue
+
+            it_std = regex_std.globalMatch(search_text)
+            while it_std.hasNext():
+                m = it_std.next()
+                g_start = base + m.capturedStart()
+                g_end = base + m.capturedEnd()
+                if g_start >= start_pos and g_end <= end_pos:
+                    matches.append((g_start, g_end, m.captured(1), False))
+            
+            it_wiki = regex_wiki.globalMatch(search_text)
+            while it_wiki.hasNext():
+                m = it_wiki.next()
+                content = m.captured(1)
+                filename = content.split("|")[0] if "|" in content else content
+                g_start = base + m.capturedStart()
+                g_end = base + m.capturedEnd()
+                if g_start >= start_pos and g_end <= end_pos:
+                    matches.append((g_start, g_end, filename.strip(), True))
             
         matches.sort(key=lambda x: x[0], reverse=True)
         
@@ -996,18 +1011,53 @@ class NoteEditor(QTextEdit):
         finally:
             cursor.endEditBlock()
 
-    def append_chunk(self, chunk_text):
+    def append_chunk(self, chunk_text, more=False):
+        """Appends one chunk of a progressive load and renders it (see render_chunk)."""
         cursor = self.textCursor()
         cursor.movePosition(QTextCursor.End)
         start_pos = cursor.position()
         cursor.insertText(chunk_text)
-        end_pos = cursor.position()
-        self.render_images(start_pos, end_pos)
-        self.render_tables(start_pos, end_pos)
+        self.render_chunk(start_pos, more)
 
-    def render_tables(self, start_pos=0, end_pos=None):
+    def render_chunk(self, start_pos, more=False):
+        """
+        Renders the images and tables from start_pos to the end of the document, i.e.
+        the chunk just loaded (start_pos 0: the first chunk of a new document).
+        more: further chunks follow, so a table reaching the end stays text until
+        its last rows arrive; finish_chunks() renders it if the load ends there.
+        """
+        if start_pos == 0:
+            self._open_table_pos = None
+        self.render_images(start_pos)
+        if self._open_table_pos is not None:
+            start_pos = min(start_pos, self._open_table_pos)
+        self._open_table_pos = self.render_tables(start_pos, hold_open=more)
+
+    def insert_chunk(self, position, chunk_text):
+        """
+        Inserts a chunk before already loaded text (a load that started further down the
+        note) and renders its images and tables. The chunk must hold whole tables.
+        """
+        doc = self.document()
+        initial = doc.characterCount()
+        cursor = QTextCursor(doc)
+        cursor.setPosition(position)
+        cursor.insertText(chunk_text)
+        end_pos = cursor.position()
+        self.render_images(position, end_pos)
+        self.render_tables(position, position + doc.characterCount() - initial)
+        if self._open_table_pos is not None:
+            # Everything inserted went in before the held table
+            self._open_table_pos += doc.characterCount() - initial
+
+    def finish_chunks(self):
+        if self._open_table_pos is not None:
+            start_pos, self._open_table_pos = self._open_table_pos, None
+            self.render_tables(start_pos)
+
+    def render_tables(self, start_pos=0, end_pos=None, hold_open=False):
         from app.ui.editors.tablas import TableHandler
-        TableHandler.render_tables(self, start_pos, end_pos)
+        return TableHandler.render_tables(self, start_pos, end_pos, hold_open)
 
     def insert_table(self, rows=2, cols=2):
         from app.ui.editors.tablas import TableHandler
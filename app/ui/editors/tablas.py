@@ -3,43 +3,62 @@ import re
 
 class TableHandler:
     @staticmethod
-    def render_tables(editor, start_pos=0, end_pos=None):
-        text = editor.toPlainText()
+    def find_tables(document, start_pos=0, end_pos=None):
+        """
+        Markdown tables (runs of lines starting with '|') in the blocks overlapping
+        [start_pos, end_pos), as [(start, end, lines, open)]. open: the run reaches the
+        end of the document, so more rows may still be appended.
+        Only the blocks of the range are visited, never the whole document.
+        """
         if end_pos is None:
-            end_pos = len(text)
-        
-        lines = text.split('\n')
-        tables_to_render = []
-        current_table_lines = []
-        table_start_pos = 0
-        line_pos = 0
-        
-        for i, line in enumerate(lines):
-            line_start = line_pos
-            line_end = line_pos + len(line)
-            line_pos = line_end + 1
-            
-            stripped = line.strip()
+            end_pos = document.characterCount()
+        last_number = document.blockCount() - 1
+        tables = []
+        current_lines = []
+        table_start = 0
+        last_block = None
+
+        block = document.findBlock(start_pos)
+        while block.isValid() and block.position() < end_pos:
+            line = block.text()
             # Relaxed check: allow rows that don't strictly end with |
-            if stripped.startswith('|'):
-                if not current_table_lines:
-                    table_start_pos = line_start
-                current_table_lines.append(line)
-            else:
-                if current_table_lines:
-                    tables_to_render.append((table_start_pos, current_table_lines))
-                    current_table_lines = []
-        
-        if current_table_lines:
-            tables_to_render.append((table_start_pos, current_table_lines))
-        
+            if line.strip().startswith('|'):
+                if not current_lines:
+                    table_start = block.position()
+                current_lines.append(line)
+                last_block = block
+            elif current_lines:
+                tables.append((table_start, last_block.position() + last_block.length() - 1, current_lines, False))
+                current_lines = []
+            block = block.next()
+
+        if current_lines:
+            after = last_block.next()
+            # The run may continue if nothing but the (empty) last block follows it
+            is_open = not after.isValid() or (after.blockNumber() == last_number and not after.text())
+            tables.append((table_start, last_block.position() + last_block.length() - 1, current_lines, is_open))
+        return tables
+
+    @staticmethod
+    def render_tables(editor, start_pos=0, end_pos=None, hold_open=False):
+        """
+        Turns the markdown tables in [start_pos, end_pos] into QTextTables.
+        hold_open: leave a table still open at the end of the document as text (its
+        rows may continue in the next loaded chunk). Returns the start position of
+        that table, or None.
+        """
+        tables_to_render = TableHandler.find_tables(editor.document(), start_pos, end_pos)
+        held = None
+        if hold_open and tables_to_render and tables_to_render[-1][3]:
+            held = tables_to_render.pop()[0]
+
         if not tables_to_render:
-            return
+            return held
         
         cursor = editor.textCursor()
         cursor.beginEditBlock()
         try:
-            for table_start, table_lines in reversed(tables_to_render):
+            for table_start, table_end, table_lines, _open in reversed(tables_to_render):
                 if len(table_lines) < 2: continue
                 
                 # Check if table already exists at this position to avoid double rendering
@@ -47,9 +66,6 @@ class TableHandler:
                 if cursor.currentTable():
                     continue
 
-                table_text = '\n'.join(table_lines)
-                table_end = table_start + len(table_text)
-                
                 rows_data = []
                 header_row = None
                 
@@ -100,6 +116,7 @@ class TableHandler:
             traceback.print_exc()
         finally:
             cursor.endEditBlock()
+        return held
 
     @staticmethod
     def _render_cell_content(cursor, text, code_bg_color):
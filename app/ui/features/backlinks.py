@@ -0,0 +1,94 @@
+import os
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QListWidget, QListWidgetItem
+from PySide6.QtCore import Qt, QTimer, Signal
+
+
+class BacklinksPanel(QWidget):
+    """
+    Lists the notes that link to the active note ([[Nota]] / ![[imagen.png]]).
+
+    Answers come from the FileManager's link index, so showing a note costs one
+    indexed query; the list is refreshed when the indexer reports link changes.
+    """
+    note_activated = Signal(str) # rel_path of the linking note
+
+    def __init__(self, file_manager, parent=None):
+        super().__init__(parent)
+        self.fm = None
+        self.note_id = ""
+
+        # Indexer updates arrive per note; one refresh per burst is enough
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(300)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(6, 6, 6, 6)
+        self.header = QLabel("Vínculos entrantes")
+        layout.addWidget(self.header)
+        self.list_widget = QListWidget()
+        self.list_widget.itemClicked.connect(self._on_item_clicked)
+        layout.addWidget(self.list_widget)
+
+        self.set_file_manager(file_manager)
+
+    def set_file_manager(self, file_manager):
+        if self.fm is not None:
+            try: self.fm.links_changed.disconnect(self._on_links_changed)
+            except (RuntimeError, TypeError): pass
+        self.fm = file_manager
+        self.fm.links_changed.connect(self._on_links_changed)
+        self.refresh()
+
+    def set_note(self, note_id):
+        self.note_id = note_id or ""
+        self.refresh()
+
+    def rename_note(self, old_id, new_id):
+        if self.note_id == old_id:
+            self.set_note(new_id)
+
+    def _on_links_changed(self, rel_path):
+        # Any note can gain or lose a link to the active one; skip work while hidden
+        if self.isVisible():
+            self.refresh_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def refresh(self):
+        self.refresh_timer.stop()
+        self.list_widget.clear()
+        if not self.isVisible():
+            return
+        if not self.note_id or not os.path.isfile(self.fm.get_abs_path(self.note_id)):
+            self.header.setText("Vínculos entrantes")
+            return
+
+        links = self.fm.get_backlinks(self.note_id)
+        grouped = {}
+        for link in links:
+            grouped.setdefault(link['path'], []).append(link)
+
+        self.header.setText(f"Vínculos entrantes ({len(grouped)})")
+        if not grouped:
+            item = QListWidgetItem("Sin vínculos entrantes")
+            item.setFlags(Qt.NoItemFlags)
+            self.list_widget.addItem(item)
+            return
+
+        for path, note_links in grouped.items():
+            title = os.path.basename(path)
+            if title.endswith('.md'):
+                title = title[:-3]
+            item = QListWidgetItem(f"{title} ({len(note_links)})" if len(note_links) > 1 else title)
+            item.setData(Qt.UserRole, path)
+            item.setToolTip("\n".join(f"{link['line'] + 1}: {link['context']}" for link in note_links))
+            self.list_widget.addItem(item)
+
+    def _on_item_clicked(self, item):
+        path = item.data(Qt.UserRole)
+        if path:
+            self.note_activated.emit(path)
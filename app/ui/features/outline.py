@@ -0,0 +1,84 @@
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QListWidget, QListWidgetItem
+from PySide6.QtCore import Qt, QTimer
+
+
+class OutlinePanel(QWidget):
+    """
+    Live outline (headings) of the note in the active tab.
+
+    Reads the editor's HeadingIndex, so following edits never rescans the document;
+    the section under the cursor is kept selected.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.editor = None
+
+        # Typing inside a heading changes it on every key; one refresh per burst
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(150)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(6, 6, 6, 6)
+        layout.addWidget(QLabel("Esquema"))
+        self.list_widget = QListWidget()
+        self.list_widget.itemClicked.connect(self._on_item_clicked)
+        layout.addWidget(self.list_widget)
+
+    def set_editor(self, text_editor):
+        if self.editor is text_editor:
+            return
+        if self.editor is not None:
+            try:
+                self.editor.heading_index.changed.disconnect(self.refresh_timer.start)
+                self.editor.cursorPositionChanged.disconnect(self.update_current_section)
+            except (RuntimeError, TypeError):
+                pass
+        self.editor = text_editor
+        if text_editor is not None:
+            text_editor.heading_index.changed.connect(self.refresh_timer.start)
+            text_editor.cursorPositionChanged.connect(self.update_current_section)
+        self.refresh()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def refresh(self):
+        self.refresh_timer.stop()
+        if not self.isVisible():
+            return
+        self.list_widget.clear()
+        if self.editor is None:
+            return
+
+        headings = self.editor.heading_index.headings()
+        if not headings:
+            item = QListWidgetItem("Sin encabezados")
+            item.setFlags(Qt.NoItemFlags)
+            self.list_widget.addItem(item)
+            return
+        for heading in headings:
+            item = QListWidgetItem("    " * (heading['level'] - 1) + heading['title'])
+            self.list_widget.addItem(item)
+        self.update_current_section()
+
+    def update_current_section(self):
+        if not self.isVisible() or self.editor is None or self.refresh_timer.isActive():
+            return
+        row = self.editor.heading_index.section_at(self.editor.textCursor().blockNumber())
+        if 0 <= row < self.list_widget.count():
+            self.list_widget.setCurrentRow(row)
+        else:
+            self.list_widget.clearSelection()
+
+    def _on_item_clicked(self, item):
+        if self.editor is None:
+            return
+        headings = self.editor.heading_index.headings()
+        row = self.list_widget.row(item)
+        if 0 <= row < len(headings):
+            # Block numbers are read at click time: they follow the edits
+            self.editor.scroll_to_block(headings[row]['block'])
+            self.editor.setFocus()
@@ -1,6 +1,14 @@
 from PySide6.QtWidgets import QLineEdit, QTreeView
 from PySide6.QtGui import QStandardItemModel, QStandardItem, QIcon
 from PySide6.QtCore import Qt, QSortFilterProxyModel, QObject, Signal
+from app.models.note_model import NOTE_ID_ROLE
+from app.storage.file_manager import SEARCH_PAGE_SIZE
+from app.storage.search_query import SearchQuery, QueryError
+
+SEARCH_SYNTAX_HELP = (
+    '"frase exacta" · a OR b (AND implícito) · -excluir · (agrupar)\n'
+    'path:carpeta/ · tag:#etiqueta · /regex/'
+)
 
 class SearchManager(QObject):
     def __init__(self, file_manager, tree_view: QTreeView, proxy_model: QSortFilterProxyModel, selection_callback=None):
@@ -9,16 +17,25 @@ class SearchManager(QObject):
         self.tree_view = tree_view
         self.proxy_model = proxy_model
         self.selection_callback = selection_callback
+        # Query in flight on the search worker (hits are streamed into search_model)
+        self.search_request = None
+        self.search_model = None
+        # Paging: results come best first, one page at a time as the list is scrolled
+        self.search_query = ""
+        self.next_offset = 0
+        self.has_more = False
+        self.tree_view.verticalScrollBar().valueChanged.connect(self.on_results_scrolled)
         
-        # Debounce Timer
+        # Debounce Timer (queries run off the GUI thread and are cancelled when superseded)
         from PySide6.QtCore import QTimer
         self.search_timer = QTimer()
         self.search_timer.setSingleShot(True)
-        self.search_timer.setInterval(300) # 300ms delay
+        self.search_timer.setInterval(150) # 150ms delay
         self.search_timer.timeout.connect(self.execute_pending_search)
         
         self.search_bar = QLineEdit()
         self.search_bar.setPlaceholderText("Buscar notas...")
+        self.search_bar.setToolTip(SEARCH_SYNTAX_HELP)
         self.search_bar.textChanged.connect(self.on_search_text_changed)
         
         # Style
@@ -34,9 +51,16 @@ class SearchManager(QObject):
         return self.search_bar
 
     def on_search_text_changed(self, text):
+        # A new keystroke supersedes the query still running
+        self.cancel_search()
         # Restart timer
         self.search_timer.start()
 
+    def cancel_search(self):
+        if self.search_request is not None:
+            self.fm.cancel_search(self.search_request)
+            self.search_request = None
+
     def execute_pending_search(self):
         text = self.search_bar.text()
         if not text.strip():
@@ -45,6 +69,7 @@ class SearchManager(QObject):
             self.perform_smart_search(text)
 
     def restore_tree_view(self):
+        self.cancel_search()
         # Restore Tree View Model
         if self.tree_view.model() != self.proxy_model:
             self.tree_view.setModel(self.proxy_model)
@@ -55,14 +80,58 @@ class SearchManager(QObject):
                 self.tree_view.selectionModel().currentChanged.connect(self.selection_callback)
 
     def perform_smart_search(self, text):
-        search_model = QStandardItemModel()
-        
-        # Smart Search Logic
-        query_text = text.strip().lower()
-        
-        # Get results from FS
-        results = self.search_files(query_text)
+        self.cancel_search()
+        self.search_model = QStandardItemModel()
+        self.tree_view.setModel(self.search_model)
+        self.tree_view.setRootIsDecorated(False)
         
+        if self.selection_callback:
+            self.tree_view.selectionModel().currentChanged.connect(self.selection_callback)
+
+        # Smart Search Logic (case is kept: AND/OR are operators, everything else matches any case)
+        query_text = text.strip()
+        self.search_query = query_text
+        self.next_offset = 0
+        self.has_more = False
+        if not query_text:
+            return
+        try:
+            SearchQuery(query_text)
+        except QueryError as e:
+            self.search_bar.setToolTip(f"{e}\n\n{SEARCH_SYNTAX_HELP}")
+            return
+        self.search_bar.setToolTip(SEARCH_SYNTAX_HELP)
+
+        if hasattr(self.fm, 'search_content_async'):
+            self.request_page()
+        else:
+            self.append_results(self.search_model, self.search_files(query_text))
+
+    def request_page(self):
+        # Hits are appended as the worker finds them
+        model = self.search_model
+        self.search_request = self.fm.search_content_async(
+            self.search_query,
+            lambda hits: self.on_search_batch(model, hits),
+            lambda total: self.on_search_finished(model, total),
+            offset=self.next_offset)
+
+    def on_search_batch(self, model, hits):
+        if model is not self.search_model:
+            return
+        self.next_offset = hits[-1]['rank'] + 1
+        self.append_results(model, [(h['path'], h['title'], "<br>".join(h['snippets'])) for h in hits])
+
+    def on_results_scrolled(self, value):
+        # Next page once the end of the results is in sight
+        if (self.has_more and self.search_request is None and self.tree_view.model() is self.search_model
+                and value >= self.tree_view.verticalScrollBar().maximum() - 2):
+            self.has_more = False
+            self.request_page()
+
+    def append_results(self, model, results):
+        if model is not self.search_model:
+            return # superseded query
         note_icon = QIcon.fromTheme("text-x-generic")
         
         for row in results:
@@ -75,19 +144,21 @@ class SearchManager(QObject):
             item = QStandardItem(display_text)
             item.setEditable(False)
             item.note_id = note_id
+            item.setData(note_id, NOTE_ID_ROLE)
             item.setIcon(note_icon)
             
-            # Use Tooltip for context/snippet
+            # Use Tooltip for context/snippet (HTML, matches in bold)
             if snippet:
-                item.setToolTip(f"...{snippet}...")
+                item.setToolTip(snippet)
                 
-            search_model.appendRow(item)
-            
-        self.tree_view.setModel(search_model)
-        self.tree_view.setRootIsDecorated(False)
-        
-        if self.selection_callback:
-            self.tree_view.selectionModel().currentChanged.connect(self.selection_callback)
+            model.appendRow(item)
+
+    def on_search_finished(self, model, total):
+        if model is not self.search_model:
+            return
+        self.search_request = None
+        # A full page means there may be more (fetched when scrolled into view)
+        self.has_more = total >= SEARCH_PAGE_SIZE
             
     def search_files(self, query):
         """
@@ -98,13 +169,13 @@ class SearchManager(QObject):
         
         # Use FileManager File Search
         if hasattr(self.fm, 'search_content'):
-            # results is list of dicts: {'path', 'title', 'snippet'}
+            # results is list of dicts: {'path', 'title', 'snippets', ...}
             cache_results = self.fm.search_content(query)
             
             # Adapt to tuple format expected by UI
             results = []
             for res in cache_results:
-                results.append((res['path'], res['title'], res['snippet']))
+                results.append((res['path'], res['title'], "<br>".join(res['snippets'])))
             return results
         else:
             print("Warning: Search not available")
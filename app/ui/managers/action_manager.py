@@ -141,6 +141,13 @@ class ActionManager:
         # Ideally ActionManager or Window handles dialog. Window has UiThemeMixin logic for now?
         # The mixin method show_theme_dialog in UiThemeMixin handles it.
         
+        self.act_stats = QAction("Estadísticas", self.window)
+        self.act_stats.triggered.connect(self.show_stats_dialog)
+
+        self.act_quick_switcher = QAction("Ir a Nota...", self.window)
+        self.act_quick_switcher.setShortcut(QKeySequence("Ctrl+P"))
+        self.act_quick_switcher.triggered.connect(self.show_quick_switcher)
+
         self.act_about = QAction("Acerca de", self.window)
         self.act_about.triggered.connect(self.show_about)
 
@@ -323,6 +330,16 @@ class ActionManager:
                 else:
                     ModernAlert.show(self.window, "Error de Backup", msg)
 
+    def show_stats_dialog(self):
+        from app.ui.dialogs.dialogs_stats import StatsDialog
+        StatsDialog(self.file_manager.get_vault_stats(), self.window).exec()
+
+    def show_quick_switcher(self):
+        from app.ui.dialogs.dialogs_switcher import QuickSwitcherDialog
+        dialog = QuickSwitcherDialog(self.file_manager, self.window)
+        if dialog.exec() and dialog.selected_note:
+            self.window.open_note(dialog.selected_note)
+
     def show_about(self):
         ModernInfo.show(self.window, "Acerca de", "Cogny\\n\\nUna aplicación jerárquica para tomar notas.\\nConstruida con PySide6 y Archivos Markdown.")
 
@@ -1,8 +1,9 @@
+import os
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QTreeView, QMenu, QSplitter
 from PySide6.QtCore import Qt, Signal, QSortFilterProxyModel
 from PySide6.QtGui import QAction, QIcon
 from app.ui.widgets import ModernInput, ModernAlert, ModernConfirm
-from app.models.note_model import NoteTreeModel
+from app.models.note_model import NoteTreeModel, NOTE_ID_ROLE, IS_FOLDER_ROLE
 
 class Sidebar(QWidget):
     note_selected = Signal(str, bool, str)  # note_id (path), is_folder, title
@@ -18,7 +19,6 @@ class Sidebar(QWidget):
         self.fm = file_manager
         
         # Re-initialize Model with new FM
-        from app.models.note_model import NoteTreeModel
         self.model = NoteTreeModel(self.fm)
         self.model.load_notes()
         
@@ -28,39 +28,99 @@ class Sidebar(QWidget):
         # Reconnect Signals that depend on model instance
         if hasattr(self, 'on_rows_moved'):
             self.model.rowsMoved.connect(self.on_rows_moved)
+        self.model.rowsInserted.connect(self._on_rows_inserted)
+        self._pending_expand = set()
+        self._pending_current = None
             
-        # Connect Watcher Signals
-        if hasattr(self.fm, 'watcher'):
-            try:
-                self.fm.watcher.directory_changed.disconnect(self.on_directory_changed)
-            except: pass
-            self.fm.watcher.directory_changed.connect(self.on_directory_changed)
-
-    def on_directory_changed(self, path):
-        # Filter unwanted updates to prevent loops and crashes
-        import os
-        if not path: return
-        
-        # Check for hidden directories or specific config files
-        # Normalize path
-        norm_path = os.path.normpath(path)
-        parts = norm_path.split(os.sep)
-        
-        # Ignore hidden folders
-        for p in parts:
-            if p.startswith('.') and p != ".":
-                print(f"DEBUG Sidebar: Ignoring change in hidden folder: {path}")
-                return
-        
-        # Ignore config.json specifically if it's in the update path (file watcher might report dir, but good to check)
-        # Actually watcher usually reports the DIRECTORY that changed.
-        # But if we are careful, we prevent reloading on config writes.
-        # FileManager.watcher implementation wraps QFileSystemWatcher.
-        
-        print(f"DEBUG Sidebar: Directory changed {path}, scheduling refresh...")
-        from PySide6.QtCore import QTimer
-        # [DEBUG] Temporarily disabled to prevent segfault on startup
-        # QTimer.singleShot(200, lambda: self.model.load_notes())
+        # Connect Watcher Signals (FileManager re-emits change sets after updating its indexes)
+        self.fm.vault_changed.connect(self.on_vault_changed)
+
+    def on_vault_changed(self, changes):
+        """Applies external changes to the tree in place, keeping the view state."""
+        renames = [(c['old_path'], c['path']) for c in changes if c['kind'] == "moved"]
+        self.preserve_view_state(lambda: self.model.apply_changes(changes) or self.model.load_notes(), renames)
+
+    # --- View state (expansion, selection, scroll) ---
+
+    def _expanded_ids(self):
+        expanded = set()
+        for note_id, index in self.model.loaded_folders():
+            proxy_index = self.proxy_model.mapFromSource(index)
+            if proxy_index.isValid() and self.tree_view.isExpanded(proxy_index):
+                expanded.add(note_id)
+        return expanded
+
+    def preserve_view_state(self, apply, renames=()):
+        """
+        Runs `apply` (a model mutation) and restores expanded folders, the current item and
+        the scroll position afterwards. renames: [(old_id, new_id)] for re-keyed subtrees.
+        Folders whose children are listed asynchronously are expanded when they reappear.
+        """
+        def remap(note_id):
+            for old_id, new_id in renames:
+                if note_id == old_id or note_id.startswith(old_id + os.sep):
+                    return new_id + note_id[len(old_id):]
+            return note_id
+
+        expanded = {remap(i) for i in self._expanded_ids()}
+        current = self.current_note_id()
+        current = remap(current) if current else None
+        scroll = self.tree_view.verticalScrollBar().value()
+
+        apply()
+
+        self._pending_expand |= expanded
+        for note_id in list(expanded):
+            self._expand_if_present(note_id)
+        self._pending_current = current if current and self.current_note_id() != current else None
+        if self._pending_current:
+            self._select_if_present(current)
+        self.tree_view.verticalScrollBar().setValue(scroll)
+
+    def _select_if_present(self, note_id):
+        """Restores the current item without emitting note_selected (the note is already open)."""
+        index = self.model.index_for(note_id)
+        if not index.isValid():
+            return
+        self._pending_current = None
+        proxy_index = self.proxy_model.mapFromSource(index)
+        self.tree_view.selectionModel().blockSignals(True)
+        self.tree_view.setCurrentIndex(proxy_index)
+        self.tree_view.selectionModel().blockSignals(False)
+        self.tree_view.viewport().update()
+
+    def _expand_if_present(self, note_id):
+        index = self.model.index_for(note_id)
+        if not index.isValid():
+            return
+        self._pending_expand.discard(note_id)
+        proxy_index = self.proxy_model.mapFromSource(index)
+        if proxy_index.isValid():
+            self.tree_view.expand(proxy_index)
+
+    def _on_rows_inserted(self, parent, first, last):
+        if not self._pending_expand and not self._pending_current:
+            return
+        for row in range(first, last + 1):
+            note_id = self.model.note_id(self.model.index(row, 0, parent))
+            if note_id in self._pending_expand:
+                self._expand_if_present(note_id)
+            elif note_id is not None and note_id == self._pending_current:
+                self._select_if_present(note_id)
+
+    def current_note_id(self):
+        if self.tree_view.model() != self.proxy_model:
+            return None
+        return self.tree_view.currentIndex().data(NOTE_ID_ROLE)
+
+    def _entry_at(self, index):
+        """(note_id, is_folder, title) of a view index (tree or search results), or None."""
+        if not index.isValid():
+            return None
+        note_id = index.data(NOTE_ID_ROLE)
+        if not note_id:
+            return None
+        return note_id, bool(index.data(IS_FOLDER_ROLE)), index.data(Qt.DisplayRole)
 
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -70,16 +130,19 @@ class Sidebar(QWidget):
         self.tree_view = QTreeView()
         self.model = NoteTreeModel(self.fm) # Restore model init
         self.model.load_notes()
+        self._pending_expand = set()
+        self._pending_current = None
         
         # Connect Watcher (Initial)
-        if hasattr(self.fm, 'watcher'):
-            self.fm.watcher.directory_changed.connect(self.on_directory_changed)
+        self.fm.vault_changed.connect(self.on_vault_changed)
 
         # Proxy Model for Search/Filtering
         self.proxy_model = QSortFilterProxyModel(self)
         self.proxy_model.setSourceModel(self.model)
         self.proxy_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
         self.proxy_model.setRecursiveFilteringEnabled(True) # Important for tree
+        # After setSourceModel: the proxy must map new rows before they are re-expanded
+        self.model.rowsInserted.connect(self._on_rows_inserted)
 
         self.tree_view.setModel(self.proxy_model)
         self.tree_view.setHeaderHidden(True)
@@ -118,24 +181,12 @@ class Sidebar(QWidget):
         if not index.isValid():
              return
 
-        # Check if we are in Search Mode (different model)
-        current_model = self.tree_view.model()
-        if current_model != self.proxy_model:
-            # Search Result Model (StandardItemModel)
-            item = current_model.itemFromIndex(index)
-            if item and hasattr(item, 'note_id'):
-                # Search results don't have is_folder info readily, pass None
-                self.note_selected.emit(item.note_id, False, item.text())
-            return
-
-        source_index = self.proxy_model.mapToSource(index)
-        item = self.model.itemFromIndex(source_index)
-        
-        if not item:
+        # Works for both the tree (proxy) and the search results model;
+        # search results don't carry is_folder info, so they report False
+        entry = self._entry_at(index)
+        if not entry:
             return
-
-        is_folder = getattr(item, 'is_folder', False)
-        self.note_selected.emit(item.note_id, is_folder, item.text())
+        self.note_selected.emit(*entry)
 
     def on_tree_clicked(self, index):
         if self.tree_view.isExpanded(index):
@@ -150,7 +201,7 @@ class Sidebar(QWidget):
         self.model.fetch_children(source_index)
 
     def on_rows_moved(self, parent, start, end, destination, row):
-        if destination.isValid():
+        if destination.isValid() and destination != parent:
             proxy_dest = self.proxy_model.mapFromSource(destination)
             self.tree_view.expand(proxy_dest)
 
@@ -165,15 +216,9 @@ class Sidebar(QWidget):
             self.tree_view.selectionModel().blockSignals(False)
             
             # Handle different models (Proxy vs Search Results)
-            current_model = self.tree_view.model()
-            if current_model == self.proxy_model:
-                source_index = self.proxy_model.mapToSource(index)
-                item = self.model.itemFromIndex(source_index)
-            else:
-                # Assuming StandardItemModel (Search Results)
-                item = current_model.itemFromIndex(index)
-            
-            if not item: return
+            entry = self._entry_at(index)
+            if not entry: return
+            note_id, is_folder, title = entry
             
             # 1. Rename Option
             action_rename = QAction("Cambiar nombre", self)
@@ -185,8 +230,8 @@ class Sidebar(QWidget):
             
             def reveal_helper():
                 from app.utils.system_utils import show_in_explorer
-                # item.note_id is relative path. Need absolute.
-                abs_path = self.fm._get_abs_path(item.note_id)
+                # note_id is relative path. Need absolute.
+                abs_path = self.fm._get_abs_path(note_id)
                 show_in_explorer(abs_path)
                 
             action_reveal.triggered.connect(reveal_helper)
@@ -194,8 +239,6 @@ class Sidebar(QWidget):
             menu.addSeparator()
             
             # 2. Creation Actions
-            is_folder = getattr(item, 'is_folder', False) or item.rowCount() > 0
-            
             if is_folder:
                 action_create = QAction("Crear nota en esta carpeta", self)
                 action_create.triggered.connect(self.add_child_note)
@@ -222,13 +265,13 @@ class Sidebar(QWidget):
                 
                 # Open in New Tab option
                 action_new_tab = QAction("Abrir en nueva pestaña", self)
-                action_new_tab.triggered.connect(lambda checked=False, i=item: self.open_note_in_new_tab(i))
+                action_new_tab.triggered.connect(lambda checked=False, e=entry: self.open_note_in_new_tab(e))
                 menu.addAction(action_new_tab)
                 
                 menu.addSeparator()
                 
                 action_export = QAction("Exportar a PDF", self)
-                action_export.triggered.connect(lambda: self.action_requested.emit("export_pdf", item.note_id))
+                action_export.triggered.connect(lambda: self.action_requested.emit("export_pdf", note_id))
                 menu.addAction(action_export)
         else:
             action_new_root = QAction("Crear nota raíz", self)
@@ -245,11 +288,10 @@ class Sidebar(QWidget):
         index = self.tree_view.currentIndex()
         if not index.isValid(): return
             
-        source_index = self.proxy_model.mapToSource(index)
-        item = self.model.itemFromIndex(source_index)
-        if not item: return
+        entry = self._entry_at(index)
+        if not entry: return
+        old_id, is_folder, old_name = entry
             
-        old_name = item.text()
         new_name, ok = ModernInput.get_text(self, "Cambiar nombre", "Nuevo nombre:", text=old_name)
         
         if ok and new_name.strip():
@@ -261,14 +303,11 @@ class Sidebar(QWidget):
             # FM.rename_item returns new relative path.
             
             try:
-                new_rel_path = self.fm.rename_item(item.note_id, new_name)
-                item.setText(new_name)
-                item.note_id = new_rel_path
-                # We should technically reload model or update children paths if it's a folder?
-                # If folder, all children IDs are now invalid.
-                # Simplest for now: Reload Model if it's a folder or just always?
-                if getattr(item, 'is_folder', False):
-                     self.model.load_notes()
+                new_rel_path = self.fm.rename_item(old_id, new_name)
+                # Move the row in place; a folder's subtree and expansion come along
+                self.model.move_entry(old_id, new_rel_path, is_folder)
+                # Inbound [[links]] follow the new name (background job, see FileManager)
+                self.fm.rewrite_inbound_links(old_id, new_rel_path)
             except Exception as e:
                 ModernAlert.show(self, "Error", f"No se pudo renombrar: {e}")
 
@@ -278,13 +317,7 @@ class Sidebar(QWidget):
             self.add_root_note()
             return
 
-        source_index = self.proxy_model.mapToSource(index)
-        item = self.model.itemFromIndex(source_index)
-        
-        parent = item.parent()
-        parent_id = None
-        if parent and hasattr(parent, "note_id"):
-             parent_id = parent.note_id
+        parent_id = index.parent().data(NOTE_ID_ROLE) # None at root level
         
         title, ok = ModernInput.get_text(self, "Nueva nota", "Título de la nota:")
         if ok and title.strip():
@@ -296,12 +329,11 @@ class Sidebar(QWidget):
             ModernAlert.show(self, "Sin Selección", "Por favor seleccione una nota padre primero.")
             return
 
-        source_index = self.proxy_model.mapToSource(index)
-        item = self.model.itemFromIndex(source_index)
+        parent_id = index.data(NOTE_ID_ROLE)
         
         title, ok = ModernInput.get_text(self, "Nueva Nota", "Título de la Nota:")
         if ok and title:
-            self.model.add_note(title, item.note_id)
+            self.model.add_note(title, parent_id)
             self.tree_view.expand(index)
 
     def add_child_folder(self):
@@ -310,12 +342,11 @@ class Sidebar(QWidget):
             ModernAlert.show(self, "Sin Selección", "Por favor seleccione un elemento padre primero.")
             return
 
-        source_index = self.proxy_model.mapToSource(index)
-        item = self.model.itemFromIndex(source_index)
+        parent_id = index.data(NOTE_ID_ROLE)
         
         title, ok = ModernInput.get_text(self, "Nueva Subcarpeta", "Nombre de la Subcarpeta:")
         if ok and title:
-            self.model.add_note(title, item.note_id, is_folder=True)
+            self.model.add_note(title, parent_id, is_folder=True)
             self.tree_view.expand(index)
 
     def add_sibling_folder(self):
@@ -324,13 +355,7 @@ class Sidebar(QWidget):
             self.add_root_folder()
             return
             
-        source_index = self.proxy_model.mapToSource(index)
-        item = self.model.itemFromIndex(source_index)
-        
-        parent = item.parent()
-        parent_id = None
-        if parent and hasattr(parent, "note_id"):
-             parent_id = parent.note_id
+        parent_id = index.parent().data(NOTE_ID_ROLE) # None at root level
         
         title, ok = ModernInput.get_text(self, "Nueva Carpeta", "Nombre de la Carpeta:")
         if ok and title:
@@ -353,21 +378,24 @@ class Sidebar(QWidget):
         ret = ModernConfirm.show(self, "Confirmar Eliminación", "¿Eliminar esta nota y todos sus hijos?", "Sí", "Cancelar")
         
         if ret:
-            source_index = self.proxy_model.mapToSource(index)
-            item = self.model.itemFromIndex(source_index)
+            # The whole selection is deleted as one batch (at least the current item)
+            note_ids = [note_id for note_id, _ in self.get_selected_notes()]
+            current_id = index.data(NOTE_ID_ROLE)
+            if current_id not in note_ids:
+                note_ids = [current_id]
             
             # Signal before deletion to clear editor if needed
-            self.action_requested.emit("note_deleted", item.note_id)
+            for note_id in note_ids:
+                self.action_requested.emit("note_deleted", note_id)
 
-            self.model.delete_note(item.note_id)
-            # self.model.delete_note calls fm.delete_item internally now.
+            self.model.delete_notes(note_ids)
+            # self.model.delete_notes calls fm.apply_operations internally.
 
     def select_note(self, note_id):
         if not note_id: return
         
-        if note_id in self.model.note_items:
-            item = self.model.note_items[note_id]
-            source_index = item.index()
+        source_index = self.model.index_for(note_id)
+        if source_index.isValid():
             proxy_index = self.proxy_model.mapFromSource(source_index)
             
             if proxy_index.isValid():
@@ -376,80 +404,48 @@ class Sidebar(QWidget):
                 self.tree_view.scrollTo(proxy_index)
 
     def on_external_rename(self, old_id, new_id):
-        import os
         # Update model manually to match FS change triggered by Editor
-        if old_id in self.model.note_items:
-             item = self.model.note_items[old_id]
-             
-             # Calculate new title
-             new_basename = os.path.basename(new_id)
-             new_title = os.path.splitext(new_basename)[0]
-             
-             print(f"DEBUG: Sidebar handling external rename: {old_id} -> {new_id} ({new_title})")
-             
-             item.setText(new_title)
-             item.note_id = new_id
-             
-             # Update Map
-             del self.model.note_items[old_id]
-             self.model.note_items[new_id] = item
-             
+        if self.model.contains(old_id):
+             print(f"DEBUG: Sidebar handling external rename: {old_id} -> {new_id}")
+             self.model.move_entry(old_id, new_id, False)
+
              # Ensure selected
              self.select_note(new_id)
 
 
     def get_selected_notes(self):
         """Returns a list of tuples (note_id, title) for all selected items."""
-        indexes = self.tree_view.selectedIndexes()
         selected_notes = []
         seen_ids = set()
 
-        for index in indexes:
-             # StandardItemModel (Search) or ProxyModel (Tree)?
-             # We need to handle both models robustly.
-             current_model = self.tree_view.model()
-             item = None
-             
-             if current_model == self.proxy_model:
-                 source_index = self.proxy_model.mapToSource(index)
-                 item = self.model.itemFromIndex(source_index)
-             else:
-                 item = current_model.itemFromIndex(index)
-             
-             if item and hasattr(item, 'note_id'):
-                 if item.note_id not in seen_ids:
-                     selected_notes.append((item.note_id, item.text()))
-                     seen_ids.add(item.note_id)
-                     
+        # Roles work for both the tree (proxy) and the search results model
+        for index in self.tree_view.selectedIndexes():
+             entry = self._entry_at(index)
+             if entry and entry[0] not in seen_ids:
+                 selected_notes.append((entry[0], entry[2]))
+                 seen_ids.add(entry[0])
+
         return selected_notes
 
     def mousePressEvent(self, event):
         """Handle middle-click to open in new tab."""
         from PySide6.QtCore import Qt
         if event.button() == Qt.MiddleButton:
-            index = self.tree_view.indexAt(event.pos())
-            if index.isValid():
-                current_model = self.tree_view.model()
-                if current_model == self.proxy_model:
-                    source_index = self.proxy_model.mapToSource(index)
-                    item = self.model.itemFromIndex(source_index)
-                else:
-                    item = current_model.itemFromIndex(index)
-                
-                if item and not getattr(item, 'is_folder', False):
-                    self.open_in_new_tab.emit(item.note_id, False, item.text())
-                    event.accept()
-                    return
+            entry = self._entry_at(self.tree_view.indexAt(event.pos()))
+            if entry and not entry[1]:
+                self.open_in_new_tab.emit(entry[0], False, entry[2])
+                event.accept()
+                return
         
         super().mousePressEvent(event)
     
-    def open_note_in_new_tab(self, item):
-        """Emits signal to open note in new tab."""
-        print(f"DEBUG Sidebar: open_note_in_new_tab called for item={item.text() if item else 'None'}")
-        if item:
-            is_folder = getattr(item, 'is_folder', False)
-            print(f"DEBUG Sidebar: Emitting signal - note_id={item.note_id}, title={item.text()}")
-            self.open_in_new_tab.emit(item.note_id, is_folder, item.text())
+    def open_note_in_new_tab(self, entry):
+        """Emits signal to open note in new tab. entry: (note_id, is_folder, title)."""
+        print(f"DEBUG Sidebar: open_note_in_new_tab called for entry={entry}")
+        if entry:
+            note_id, is_folder, title = entry
+            print(f"DEBUG Sidebar: Emitting signal - note_id={note_id}, title={title}")
+            self.open_in_new_tab.emit(note_id, is_folder, title)
 
     def eventFilter(self, obj, event):
         """Event filter to catch middle-click on tree items."""
@@ -458,20 +454,10 @@ class Sidebar(QWidget):
         
         if obj == self.tree_view.viewport() and isinstance(event, QMouseEvent):
             if event.type() == QEvent.MouseButtonPress and event.button() == Qt.MiddleButton:
-                index = self.tree_view.indexAt(event.pos())
-                if index.isValid():
-                    current_model = self.tree_view.model()
-                    if current_model == self.proxy_model:
-                        source_index = self.proxy_model.mapToSource(index)
-                        item = self.model.itemFromIndex(source_index)
-                    else:
-                        item = current_model.itemFromIndex(index)
-                    
-                    if item and not getattr(item, 'is_folder', False):
-                        print(f"DEBUG Sidebar: Middle-click detected on {item.text()}")
-                        self.open_in_new_tab.emit(item.note_id, False, item.text())
-                        return True  # Event handled
+                entry = self._entry_at(self.tree_view.indexAt(event.pos()))
+                if entry and not entry[1]:
+                    print(f"DEBUG Sidebar: Middle-click detected on {entry[2]}")
+                    self.open_in_new_tab.emit(entry[0], False, entry[2])
+                    return True  # Event handled
         
         return super().eventFilter(obj, event)
-
-
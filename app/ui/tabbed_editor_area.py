@@ -9,6 +9,7 @@ class TabbedEditorArea(QWidget):
     status_message = Signal(str, int)
     note_renamed = Signal(str, str)
     content_changed = Signal()
+    current_note_changed = Signal(str) # note_id shown in the active tab ("" when none)
     
     def __init__(self, file_manager, parent=None):
         super().__init__(parent)
@@ -168,6 +169,7 @@ class TabbedEditorArea(QWidget):
         # Load the note
         if note_id:
             editor_area.load_note(note_id, is_folder, title, **kwargs)
+        self.current_note_changed.emit(note_id or "")
             
     def _get_tooltip_text(self, note_id):
         """Generates a breadcrumb-style tooltip from the note path."""
@@ -192,14 +194,17 @@ class TabbedEditorArea(QWidget):
         if self.tab_widget.count() <= 1:
             # Instead of closing, just clear it
             editor_area = self.tab_widget.widget(index)
+            editor_area.remember_position()
             editor_area.clear()
             self.tab_widget.setTabText(index, "Sin nota")
             editor_area._tab_note_id = None
+            self.current_note_changed.emit("")
             return
         
         # Save current note before closing
         editor_area = self.tab_widget.widget(index)
         if editor_area and editor_area.current_note_id:
+            editor_area.remember_position()
             editor_area.save_current_note()
         
         # Remove tab
@@ -215,8 +220,15 @@ class TabbedEditorArea(QWidget):
         
         # Save previous tab's note
         # (handled automatically by focus events)
-        pass
+        self.current_note_changed.emit(self.current_note_id or "")
     
+    def remember_positions(self):
+        """Keeps the reading position of the note open in every tab (on quit)."""
+        for i in range(self.tab_widget.count()):
+            editor_area = self.tab_widget.widget(i)
+            if editor_area:
+                editor_area.remember_position()
+
     def save_current_note(self, silent=False):
         """Saves the note in the active tab."""
         current_index = self.tab_widget.currentIndex()
@@ -249,6 +261,13 @@ class TabbedEditorArea(QWidget):
             if editor_area:
                 editor_area.set_file_manager(file_manager)
     
+    def retarget_links(self, old_rel_path, new_rel_path, paths):
+        """Applies a rename's link rewrite to every tab showing one of the rewritten notes."""
+        for i in range(self.tab_widget.count()):
+            editor_area = self.tab_widget.widget(i)
+            if editor_area and editor_area.current_note_id in paths:
+                editor_area.retarget_links(old_rel_path, new_rel_path)
+    
     def switch_theme(self, theme_name, text_color=None, global_bg=None):
         """Applies theme to all tabs."""
         for i in range(self.tab_widget.count()):
@@ -4,7 +4,6 @@ from PySide6.QtCore import QSettings, Signal, QTimer, Qt, QEvent, QPoint
 import os
 
 from app.storage.file_manager import FileManager
-from app.storage.config_manager import ConfigManager
 from app.ui.ui_state import UiStateMixin
 from app.ui.ui_theme import UiThemeMixin
 # from app.ui.ui_actions import UiActionsMixin -> Superseded by ActionManager
@@ -15,6 +14,8 @@ from app.ui.custom_title_bar import CustomTitleBar
 from app.ui.sidebar import Sidebar
 from app.ui.tabbed_editor_area import TabbedEditorArea
 from app.ui.features.search import SearchManager
+from app.ui.features.backlinks import BacklinksPanel
+from app.ui.features.outline import OutlinePanel
 from app.ui.views.toolbar import FormatToolbar
 
 class MainWindow(UiStateMixin, UiThemeMixin, QMainWindow):
@@ -58,7 +59,7 @@ class MainWindow(UiStateMixin, UiThemeMixin, QMainWindow):
              vault_path = os.path.expanduser("~/Documentos")
              
         self.fm = FileManager(vault_path)
-        self.config_manager = ConfigManager(self.fm.root_path)
+        self.config_manager = self.fm.config
         
         # 1. UI Setup (Inline or Helper)
         self.setup_ui()
@@ -79,6 +80,16 @@ class MainWindow(UiStateMixin, UiThemeMixin, QMainWindow):
         
         self.setup_tray_icon()
         self.setup_autosave()
+        
+        # Stop background workers (index builder, loader) before the app goes away
+        QApplication.instance().aboutToQuit.connect(self.on_about_to_quit)
+    
+    def on_about_to_quit(self):
+        # Queue the open note one last time; cleanup() flushes the save queue to disk
+        if self.tabbed_editor.current_note_id:
+            self.tabbed_editor.save_current_note(silent=True)
+        self.tabbed_editor.remember_positions()
+        self.fm.cleanup()
     
     def setup_ui(self):
         container = QWidget()
@@ -109,14 +120,30 @@ class MainWindow(UiStateMixin, UiThemeMixin, QMainWindow):
         
         self.tabbed_editor = TabbedEditorArea(file_manager=self.fm, parent=self)
         self.tabbed_editor.status_message.connect(self.on_editor_status)
+        self.fm.link_rewrite_progress.connect(self.on_link_rewrite_progress)
+        self.fm.links_rewritten.connect(self.on_links_rewritten)
         
         # Search Manager
         self.search_manager = SearchManager(self.fm, self.sidebar.tree_view, self.sidebar.proxy_model, self.sidebar.on_selection_changed)
         self.title_bar.add_search_widget(self.search_manager.get_widget())
         
+        # Backlinks of the active note (hidden until toggled from the View menu)
+        self.backlinks_panel = BacklinksPanel(self.fm, parent=self)
+        self.backlinks_panel.note_activated.connect(self.open_note)
+        self.tabbed_editor.current_note_changed.connect(self.backlinks_panel.set_note)
+        self.tabbed_editor.note_renamed.connect(self.backlinks_panel.rename_note)
+        self.backlinks_panel.hide()
+        
+        # Outline of the active note, fed by its editor's heading index
+        self.outline_panel = OutlinePanel(parent=self)
+        self.outline_panel.set_editor(self.tabbed_editor.get_current_editor().text_editor)
+        self.outline_panel.hide()
+        
         self.splitter.addWidget(self.sidebar)
         self.splitter.addWidget(self.tabbed_editor)
-        self.splitter.setSizes([300, 700])
+        self.splitter.addWidget(self.outline_panel)
+        self.splitter.addWidget(self.backlinks_panel)
+        self.splitter.setSizes([300, 700, 250, 250])
         
         main_layout.addWidget(self.splitter)
         self.setCentralWidget(container)
@@ -180,6 +207,14 @@ class MainWindow(UiStateMixin, UiThemeMixin, QMainWindow):
         self.act_toggle_toolbar.setChecked(True)
         self.act_toggle_toolbar.triggered.connect(self.toggle_editor_toolbar)
         view.addAction(self.act_toggle_toolbar)
+        self.act_toggle_backlinks = QAction("Vínculos entrantes", self, checkable=True)
+        self.act_toggle_backlinks.setChecked(False)
+        self.act_toggle_backlinks.triggered.connect(self.toggle_backlinks_panel)
+        view.addAction(self.act_toggle_backlinks)
+        self.act_toggle_outline = QAction("Esquema", self, checkable=True)
+        self.act_toggle_outline.setChecked(False)
+        self.act_toggle_outline.triggered.connect(self.toggle_outline_panel)
+        view.addAction(self.act_toggle_outline)
         view.addSeparator()
         view.addAction(am.act_zoom_in)
         view.addAction(am.act_zoom_out)
@@ -190,6 +225,8 @@ class MainWindow(UiStateMixin, UiThemeMixin, QMainWindow):
         # Tools
         tools = menubar.addMenu("&Herramientas")
         tools.addAction(am.act_theme)
+        tools.addAction(am.act_stats)
+        tools.addAction(am.act_quick_switcher)
         
         # Help
         help = menubar.addMenu("&Ayuda")
@@ -226,6 +263,7 @@ class MainWindow(UiStateMixin, UiThemeMixin, QMainWindow):
         current = self.tabbed_editor.get_current_editor()
         if current:
             self.editor_toolbar.set_editor(current.text_editor)
+            self.outline_panel.set_editor(current.text_editor)
             # Also update ActionManager context if it cached editor? No, it calls get_active_editor() dynamically.
             # But we might need to update Mode Icon state.
             self.action_manager.update_mode_action_icon()
@@ -254,16 +292,37 @@ class MainWindow(UiStateMixin, UiThemeMixin, QMainWindow):
     def toggle_editor_toolbar(self, checked):
         self.editor_toolbar.setVisible(checked)
 
+    def toggle_backlinks_panel(self, checked):
+        self.backlinks_panel.setVisible(checked)
+
+    def toggle_outline_panel(self, checked):
+        self.outline_panel.setVisible(checked)
+
     def on_sidebar_note_selected(self, note_id, is_folder):
         self.tabbed_editor.save_current_note()
         name = os.path.basename(note_id)
         self.tabbed_editor.load_note(note_id, is_folder, title=name)
-        if not is_folder:
-            self.config_manager.save_config("last_opened_note", note_id)
 
     def on_open_in_new_tab(self, note_id, is_folder, title):
         self.tabbed_editor.open_new_tab(note_id, title)
 
+    def open_note(self, note_id):
+        """Opens a note from outside the sidebar (backlinks, quick switcher) and selects it there."""
+        self.on_sidebar_note_selected(note_id, False)
+        self.sidebar.blockSignals(True)
+        self.sidebar.select_note(note_id)
+        self.sidebar.blockSignals(False)
+
+    def on_link_rewrite_progress(self, done, total):
+        self.statusBar().showMessage(f"Actualizando vínculos... {done}/{total}")
+
+    def on_links_rewritten(self, old_id, new_id, paths, links):
+        self.tabbed_editor.retarget_links(old_id, new_id, paths)
+        if links:
+            self.statusBar().showMessage(f"{links} vínculos actualizados en {len(paths)} notas", 3000)
+        else:
+            self.statusBar().clearMessage()
+
     def on_editor_status(self, msg, timeout):
         if timeout > 0:
             self.statusBar().showMessage(msg, timeout)
@@ -335,14 +394,8 @@ class MainWindow(UiStateMixin, UiThemeMixin, QMainWindow):
              self.tabbed_editor.load_note(last_note, is_folder=False, title=title, preload_images=True, async_load=True)
              return
         
-        # Fallback
-        fallback = None
-        for root, dirs, files in os.walk(self.fm.root_path):
-             for f in files:
-                  if f.endswith('.md'):
-                       fallback = self.fm._get_rel_path(os.path.join(root, f))
-                       break
-             if fallback: break
+        # Fallback (served from the vault index when it is built)
+        fallback = self.fm.first_note()
         
         if fallback:
              self.tabbed_editor.note_loaded.connect(self._on_preload_finished)
@@ -379,8 +432,9 @@ class MainWindow(UiStateMixin, UiThemeMixin, QMainWindow):
         settings.setValue("last_vault_path", new_path)
         settings.sync()
         
+        self.fm.cleanup()
         self.fm = FileManager(new_path)
-        self.config_manager = ConfigManager(self.fm.root_path)
+        self.config_manager = self.fm.config
         
         from app.ui.editors.note_editor import NoteEditor
         NoteEditor.clear_image_cache()
@@ -1,2 +1,2 @@
-from app.ui.components.dialogs import ModernDialog, ModernInfo, ModernAlert, ModernConfirm, ModernInput, ModernSelection, ThemeSettingsDialog
+from app.ui.components.dialogs import DARK_THEMES, ModernDialog, ModernInfo, ModernAlert, ModernConfirm, ModernInput, ModernSelection, ThemeSettingsDialog
 from app.ui.components.inputs import TitleEditor
@@ -0,0 +1,160 @@
+"""
+Benchmark for progressive note loading (NoteEditor.append_chunk).
+
+Loads synthetic notes of growing size (paragraphs with a table and an image link
+every few dozen lines) chunk by chunk, as EditorArea does, and compares the
+chunk-local rendering with the previous one, where every chunk re-read the whole
+document (toPlainText) and re-scanned all of its lines for tables. Both variants
+insert the same images and tables; only the scanning differs. The highlighter is
+not attached, so the numbers are the rendering cost alone.
+
+Linear loading keeps ms/MB flat as the note grows. The adaptive columns load the
+same note with ChunkLoader (slices sized to an 8 ms frame budget) and show its worst
+slice. With many tables the current
+loader still grows slowly: QTextCursor.insertTable itself gets slower with every
+table already in the document (Qt's frame bookkeeping); --table-every 0 leaves
+tables out to measure the rest.
+
+Usage: python scripts/bench_note_load.py [--sizes 0.25,0.5,1,2] [--table-every 40] [--skip-legacy-above 2]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QRegularExpression
+from PySide6.QtGui import QImage, QTextCursor
+from PySide6.QtWidgets import QApplication
+
+from app.features.images.loader import ImageHandler
+from app.ui.editors.chunk_loader import ChunkLoader, FIRST_SLICE_CHARS, iter_slices
+from app.ui.editors.note_editor import NoteEditor
+
+IMAGE_NAME = "pic.png"
+
+
+class SyntheticVault:
+    """The parts of FileManager the editor touches while rendering."""
+    root_path = os.getcwd()
+    name_map = None
+
+
+def make_note(size_bytes, table_every=40):
+    lines = []
+    total = 0
+    i = 0
+    while total < size_bytes:
+        if table_every and i % table_every == table_every - 1:
+            block = ["| Col A | Col B | Col C |", "|---|---|---|"]
+            block += [f"| fila {r} | **{i}** | `x{r}` |" for r in range(4)]
+        elif i % 60 == 59:
+            block = [f"![figura {i}]({IMAGE_NAME})"]
+        else:
+            block = [f"Línea {i} de texto de relleno para medir la carga progresiva de notas grandes."]
+        lines.extend(block)
+        total += sum(len(line) + 1 for line in block)
+        i += 1
+    return "\n".join(lines) + "\n"
+
+
+def legacy_append_chunk(editor, chunk_text):
+    """The previous append_chunk: whole-document scans for every chunk."""
+    cursor = editor.textCursor()
+    cursor.movePosition(QTextCursor.End)
+    start_pos = cursor.position()
+    cursor.insertText(chunk_text)
+    end_pos = cursor.position()
+
+    # render_images: toPlainText() of the whole document, regexes over the chunk
+    text = editor.toPlainText()
+    search_text = text[start_pos:end_pos]
+    for pattern in (r"!\[.*?\]\((.*?)\)", r"!\[\[(.*?)\]\]"):
+        it = QRegularExpression(pattern).globalMatch(search_text)
+        while it.hasNext():
+            it.next()
+
+    # render_tables: toPlainText() again and a scan of every line of the document
+    text = editor.toPlainText()
+    for line in text.split('\n'):
+        line.strip().startswith('|')
+
+    # Same insertions as the current code, so both variants build the same document
+    editor.render_chunk(start_pos)
+
+
+def load(editor, content, chunk_size, legacy):
+    chunks = list(iter_slices(content, chunk_size))
+    start = time.perf_counter()
+    editor.set_loading_state(True)
+    editor.setPlainText(chunks[0])
+    editor.render_chunk(0, more=len(chunks) > 1)
+    for i, chunk in enumerate(chunks[1:], start=2):
+        if legacy:
+            legacy_append_chunk(editor, chunk)
+        else:
+            editor.append_chunk(chunk, more=i < len(chunks))
+    editor.finish_chunks()
+    editor.set_loading_state(False)
+    return (time.perf_counter() - start) * 1000, len(chunks)
+
+
+def load_adaptive(editor, content):
+    """ChunkLoader run synchronously: slices sized to the frame budget."""
+    stats = {}
+    loader = ChunkLoader(editor)
+    loader.finished.connect(stats.update)
+    editor.set_loading_state(True)
+    loader.start(content)
+    loader.resume(sync=True)
+    editor.finish_chunks()
+    editor.set_loading_state(False)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="0.25,0.5,1,2", help="note sizes in MB")
+    parser.add_argument("--chunk", type=int, default=FIRST_SLICE_CHARS)
+    parser.add_argument("--table-every", type=int, default=40, help="one table every N paragraphs (0: none)")
+    parser.add_argument("--skip-legacy-above", type=float, default=2.0,
+                        help="do not run the legacy loader on notes larger than this (MB)")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    image = QImage(8, 8, QImage.Format_ARGB32)
+    image.fill(0)
+    ImageHandler.cache_image(os.path.normpath(IMAGE_NAME), image)
+
+    print(f"{'size':>8} {'chunks':>7} {'tables':>7} {'current':>12} {'ms/MB':>8} {'legacy':>12} {'ms/MB':>8}"
+          f" {'adaptive':>12} {'slices':>7} {'worst':>9}")
+    for size_mb in (float(s) for s in args.sizes.split(",")):
+        content = make_note(int(size_mb * 1024 * 1024), args.table_every)
+
+        editor = NoteEditor(SyntheticVault())
+        current_ms, chunks = load(editor, content, args.chunk, legacy=False)
+        tables = len(editor.document().rootFrame().childFrames())
+
+        legacy = "-"
+        legacy_rate = "-"
+        if size_mb <= args.skip_legacy_above:
+            legacy_editor = NoteEditor(SyntheticVault())
+            legacy_ms, _chunks = load(legacy_editor, content, args.chunk, legacy=True)
+            legacy = f"{legacy_ms:.0f} ms"
+            legacy_rate = f"{legacy_ms / size_mb:.0f}"
+            legacy_editor.deleteLater()
+
+        adaptive_editor = NoteEditor(SyntheticVault())
+        stats = load_adaptive(adaptive_editor, content)
+        adaptive_editor.deleteLater()
+
+        print(f"{size_mb:>6.2f}MB {chunks:>7} {tables:>7} {current_ms:>9.0f} ms {current_ms / size_mb:>8.0f} "
+              f"{legacy:>12} {legacy_rate:>8} {stats['total_ms']:>9.0f} ms {stats['slices']:>7} {stats['worst_ms']:>6.1f} ms")
+        editor.deleteLater()
+        app.processEvents()
+
+
+if __name__ == "__main__":
+    main()
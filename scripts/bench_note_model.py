@@ -0,0 +1,162 @@
+"""
+Benchmark for the sidebar tree model.
+
+Compares the previous QStandardItemModel tree (one NoteItem per entry, "Loading..."
+placeholder rows, refresh_icons walk after every expansion) with the compact
+NoteTreeModel: memory per node and the time to expand every folder one by one.
+Each model is measured in its own process so RSS deltas do not mix.
+
+Usage: python scripts/bench_note_model.py [--folders 100] [--notes 200]
+"""
+import argparse
+import gc
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+class SyntheticListing:
+    """Stands in for FileManager's listing API with an in-memory vault (no disk I/O)."""
+    def __init__(self, folders, notes):
+        self.folders = folders
+        self.notes = notes
+
+    def get_children(self, rel_dir):
+        if not rel_dir:
+            return [{'id': f"carpeta_{i:04}", 'title': f"carpeta_{i:04}", 'is_folder': True}
+                    for i in range(self.folders)]
+        return [{'id': os.path.join(rel_dir, f"nota_{j:05}.md"), 'title': f"nota_{j:05}", 'is_folder': False}
+                for j in range(self.notes)]
+
+    def get_children_async(self, rel_dir, on_batch, on_done):
+        on_batch(self.get_children(rel_dir))
+        on_done(True)
+        return 0
+
+    def cancel_children_async(self, request_id):
+        pass
+
+
+def rss_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def legacy_model(listing):
+    """The tree as it was built before the compact model."""
+    from PySide6.QtCore import Qt
+    from PySide6.QtGui import QStandardItemModel, QStandardItem
+    from PySide6.QtWidgets import QApplication, QStyle
+
+    class NoteItem(QStandardItem):
+        def __init__(self, note_id, title, is_folder=False):
+            super().__init__(title)
+            self.note_id = note_id
+            self.is_folder = is_folder
+            self.setEditable(False)
+
+    class LegacyModel(QStandardItemModel):
+        def __init__(self):
+            super().__init__()
+            self.note_items = {}
+
+        def _make(self, r):
+            item = NoteItem(r['id'], r['title'], r['is_folder'])
+            self.note_items[r['id']] = item
+            if r['is_folder']:
+                item.appendRow(QStandardItem("Loading..."))
+                item.setData(True, Qt.UserRole + 1)
+            return item
+
+        def load_notes(self):
+            for r in listing.get_children(None):
+                self.invisibleRootItem().appendRow(self._make(r))
+            self.refresh_icons()
+
+        def fetch_children(self, index):
+            item = self.itemFromIndex(index)
+            item.removeRow(0)
+            item.appendRows([self._make(r) for r in listing.get_children(item.note_id)])
+            item.setData(False, Qt.UserRole + 1)
+            self.refresh_icons()
+
+        def refresh_icons(self):
+            style = QApplication.style()
+            folder_icon = style.standardIcon(QStyle.SP_DirIcon)
+            note_icon = style.standardIcon(QStyle.SP_FileIcon)
+            for item in list(self.note_items.values()):
+                item.setIcon(folder_icon if item.is_folder else note_icon)
+
+    return LegacyModel()
+
+
+def compact_model(listing):
+    from app.models.note_model import NoteTreeModel
+    return NoteTreeModel(listing)
+
+
+def run_one(kind, folders, notes):
+    from PySide6.QtWidgets import QApplication, QTreeView
+    from PySide6.QtCore import QModelIndex
+    app = QApplication([])
+    listing = SyntheticListing(folders, notes)
+    # Some PySide6 builds drop a reference to None on every void call (Python < 3.12,
+    # where None is not immortal); the legacy refresh_icons loop makes millions of them
+    none_refs = [None] * (4 * folders * folders * notes if kind == "legacy" else 0)
+
+    gc.collect()
+    before = rss_bytes()
+    model = legacy_model(listing) if kind == "legacy" else compact_model(listing)
+    view = QTreeView()
+    view.setUniformRowHeights(True)
+    view.setModel(model)
+    view.resize(300, 800)
+
+    start = time.perf_counter()
+    model.load_notes()
+    roots = [model.index(r, 0, QModelIndex()) for r in range(model.rowCount())]
+    worst = 0.0
+    for index in roots:
+        t = time.perf_counter()
+        view.expand(index)
+        if kind == "legacy":
+            model.fetch_children(index) # The sidebar's expanded slot
+        app.processEvents()
+        worst = max(worst, time.perf_counter() - t)
+    total = time.perf_counter() - start
+
+    gc.collect()
+    nodes = folders + folders * notes
+    used = rss_bytes() - before
+    print(f"{kind}\t{nodes}\t{used / nodes:.1f}\t{total * 1000:.1f}\t{worst * 1000:.2f}", flush=True)
+    # Skip interpreter teardown: releasing none_refs would hand the leaked references back
+    os._exit(0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--folders", type=int, default=100)
+    parser.add_argument("--notes", type=int, default=200)
+    parser.add_argument("--only", choices=("legacy", "compact"))
+    args = parser.parse_args()
+
+    if args.only:
+        run_one(args.only, args.folders, args.notes)
+        return
+
+    print(f"Árbol sintético: {args.folders} carpetas x {args.notes} notas, expandiendo todas las carpetas...")
+    print(f"\n{'Modelo':<10}{'nodos':>10}{'bytes/nodo':>14}{'expandir todo ms':>20}{'peor expansión ms':>20}")
+    for kind in ("legacy", "compact"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--only", kind, "--folders", str(args.folders), "--notes", str(args.notes)],
+            capture_output=True, text=True, check=True).stdout.strip().splitlines()[-1]
+        name, nodes, per_node, total, worst = out.split("\t")
+        print(f"{name:<10}{nodes:>10}{float(per_node):>14.1f}{float(total):>20.1f}{float(worst):>20.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark for the persistent vault index (.cogny/index.db).
+
+Generates a synthetic vault and compares the old full os.walk scans with the
+index, both cold (fresh build / first query on a new connection) and warm, then
+times the FileManager methods that read from it (first call and repeated).
+
+Usage: python scripts/bench_vault_index.py [--notes 40000] [--folders 400]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication
+
+from app.storage.file_manager import FileManager
+from app.storage.vault_index import VaultIndex, KIND_NOTE
+
+
+def make_vault(root, notes, folders):
+    for i in range(folders):
+        os.makedirs(os.path.join(root, f"carpeta_{i % 20}", f"sub_{i}"), exist_ok=True)
+    os.makedirs(os.path.join(root, "images"), exist_ok=True)
+    for i in range(notes):
+        k = i % folders
+        folder = os.path.join(root, f"carpeta_{k % 20}", f"sub_{k}")
+        with open(os.path.join(folder, f"nota_{i}.md"), "w", encoding="utf-8") as f:
+            f.write(f"# Nota {i}\n\nContenido de prueba {i}.\n")
+        if i % 50 == 0:
+            with open(os.path.join(folder, f"imagen_{i}.png"), "wb") as f:
+                f.write(b"\x89PNG\r\n")
+
+
+def timed(fn, repeat=1):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def walk_list(root):
+    items = []
+    for r, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        items.extend(dirs)
+        items.extend(f for f in files if f.endswith('.md') or f.lower().endswith('.png'))
+    return items
+
+
+def walk_find(root, name):
+    for r, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        if name in files:
+            return os.path.join(r, name)
+    return None
+
+
+def wait_ready(fm, timeout=600):
+    """Processes events until the vault index and the content indexes are up to date."""
+    deadline = time.monotonic() + timeout
+    while fm.index_builder.isRunning() or not fm.content_synced:
+        if time.monotonic() > deadline:
+            raise TimeoutError("the indexes were not built in time")
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--notes", type=int, default=40000)
+    parser.add_argument("--folders", type=int, default=400)
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    root = tempfile.mkdtemp(prefix="cogny_bench_")
+    try:
+        print(f"Generando bóveda: {args.notes} notas en {args.folders} carpetas...")
+        make_vault(root, args.notes, args.folders)
+        target = f"imagen_{(args.notes - 1) // 50 * 50}.png"
+
+        rows = []
+        rows.append(("os.walk list_files", *timed(lambda: len(walk_list(root)))))
+        rows.append(("os.walk resolve (deep image)", *timed(lambda: walk_find(root, target))))
+
+        index = VaultIndex(root)
+        rows.append(("index cold build", *timed(index.build)))
+        index.close()
+
+        # Cold queries: new VaultIndex / connection on the existing database
+        index = VaultIndex(root)
+        rows.append(("index cold list_entries", *timed(lambda: len(index.list_entries()))))
+        index.close()
+        index = VaultIndex(root)
+        rows.append(("index cold find_by_name", *timed(lambda: index.find_by_name(target))))
+
+        # Warm queries
+        rows.append(("index warm list_entries", *timed(lambda: len(index.list_entries()), repeat=5)))
+        rows.append(("index warm find_by_name", *timed(lambda: index.find_by_name(target), repeat=20)))
+        rows.append(("index warm notes paths", *timed(lambda: len(index.iter_paths(KIND_NOTE)), repeat=5)))
+        rows.append(("index warm first_note", *timed(index.first_note, repeat=20)))
+        rows.append(("index reconcile (no changes)", *timed(index.build)))
+        rows.append(("index refresh_directory", *timed(lambda: index.refresh_directory("carpeta_0"), repeat=5)))
+        index.close()
+
+        # FileManager on the index built above (a warm start, as after a restart)
+        fm = FileManager(root)
+        wait_ready(fm)
+        query = f"Contenido de prueba {args.notes // 2}"
+        for name, fn, repeat in (
+                ("list_files", lambda: len(fm.list_files()), 5),
+                ("resolve_file_path (deep image)", lambda: fm.resolve_file_path(target), 20),
+                ("first_note", fm.first_note, 20),
+                ("search_content", lambda: len(fm.search_content(query)), 5)):
+            rows.append((f"FileManager {name} 1st", *timed(fn)))
+            rows.append((f"FileManager {name} warm", *timed(fn, repeat=repeat)))
+        fm.cleanup()
+
+        print(f"\n{'Operación':<48}{'ms':>12}   resultado")
+        for name, ms, result in rows:
+            summary = result if not isinstance(result, (list, tuple)) else f"{len(result)} items"
+            print(f"{name:<48}{ms:>12.2f}   {summary}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
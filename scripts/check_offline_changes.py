@@ -0,0 +1,88 @@
+"""
+Checks that notes created or edited while the app was closed reach the content
+indexes (search, backlinks, writing statistics) on the next start.
+
+Runs two FileManager sessions on a synthetic vault: the first builds the indexes,
+then notes are added and edited on disk, and the second session must find them
+once its startup sync finishes. Large vaults (--notes 20000) keep the vault index
+builder busy while the sync runs, which is when stale rows used to hide changes.
+
+Usage: python scripts/check_offline_changes.py [--notes 2000] [--timeout 120]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication
+
+from app.storage.file_manager import FileManager
+
+
+def make_vault(root, notes):
+    for i in range(notes):
+        with open(os.path.join(root, f"nota_{i}.md"), "w", encoding="utf-8") as f:
+            f.write(f"# Nota {i}\n\nContenido de prueba {i}.\n")
+
+
+def wait_synced(fm, timeout):
+    """Processes events until the startup content sync of fm has finished."""
+    deadline = time.monotonic() + timeout
+    while not fm.content_synced:
+        if time.monotonic() > deadline:
+            raise TimeoutError("the content sync did not finish in time")
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--notes", type=int, default=2000)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    root = tempfile.mkdtemp(prefix="cogny_offline_")
+    failures = []
+    try:
+        make_vault(root, args.notes)
+        fm = FileManager(root)
+        wait_synced(fm, args.timeout)
+        before = fm.get_vault_stats()['totals'].get('notes', 0)
+        fm.cleanup()
+
+        # Changes made while the app is closed
+        with open(os.path.join(root, "nuevo.md"), "w", encoding="utf-8") as f:
+            f.write("Una nota con zebracorn, ver [[nota_2]].\n")
+        with open(os.path.join(root, "nota_1.md"), "w", encoding="utf-8") as f:
+            f.write("# Nota 1\n\nAhora habla de una jirafa, como [[nota_2]].\n")
+
+        fm = FileManager(root)
+        wait_synced(fm, args.timeout)
+        if [h['path'] for h in fm.search_content("zebracorn")] != ["nuevo.md"]:
+            failures.append("search: the note created offline is not found")
+        if [h['path'] for h in fm.search_content("jirafa")] != ["nota_1.md"]:
+            failures.append("search: the note edited offline is not found")
+        sources = sorted({link['path'] for link in fm.get_backlinks("nota_2.md")})
+        if sources != ["nota_1.md", "nuevo.md"]:
+            failures.append(f"backlinks: nota_2.md is linked from {sources}, expected nota_1.md and nuevo.md")
+        after = fm.get_vault_stats()['totals'].get('notes', 0)
+        if after != before + 1:
+            failures.append(f"stats: {after} notes after the restart, expected {before + 1}")
+        fm.cleanup()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print("OK" if not failures else f"{len(failures)} check(s) failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
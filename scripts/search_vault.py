@@ -0,0 +1,119 @@
+"""
+Headless vault search with the same query language as the search bar
+(see app/storage/search_query.py): "phrase", AND/OR, -term, path:, tag:#x, /regex/.
+
+Uses the vault's search index (.cogny/search.db) when the app has built it, and
+scans every note otherwise; --reindex brings the index up to date first.
+
+Usage: python scripts/search_vault.py VAULT "query" [--limit 20] [--offset 0] [--reindex] [--no-snippets]
+"""
+import argparse
+import html
+import os
+import re
+import sys
+import time
+from itertools import islice
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.storage.search_index import SearchIndex
+from app.storage.search_query import SearchQuery, NoteText, QueryError
+from app.storage.search_snippets import make_snippets
+
+
+def list_notes(root):
+    """{rel_path: (size, mtime)} of every note (hidden folders skipped, as in the app)."""
+    notes = {}
+    for current, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for f in files:
+            if f.endswith('.md'):
+                path = os.path.join(current, f)
+                st = os.stat(path)
+                notes[os.path.relpath(path, root)] = (st.st_size, st.st_mtime_ns)
+    return notes
+
+
+def read_note(root, rel_path):
+    try:
+        with open(os.path.join(root, rel_path), 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def reindex(root, index):
+    """Incremental sync by (size, mtime), like the app's ContentIndexer."""
+    notes = list_notes(root)
+    known = index.doc_states()
+    changed = 0
+    for rel_path, state in notes.items():
+        if known.get(rel_path) == state:
+            continue
+        content = read_note(root, rel_path)
+        if content is not None:
+            index.index_note(rel_path, content, state[0], state[1], commit=False)
+            changed += 1
+    for rel_path in known.keys() - notes.keys():
+        index.remove_note(rel_path, commit=False)
+    index.commit()
+    index.mark_built()
+    return changed
+
+
+def iter_hits(root, index, query):
+    """(rel_path, score, snippets) of the matching notes, best first."""
+    if index is not None and index.is_ready():
+        candidates = query.plan(index)
+    else:
+        candidates = [(rel_path, 0.0) for rel_path in sorted(list_notes(root))]
+    patterns = query.highlight_patterns()
+    for rel_path, score in candidates:
+        note = NoteText(rel_path, lambda rel_path=rel_path: read_note(root, rel_path))
+        if query.matches(note):
+            yield rel_path, score, make_snippets(note.content, patterns) if note.loaded else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("vault")
+    parser.add_argument("query")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--offset", type=int, default=0)
+    parser.add_argument("--reindex", action="store_true", help="update the search index before searching")
+    parser.add_argument("--no-snippets", action="store_true")
+    args = parser.parse_args()
+
+    root = os.path.abspath(args.vault)
+    try:
+        query = SearchQuery(args.query)
+    except QueryError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    index = SearchIndex(root)
+    if not index.available:
+        index = None
+    elif args.reindex:
+        start = time.perf_counter()
+        changed = reindex(root, index)
+        print(f"# reindexed {changed} notes in {(time.perf_counter() - start) * 1000:.0f} ms", file=sys.stderr)
+    if index is None or not index.is_ready():
+        print("# search index not built: scanning every note (use --reindex)", file=sys.stderr)
+
+    start = time.perf_counter()
+    hits = 0
+    for rel_path, score, snippets in islice(iter_hits(root, index, query), args.offset, args.offset + args.limit):
+        hits += 1
+        print(f"{score:7.2f}  {rel_path}")
+        if not args.no_snippets:
+            for snippet in snippets:
+                # Terminal output: matches between ** instead of <b>
+                print(f"         {html.unescape(re.sub(r'</?b>', '**', snippet))}")
+    print(f"# {hits} hits in {(time.perf_counter() - start) * 1000:.0f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())